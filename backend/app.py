@@ -1,15 +1,40 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from flask_mail import Mail, Message
+from flask_mail import Mail, Message, Connection
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import io
+import re
+import math
+import csv
 import json
-from sqlalchemy import func
-from datetime import datetime, timedelta
-from decimal import Decimal
+import base64
+import time
+import atexit
+import threading
+import hashlib
+import heapq
+from bisect import bisect_left, bisect_right
+from functools import wraps
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, update, or_, and_, case, inspect, text, literal, cast, bindparam, event, select, literal_column, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timedelta, time as dt_time
+from decimal import Decimal, ROUND_HALF_UP
 import smtplib
 from email.message import EmailMessage
+from urllib.parse import urlencode
+
+try:
+    import orjson
+except ImportError:  # optional: responses fall back to the stdlib json encoder
+    orjson = None
 
 app = Flask(__name__)
 
@@ -32,15 +57,89 @@ app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD', '')
 app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@homeswift.com')
 app.config['ADMIN_EMAIL'] = os.environ.get('ADMIN_EMAIL', 'admin@homeswift.com')
 app.config['ADMIN_PHONE'] = os.environ.get('ADMIN_PHONE', '+27 11 123 4567')
+app.config['MAIL_TIMEOUT'] = float(os.environ.get('MAIL_TIMEOUT', 10))
+# Circuit breaker for each email transport
+app.config['EMAIL_BREAKER_THRESHOLD'] = int(os.environ.get('EMAIL_BREAKER_THRESHOLD', 3))
+app.config['EMAIL_BREAKER_RESET_SECONDS'] = float(os.environ.get('EMAIL_BREAKER_RESET_SECONDS', 60))
+
+# List endpoint pagination (?limit=&cursor=)
+app.config['DEFAULT_PAGE_SIZE'] = int(os.environ.get('DEFAULT_PAGE_SIZE', 50))
+app.config['MAX_PAGE_SIZE'] = int(os.environ.get('MAX_PAGE_SIZE', 500))
+app.config['STREAM_BATCH_SIZE'] = int(os.environ.get('STREAM_BATCH_SIZE', 500))
+
+# Seconds a worker may serve its cached pricing catalog before re-checking the version
+app.config['PRICING_CACHE_TTL'] = float(os.environ.get('PRICING_CACHE_TTL', 30))
+# Seconds browsers and the CDN edge may reuse pricing responses without revalidating
+app.config['PRICING_MAX_AGE'] = int(os.environ.get('PRICING_MAX_AGE', 60))
+# Bulk import: rows validated and written per chunk, and per-row errors listed in the report
+app.config['IMPORT_CHUNK_SIZE'] = int(os.environ.get('IMPORT_CHUNK_SIZE', 500))
+app.config['IMPORT_MAX_ERRORS'] = int(os.environ.get('IMPORT_MAX_ERRORS', 100))
+
+# Minutes a job holds its provider from the booked start time, and the working day
+# that provider schedules report free time within
+app.config['SERVICE_SLOT_MINUTES'] = int(os.environ.get('SERVICE_SLOT_MINUTES', 120))
+app.config['WORKDAY_START_HOUR'] = int(os.environ.get('WORKDAY_START_HOUR', 7))
+app.config['WORKDAY_END_HOUR'] = int(os.environ.get('WORKDAY_END_HOUR', 18))
+
+# Seconds a worker may use its cached gazetteer before re-checking the version
+app.config['GAZETTEER_CACHE_TTL'] = float(os.environ.get('GAZETTEER_CACHE_TTL', 300))
+
+# Provider auto-matching: seconds between index checks, rating points a provider loses per
+# open job, open jobs at which a provider stops being offered work, and batch size
+app.config['MATCH_INDEX_TTL'] = float(os.environ.get('MATCH_INDEX_TTL', 30))
+app.config['MATCH_WORKLOAD_PENALTY'] = float(os.environ.get('MATCH_WORKLOAD_PENALTY', 0.5))
+app.config['MATCH_MAX_OPEN_JOBS'] = int(os.environ.get('MATCH_MAX_OPEN_JOBS', 5))
+app.config['MATCH_BATCH_MAX'] = int(os.environ.get('MATCH_BATCH_MAX', 500))
+
+# Largest number of service requests changed by one bulk-update call
+app.config['BULK_UPDATE_MAX'] = int(os.environ.get('BULK_UPDATE_MAX', 500))
+
+# Largest number of carts priced by one /api/service-requests/quote call
+app.config['MAX_QUOTE_CARTS'] = int(os.environ.get('MAX_QUOTE_CARTS', 100))
 
-mail = Mail(app)
+# Email outbox delivery (background worker pool)
+app.config['OUTBOX_WORKERS'] = int(os.environ.get('OUTBOX_WORKERS', 4))
+app.config['OUTBOX_BATCH_SIZE'] = int(os.environ.get('OUTBOX_BATCH_SIZE', 20))
+app.config['OUTBOX_POLL_SECONDS'] = float(os.environ.get('OUTBOX_POLL_SECONDS', 5))
+app.config['OUTBOX_MAX_ATTEMPTS'] = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 6))
+app.config['OUTBOX_RETRY_BASE_SECONDS'] = int(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', 30))
+app.config['OUTBOX_LOCK_TIMEOUT_SECONDS'] = int(os.environ.get('OUTBOX_LOCK_TIMEOUT_SECONDS', 300))
+
+# Idempotency-Key replay window, and how long an in-flight request holds its key
+app.config['IDEMPOTENCY_TTL_SECONDS'] = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600))
+app.config['IDEMPOTENCY_LOCK_SECONDS'] = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+app.config['IDEMPOTENCY_PURGE_INTERVAL'] = int(os.environ.get('IDEMPOTENCY_PURGE_INTERVAL', 3600))
+
+# Reminder runs
+app.config['REMINDER_CHUNK_SIZE'] = int(os.environ.get('REMINDER_CHUNK_SIZE', 200))
+app.config['REMINDER_CONCURRENCY'] = int(os.environ.get('REMINDER_CONCURRENCY', 4))
+
+class TimeoutMailConnection(Connection):
+    """Flask-Mail connection whose socket operations give up after MAIL_TIMEOUT seconds"""
+
+    def configure_host(self):
+        smtp_class = smtplib.SMTP_SSL if self.mail.use_ssl else smtplib.SMTP
+        host = smtp_class(self.mail.server, self.mail.port, timeout=app.config['MAIL_TIMEOUT'])
+        host.set_debuglevel(int(self.mail.debug))
+        if self.mail.use_tls:
+            host.starttls()
+        if self.mail.username and self.mail.password:
+            host.login(self.mail.username, self.mail.password)
+        return host
+
+class TimeoutMail(Mail):
+    def connect(self):
+        return TimeoutMailConnection(self.state)
+
+mail = TimeoutMail(app)
 
 # CORS configuration - Allow all origins for development
 CORS(app, 
      resources={r"/api/*": {
          "origins": "*",
          "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-         "allow_headers": ["Content-Type", "Authorization"],
+         "allow_headers": ["Content-Type", "Authorization", "If-None-Match", "Idempotency-Key"],
+         "expose_headers": ["X-Next-Cursor", "Link", "ETag", "Idempotent-Replayed"],
          "supports_credentials": False
      }},
      supports_credentials=False
@@ -48,11 +147,21 @@ CORS(app,
 
 db = SQLAlchemy(app)
 
+# Money is stored and aggregated as integer cents (the *_cents columns) and only
+# turned into Rand amounts at the edges: JSON responses and email text.
+def to_cents(amount):
+    """Rand amount (number or numeric string) as integer cents, rounded half up"""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+def from_cents(cents):
+    """Integer cents as the float Rand amount used in JSON responses"""
+    return cents / 100
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(128), nullable=False, info={'serialize': False})
     phone = db.Column(db.String(30), nullable=True)
     registered = db.Column(db.String(20), nullable=False)
 
@@ -88,6 +197,29 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
+    # Normalized name|date|time|service; the unique index rejects duplicate bookings.
+    # NULL only for legacy rows that duplicate an earlier booking (see backfill_booking_dedup_keys)
+    dedup_key = db.Column(db.String(300), nullable=True, info={'serialize': False})
+
+    __table_args__ = (
+        db.Index('ix_booking_created_at_id', 'created_at', 'id'),
+        # Provider schedules: one provider's jobs over a date range
+        db.Index('ix_booking_provider_date', 'assigned_provider_id', 'date'),
+        db.Index('uq_booking_dedup_key', 'dedup_key', unique=True),
+    )
+
+    @staticmethod
+    def normalize_time(value):
+        """Zero-padded 'HH:MM' for a parseable time, so times compare correctly as text"""
+        try:
+            return datetime.strptime(value.strip(), '%H:%M').strftime('%H:%M')
+        except (AttributeError, ValueError):
+            return value
+
+    @staticmethod
+    def make_dedup_key(name, date, time, service):
+        """Case-insensitive, trimmed duplicate-detection key"""
+        return '|'.join([(name or '').strip().lower(), date or '', time or '', (service or '').strip().lower()])
 
     def to_dict(self):
         return {
@@ -134,6 +266,11 @@ class Complaint(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_complaint_created_at_id', 'created_at', 'id'),
+    )
+    __search_columns__ = ('name', 'email', 'title', 'description')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -165,11 +302,25 @@ class ServiceProvider(db.Model):
     experience_years = db.Column(db.Integer, default=0)
     hourly_rate = db.Column(db.Float, default=0.0)
     rating = db.Column(db.Float, default=0.0)
+    # Job counters, kept by move_job_counters and rebuilt by reconcile_counters:
+    # every job assigned, those still open (OPEN_JOB_STATUSES) and those completed
     total_bookings = db.Column(db.Integer, default=0)
+    active_jobs = db.Column(db.Integer, default=0)
+    completed_jobs = db.Column(db.Integer, default=0)
     status = db.Column(db.String(50), default='active')
     registered = db.Column(db.String(20), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Located from the address through the gazetteer; NULL when it names no known place
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12), info={'serialize': False})
+
+    __table_args__ = (
+        db.Index('ix_service_provider_created_at_id', 'created_at', 'id'),
+        # Prefix (cell) lookups: geohash LIKE 'kdf4%'
+        db.Index('ix_service_provider_geohash', 'geohash'),
+    )
 
     def to_dict(self):
         return {
@@ -183,62 +334,245 @@ class ServiceProvider(db.Model):
             'hourly_rate': self.hourly_rate,
             'rating': self.rating,
             'total_bookings': self.total_bookings,
+            'active_jobs': self.active_jobs,
+            'completed_jobs': self.completed_jobs,
             'status': self.status,
             'registered': self.registered,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'latitude': self.latitude,
+            'longitude': self.longitude
         }
 
+# SMTP connection pool - keeps authenticated sessions open so a run of emails
+# pays for connect/STARTTLS/login once instead of once per message
+class SMTPConnectionPool:
+    """Thread-safe pool of logged-in smtplib.SMTP sessions for one server/account.
+    Sessions idle for longer than `check_after` seconds are probed with NOOP before
+    reuse, and sessions idle for longer than `max_idle` are replaced outright.
+    Every socket operation is bounded by `timeout` seconds.
+    """
+
+    def __init__(self, host, port, username=None, password=None, timeout=10, max_size=4,
+                 check_after=15, max_idle=240):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.username = username
+        self.password = password
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self._idle = []  # (session, last_used) pairs, most recently used last
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._discard(smtp)
+            raise
+        return smtp
+
+    @staticmethod
+    def _discard(smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, smtp):
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    smtp, last_used = self._idle.pop()
+                idle_for = time.monotonic() - last_used
+                if idle_for > self.max_idle:
+                    self._discard(smtp)
+                elif idle_for > self.check_after and not self._is_alive(smtp):
+                    self._discard(smtp)
+                else:
+                    return smtp
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, smtp, broken=False):
+        try:
+            if broken:
+                self._discard(smtp)
+            else:
+                with self._lock:
+                    self._idle.append((smtp, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def send_messages(self, messages):
+        """Send EmailMessages over a single pooled session.
+        Returns one (success, error) pair per message, in order. If the session
+        drops, it is replaced and the interrupted message is retried once.
+        Raises on a transport error (see is_transport_error) before anything was
+        sent; later in the batch the unsent messages get success None instead, so
+        the caller can hand them to another transport.
+        """
+        results = []
+        smtp = self._acquire()
+        try:
+            try:
+                for msg in messages:
+                    for attempt in (1, 2):
+                        if smtp is None:
+                            smtp = self._connect()
+                        try:
+                            smtp.send_message(msg)
+                            results.append((True, None))
+                            break
+                        except Exception as e:
+                            if not is_transport_error(e):
+                                # Rejected recipient or message - the session itself is still usable
+                                results.append((False, str(e)))
+                                break
+                            self._discard(smtp)
+                            smtp = None
+                            dropped = isinstance(e, smtplib.SMTPServerDisconnected) or \
+                                not isinstance(e, smtplib.SMTPException)
+                            if attempt == 2 or not dropped:
+                                raise
+            except Exception as e:
+                if not results:
+                    raise
+                results.extend((None, str(e)) for _ in range(len(messages) - len(results)))
+        finally:
+            if smtp is not None:
+                self._release(smtp)
+            else:
+                self._slots.release()
+        return results
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            self._discard(smtp)
+
+def is_transport_error(error):
+    """True when an error condemns the session or account rather than one message:
+    a dropped connection, a refused login or a refused sender (e.g. 530 auth required).
+    Anything else - a refused recipient, a rejected message - is the message's problem.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                          smtplib.SMTPSenderRefused, smtplib.SMTPAuthenticationError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code in (421, 530, 534, 535, 538)
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+_smtp_pools = {}
+_smtp_pools_lock = threading.Lock()
+
+def get_smtp_pool():
+    """Return the shared pool for the current EMAIL_* settings, or None if EMAIL_HOST is unset"""
+    host = os.environ.get('EMAIL_HOST')
+    if not host:
+        return None
+    key = (host, int(os.environ.get('EMAIL_PORT', 587)),
+           os.environ.get('EMAIL_USER'), os.environ.get('EMAIL_PASS'),
+           float(os.environ.get('EMAIL_TIMEOUT', 10)))
+    with _smtp_pools_lock:
+        pool = _smtp_pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(
+                *key,
+                max_size=int(os.environ.get('EMAIL_POOL_SIZE', 4)),
+                check_after=float(os.environ.get('EMAIL_POOL_CHECK_AFTER', 15)),
+                max_idle=float(os.environ.get('EMAIL_POOL_MAX_IDLE', 240))
+            )
+            _smtp_pools[key] = pool
+        return pool
+
+def close_smtp_pools():
+    with _smtp_pools_lock:
+        pools = list(_smtp_pools.values())
+        _smtp_pools.clear()
+    for pool in pools:
+        pool.close()
+
+atexit.register(close_smtp_pools)
+
+def build_email_message(to_email, subject, body, reply_to=None):
+    msg = EmailMessage()
+    msg['Subject'] = subject
+    msg['From'] = os.environ.get('EMAIL_FROM', os.environ.get('EMAIL_USER'))
+    msg['To'] = to_email
+    if reply_to:
+        msg['Reply-To'] = reply_to
+    msg.set_content(body)
+    return msg
+
 # Email helper function (SMTP version)
 def send_email_smtp(to_email: str, subject: str, body: str, reply_to: str = None) -> bool:
-    """Send a plain-text email using SMTP. Relies on environment variables:
+    """Send a plain-text email using SMTP over a pooled session. Relies on environment variables:
     EMAIL_HOST, EMAIL_PORT, EMAIL_USER, EMAIL_PASS, EMAIL_FROM
     Returns True on success, False otherwise.
     """
-    EMAIL_HOST = os.environ.get('EMAIL_HOST')
-    if not EMAIL_HOST:
-        # Email not configured
-        print('send_email: EMAIL_HOST not set; skipping email')
-        return False
-
-    EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
-    EMAIL_USER = os.environ.get('EMAIL_USER')
-    EMAIL_PASS = os.environ.get('EMAIL_PASS')
-    EMAIL_FROM = os.environ.get('EMAIL_FROM', EMAIL_USER)
-
     try:
-        msg = EmailMessage()
-        msg['Subject'] = subject
-        msg['From'] = EMAIL_FROM
-        msg['To'] = to_email
-        if reply_to:
-            msg['Reply-To'] = reply_to
-        msg.set_content(body)
-
-        with smtplib.SMTP(EMAIL_HOST, EMAIL_PORT) as smtp:
-            smtp.starttls()
-            if EMAIL_USER and EMAIL_PASS:
-                smtp.login(EMAIL_USER, EMAIL_PASS)
-            smtp.send_message(msg)
-        return True
+        return bool(send_emails_smtp([(to_email, subject, body, reply_to)])[0])
     except Exception as e:
         print('send_email error:', e)
         return False
 
+def send_emails_smtp(emails) -> list:
+    """Send several (to_email, subject, body, reply_to) emails over one pooled SMTP session.
+    Returns one result per email: True if sent, False if rejected, None if left unsent
+    by a transport error part way through. Raises if SMTP is not configured or the
+    first transport error comes before anything was sent.
+    """
+    pool = get_smtp_pool()
+    if pool is None:
+        # Email not configured
+        raise RuntimeError('EMAIL_HOST not set')
+
+    messages = [build_email_message(*email) for email in emails]
+    results = pool.send_messages(messages)
+    for ok, error in results:
+        if not ok:
+            print('send_email error:', error)
+    return [ok for ok, _ in results]
+
 # New models for dynamic pricing system
 class ServicePricing(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     service_category = db.Column(db.String(200), nullable=False)
     service_type = db.Column(db.String(200), nullable=False)
     item_description = db.Column(db.String(500))
-    provider_base_price = db.Column(db.Numeric(10, 2), nullable=False)
-    customer_display_price = db.Column(db.Numeric(10, 2), nullable=False)
-    color_surcharge_provider = db.Column(db.Numeric(10, 2), default=0)
-    color_surcharge_customer = db.Column(db.Numeric(10, 2), default=0)
+    provider_base_price_cents = db.Column(db.Integer, nullable=False)
+    customer_display_price_cents = db.Column(db.Integer, nullable=False)
+    color_surcharge_provider_cents = db.Column(db.Integer, default=0)
+    color_surcharge_customer_cents = db.Column(db.Integer, default=0)
     is_white_applicable = db.Column(db.Boolean, default=False)
     commission_percentage = db.Column(db.Numeric(5, 2), default=10)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, info={'serialize': False})
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, info={'serialize': False})
+
+    __table_args__ = (
+        db.Index('uq_service_pricing_category_type', 'service_category', 'service_type', unique=True),
+    )
 
     def to_dict(self):
         return {
@@ -246,10 +580,10 @@ class ServicePricing(db.Model):
             'service_category': self.service_category,
             'service_type': self.service_type,
             'item_description': self.item_description,
-            'provider_base_price': float(self.provider_base_price),
-            'customer_display_price': float(self.customer_display_price),
-            'color_surcharge_provider': float(self.color_surcharge_provider),
-            'color_surcharge_customer': float(self.color_surcharge_customer),
+            'provider_base_price': from_cents(self.provider_base_price_cents),
+            'customer_display_price': from_cents(self.customer_display_price_cents),
+            'color_surcharge_provider': from_cents(self.color_surcharge_provider_cents or 0),
+            'color_surcharge_customer': from_cents(self.color_surcharge_customer_cents or 0),
             'is_white_applicable': self.is_white_applicable,
             'commission_percentage': float(self.commission_percentage)
         }
@@ -259,10 +593,12 @@ class Customer(db.Model):
     customer_name = db.Column(db.String(120), nullable=False)
     customer_email = db.Column(db.String(120), nullable=False)
     customer_phone = db.Column(db.String(30), nullable=False)
-    saved_addresses = db.Column(db.Text)  # JSON string
+    saved_addresses = db.Column(db.Text, info={'serialize': 'json'})  # JSON string
     total_bookings = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __search_columns__ = ('customer_name', 'customer_email', 'customer_phone', 'saved_addresses')
+
     def to_dict(self):
         return {
             'customer_id': self.customer_id,
@@ -287,10 +623,10 @@ class ServiceRequest(db.Model):
     preferred_date = db.Column(db.Date, nullable=False)
     preferred_time = db.Column(db.Time, nullable=False)
     additional_notes = db.Column(db.Text)
-    selected_items = db.Column(db.Text)  # JSON string
-    total_customer_paid = db.Column(db.Numeric(12, 2))
-    total_provider_payout = db.Column(db.Numeric(12, 2))
-    total_commission_earned = db.Column(db.Numeric(12, 2))
+    selected_items = db.Column(db.Text, info={'serialize': 'json'})  # JSON string
+    total_customer_paid_cents = db.Column(db.Integer, info={'serialize': 'cents_or_zero'})
+    total_provider_payout_cents = db.Column(db.Integer, info={'serialize': 'cents_or_zero'})
+    total_commission_earned_cents = db.Column(db.Integer, info={'serialize': 'cents_or_zero'})
     status = db.Column(db.String(50), default='pending')
     priority = db.Column(db.String(20), default='medium')
     assigned_provider_id = db.Column(db.Integer, db.ForeignKey('service_provider.id'), nullable=True)
@@ -306,7 +642,27 @@ class ServiceRequest(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     confirmed_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
-    reminder_sent_at = db.Column(db.DateTime)
+    reminder_sent_at = db.Column(db.DateTime, info={'serialize': False})
+    # Located from customer_address through the gazetteer
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+
+    __search_columns__ = ('customer_name', 'customer_email', 'customer_phone', 'customer_address',
+                          'additional_notes', 'admin_notes')
+    __table_args__ = (
+        # Keyset pages over all requests
+        db.Index('ix_service_request_created_at_id', 'created_at', 'request_id'),
+        # Status-filtered lists ordered by created_at, status counts, completed-by-date ranges
+        db.Index('ix_service_request_status_created_at_id', 'status', 'created_at', 'request_id'),
+        # Provider schedules and double-booking checks: one provider's jobs over a date range
+        db.Index('ix_service_request_provider_date', 'assigned_provider_id', 'preferred_date'),
+        # Reminder candidates: only rows still waiting for a reminder are indexed
+        db.Index(
+            'ix_service_request_reminder_due', 'preferred_date', 'status', 'request_id',
+            sqlite_where=text('reminder_sent_at IS NULL'),
+            postgresql_where=text('reminder_sent_at IS NULL')
+        ),
+    )
 
     def to_dict(self):
         return {
@@ -323,9 +679,9 @@ class ServiceRequest(db.Model):
             'preferred_time': self.preferred_time.strftime('%H:%M') if self.preferred_time else None,
             'additional_notes': self.additional_notes,
             'selected_items': json.loads(self.selected_items) if self.selected_items else [],
-            'total_customer_paid': float(self.total_customer_paid) if self.total_customer_paid else 0,
-            'total_provider_payout': float(self.total_provider_payout) if self.total_provider_payout else 0,
-            'total_commission_earned': float(self.total_commission_earned) if self.total_commission_earned else 0,
+            'total_customer_paid': from_cents(self.total_customer_paid_cents) if self.total_customer_paid_cents else 0,
+            'total_provider_payout': from_cents(self.total_provider_payout_cents) if self.total_provider_payout_cents else 0,
+            'total_commission_earned': from_cents(self.total_commission_earned_cents) if self.total_commission_earned_cents else 0,
             'status': self.status,
             'priority': self.priority,
             'assigned_provider_id': self.assigned_provider_id,
@@ -340,9 +696,976 @@ class ServiceRequest(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'confirmed_at': self.confirmed_at.isoformat() if self.confirmed_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'latitude': self.latitude,
+            'longitude': self.longitude
+        }
+
+class ServiceRequestItem(db.Model):
+    """One priced line of a service request - a normalized, indexable copy of
+    the entries in ServiceRequest.selected_items."""
+    id = db.Column(db.Integer, primary_key=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('service_request.request_id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    category = db.Column(db.String(200), nullable=False)
+    service_type = db.Column(db.String(200))
+    is_white = db.Column(db.Boolean, default=False)
+    quantity = db.Column(db.Integer, nullable=False, default=1)
+    customer_price_cents = db.Column(db.Integer)
+    provider_price_cents = db.Column(db.Integer)
+    commission_cents = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index('ix_service_request_item_request_id', 'request_id'),
+        db.Index('ix_service_request_item_category_request_id', 'category', 'request_id'),
+    )
+
+    @staticmethod
+    def rows_for(request_id, items):
+        """Insert-ready dicts for a request's selected_items list"""
+        return [{
+            'request_id': request_id,
+            'position': position,
+            'category': item.get('category') or '',
+            'service_type': item.get('type'),
+            'is_white': bool(item.get('is_white')),
+            'quantity': _legacy_quantity(item.get('quantity')),
+            'customer_price_cents': _optional_cents(item.get('customer_price')),
+            'provider_price_cents': _optional_cents(item.get('provider_price')),
+            'commission_cents': _optional_cents(item.get('commission'))
+        } for position, item in enumerate(items)]
+
+# selected_items JSON predates server-side validation, so legacy rows can hold
+# quantities like "2x" or prices like "R440"; one bad row must not stop a backfill
+def _legacy_quantity(quantity):
+    try:
+        return int(quantity or 1)
+    except (TypeError, ValueError):
+        return 1
+
+def _optional_cents(amount):
+    try:
+        return to_cents(amount) if amount is not None else None
+    except ArithmeticError:
+        return None
+
+class DailyRevenueRollup(db.Model):
+    """Completed-job totals per day (of ServiceRequest.created_at) and category.
+    Rows with category '' hold request-level totals, including the callout fee;
+    the other rows hold line-item totals for that category."""
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(200), primary_key=True)
+    job_count = db.Column(db.Integer, nullable=False, default=0)
+    customer_paid_cents = db.Column(db.BigInteger, nullable=False, default=0)
+    provider_payout_cents = db.Column(db.BigInteger, nullable=False, default=0)
+    commission_cents = db.Column(db.BigInteger, nullable=False, default=0)
+
+ROLLUP_ALL_CATEGORIES = ''
+
+class EmailOutbox(db.Model):
+    """Outgoing email, written in the same transaction as the record that triggered it
+    and delivered later by the outbox worker pool."""
+    id = db.Column(db.Integer, primary_key=True)
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(500), nullable=False)
+    body = db.Column(db.Text, nullable=False, info={'serialize': False})
+    reply_to = db.Column(db.String(255), info={'serialize': False})
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(500))
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, info={'serialize': False})
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'to_email': self.to_email,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
         }
 
+class DataVersion(db.Model):
+    """Version stamp for a cached dataset. Writers bump it in the same transaction
+    as their change; every process compares it against the version it has cached."""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class IdempotencyKey(db.Model):
+    """Stored response for a client-supplied Idempotency-Key. A row without a
+    status_code is a reservation held by a request that is still running."""
+    key = db.Column(db.String(255), primary_key=True)
+    endpoint = db.Column(db.String(100), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_idempotency_key_expires_at', 'expires_at'),
+    )
+
+class GazetteerPlace(db.Model):
+    """Offline gazetteer: suburb and postcode centroids that addresses are located
+    against, seeded from data/za_gazetteer.csv. A row whose name is its city is the
+    city centre, used when an address names only the city."""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+    postcode = db.Column(db.String(10), nullable=False)
+    city = db.Column(db.String(120), nullable=False)
+    province = db.Column(db.String(60))
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index('uq_gazetteer_place_name_postcode', 'name', 'postcode', unique=True),
+    )
+
+def get_data_version(name):
+    version = db.session.query(DataVersion.version).filter_by(name=name).scalar()
+    return version or 0
+
+def bump_data_version(name):
+    """Increment a dataset's version as part of the current transaction"""
+    result = db.session.execute(
+        update(DataVersion)
+        .where(DataVersion.name == name)
+        .values(version=DataVersion.version + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.session.add(DataVersion(name=name, version=1))
+
+def dialect_insert(table):
+    """INSERT construct with on_conflict_do_update/do_nothing for the active database"""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql_insert(table)
+    return sqlite_insert(table)
+
+# ========== SERIALIZATION ==========
+
+# How a column value becomes JSON, by serialize mode. A column's mode comes from
+# info={'serialize': ...} (False hides it), else from its type or a _cents name.
+SERIALIZE_EXPRESSIONS = {
+    'value': '{v}',
+    'isoformat': '{v}.isoformat() if {v} is not None else None',
+    'time': "{v}.strftime('%H:%M') if {v} is not None else None",
+    'float': 'float({v}) if {v} is not None else None',
+    'json': 'json_loads({v}) if {v} else []',
+    'cents': 'from_cents({v} or 0)',
+    'cents_or_zero': 'from_cents({v}) if {v} else 0',
+}
+
+def serialize_mode(column):
+    mode = column.info.get('serialize')
+    if mode is not None:
+        return mode
+    if isinstance(column.type, (db.DateTime, db.Date)):
+        return 'isoformat'
+    if isinstance(column.type, db.Time):
+        return 'time'
+    if isinstance(column.type, db.Numeric) and not isinstance(column.type, db.Float):
+        return 'float'
+    if column.name.endswith('_cents'):
+        return 'cents'
+    return 'value'
+
+_serializer_fields = {}
+
+def serializer_fields(model):
+    """{output name: (attribute key, expression template)} for the fields model.to_dict() returns"""
+    fields = _serializer_fields.get(model)
+    if fields is None:
+        fields = {}
+        for prop in inspect(model).column_attrs:
+            mode = serialize_mode(prop.columns[0])
+            if mode is False:
+                continue
+            name = prop.key[:-len('_cents')] if mode in ('cents', 'cents_or_zero') else prop.key
+            fields[name] = (prop.key, SERIALIZE_EXPRESSIONS[mode])
+        _serializer_fields[model] = fields
+    return fields
+
+def compile_serializer(model, only=None):
+    """Generate a function returning the same dict as model.to_dict() - or just the
+    `only` fields of it - built once from the mapped columns. Loaded rows are read
+    straight from the instance __dict__; a row with expired or unloaded attributes
+    takes the attribute-access path instead.
+    """
+    spec = serializer_fields(model)
+    fields = [(name,) + spec[name] for name in (only or spec)]
+
+    def body(read):
+        return '{' + ', '.join(
+            f'{name!r}: ' + expression.format(v=read(key)) for name, key, expression in fields
+        ) + '}'
+
+    source = (
+        'def serialize(obj):\n'
+        '    d = obj.__dict__\n'
+        '    try:\n'
+        f'        return {body(lambda key: f"d[{key!r}]")}\n'
+        '    except KeyError:\n'
+        '        pass\n'
+        f'    return {body(lambda key: f"obj.{key}")}\n'
+    )
+    namespace = {'json_loads': json.loads, 'from_cents': from_cents}
+    exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+_serializers = {}
+
+def row_serializer(model, only=None):
+    """The cached compiled serializer for `model`, limited to the `only` fields when given"""
+    serializer = _serializers.get((model, only))
+    if serializer is None:
+        serializer = _serializers[model, only] = compile_serializer(model, only)
+    return serializer
+
+def serialize_row(row):
+    """to_dict() output for a model instance, through the model's compiled serializer"""
+    return row_serializer(row.__class__)(row)
+
+# Python prints floats below 1e-4 or from 1e16 with an exponent and orjson does not
+# always agree: its output for them contains '0.0000' or a digit-e-digit exponent.
+# (The lookbehind keeps the search on the fast literal-'e' scan.)
+_ORJSON_EXPONENT = re.compile(rb'e(?<=[0-9]e)[-0-9]')
+
+def _has_non_finite(obj):
+    """True if a NaN or infinite float appears anywhere in a JSON-ready structure"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    return False
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's default JSON provider with compact output encoded by orjson when it is
+    installed. The bytes match the stdlib encoder (sorted keys, ASCII escapes, dates in
+    HTTP format, Decimal as str); anything orjson would render differently - non-ASCII
+    text, DEL characters, NaN/Infinity, non-string keys, huge ints, exponent floats - is
+    re-encoded with json.dumps. Indented (debug) output always uses the stdlib encoder.
+    """
+    def _fast_dumps(self, obj):
+        if orjson is None or not self.sort_keys:
+            return None
+        try:
+            data = orjson.dumps(obj, default=self.default, option=(
+                orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            ))
+        except TypeError:
+            return None
+        if self.ensure_ascii and not data.isascii():
+            return None
+        if b'0.0000' in data or _ORJSON_EXPONENT.search(data):
+            return None
+        # orjson writes DEL raw where json.dumps escapes it, and NaN/Infinity as null;
+        # only output that contains a null can hide a non-finite float
+        if b'\x7f' in data or (b'null' in data and _has_non_finite(obj)):
+            return None
+        return data
+
+    def dumps(self, obj, **kwargs):
+        if kwargs == {'separators': (',', ':')}:
+            data = self._fast_dumps(obj)
+            if data is not None:
+                return data.decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        data = self._fast_dumps(obj)
+        if data is None:
+            data = super().dumps(obj, separators=(',', ':')).encode()
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+app.json = FastJSONProvider(app)
+
+# ========== SCHEMA UPGRADES ==========
+
+def upgrade_schema():
+    """Bring an existing database up to the current models.
+    Creates missing tables (db.create_all), adds columns that an older database
+    lacks (as nullable columns; defaults are applied by the models) and creates
+    any declared indexes that do not exist yet. Safe to run repeatedly.
+    """
+    existing_tables = set(inspect(db.engine).get_table_names())
+    db.create_all()
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    created = [name for name in db.metadata.tables if name not in existing_tables]
+    for table in db.metadata.sorted_tables:
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                with db.engine.begin() as conn:
+                    conn.execute(text('ALTER TABLE {} ADD COLUMN {} {}'.format(
+                        preparer.format_table(table), preparer.quote(column.name),
+                        column.type.compile(dialect=db.engine.dialect))))
+                created.append(f'{table.name}.{column.name}')
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                if index.name in PRE_INDEX_MIGRATIONS:
+                    PRE_INDEX_MIGRATIONS[index.name]()
+                index.create(db.engine)
+                created.append(index.name)
+
+    created.extend(migrate_money_to_cents())
+    backfill_created_at()
+    normalize_booking_times()
+
+    # Data migrations for tables introduced after data already existed
+    if ServiceRequestItem.__tablename__ in created:
+        backfill_service_request_items()
+    if DailyRevenueRollup.__tablename__ in created:
+        rebuild_daily_rollups()
+    if 'booking.dedup_key' in created:
+        backfill_booking_dedup_keys()
+    if GazetteerPlace.__tablename__ in created:
+        seed_gazetteer()
+    if {'service_provider.latitude', 'service_request.latitude', GazetteerPlace.__tablename__} & set(created):
+        backfill_coordinates()
+    if {'service_provider.active_jobs', 'service_provider.completed_jobs'} & set(created):
+        reconcile_counters()
+    # Search indexes for tables that predate them (new tables get theirs on create)
+    for model in SEARCHABLE_MODELS:
+        with db.engine.begin() as conn:
+            if install_search_index(conn, model):
+                created.append(f'{model.__tablename__} search index')
+    return created
+
+def backfill_created_at():
+    """Give rows from before a created_at column existed a timestamp, so keyset pages
+    sorted on (created_at, id) reach them. Uses updated_at where there is one.
+    """
+    for table in db.metadata.sorted_tables:
+        if 'created_at' not in table.c:
+            continue
+        fallback = table.c.updated_at if 'updated_at' in table.c else None
+        with db.engine.begin() as conn:
+            conn.execute(table.update()
+                         .where(table.c.created_at.is_(None))
+                         .values(created_at=func.coalesce(fallback, func.current_timestamp())))
+
+def normalize_booking_times():
+    """Zero-pad legacy booking times ('9:00' -> '09:00'); schedule_clash compares them as text.
+    The dedup_key of every rewritten row is rebuilt from the padded time; a row whose new
+    key another booking already holds is a duplicate and keeps a NULL key, as in
+    backfill_booking_dedup_keys. Returns the number of rows rewritten.
+    """
+    table = Booking.__table__
+    rows = db.session.query(Booking.id, Booking.name, Booking.date, Booking.time, Booking.service) \
+        .filter(func.length(Booking.time) != 5).order_by(Booking.id).all()
+    changes = []
+    for row in rows:
+        normalized = Booking.normalize_time(row.time)
+        if normalized != row.time:
+            changes.append((row.id, normalized, Booking.make_dedup_key(row.name, row.date, normalized, row.service)))
+    if not changes:
+        return 0
+    taken = {key for (key,) in db.session.query(Booking.dedup_key)
+             .filter(Booking.dedup_key.in_({key for _, _, key in changes}))}
+    updates = []
+    for booking_id, normalized, key in changes:
+        if key in taken:
+            key = None
+        else:
+            taken.add(key)
+        updates.append({'b_id': booking_id, 'b_time': normalized, 'b_key': key})
+    db.session.execute(
+        table.update().where(table.c.id == bindparam('b_id'))
+        .values(time=bindparam('b_time'), dedup_key=bindparam('b_key')),
+        updates
+    )
+    db.session.commit()
+    return len(updates)
+
+def drop_duplicate_pricing_rows():
+    """Keep the first service_pricing row per (category, type) - the one the catalog serves"""
+    keep = db.session.query(func.min(ServicePricing.id)) \
+        .group_by(ServicePricing.service_category, ServicePricing.service_type)
+    removed = ServicePricing.query.filter(ServicePricing.id.notin_(keep)).delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+# Run before creating an index that existing rows could violate
+PRE_INDEX_MIGRATIONS = {
+    'uq_service_pricing_category_type': drop_duplicate_pricing_rows,
+}
+
+# Legacy decimal money columns, each replaced by an integer <name>_cents column
+LEGACY_MONEY_COLUMNS = {
+    'service_pricing': ['provider_base_price', 'customer_display_price',
+                        'color_surcharge_provider', 'color_surcharge_customer'],
+    'service_request': ['total_customer_paid', 'total_provider_payout', 'total_commission_earned'],
+    'service_request_item': ['customer_price', 'provider_price', 'commission'],
+    'daily_revenue_rollup': ['customer_paid', 'provider_payout', 'commission'],
+}
+
+def migrate_money_to_cents():
+    """Copy legacy decimal money columns into their *_cents columns (one UPDATE per
+    table) and drop them. Returns the legacy columns migrated; a no-op once done.
+    """
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    migrated = []
+    for table_name, legacy in LEGACY_MONEY_COLUMNS.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table_name)}
+        legacy = [name for name in legacy if name in existing]
+        if not legacy:
+            continue
+        table = preparer.quote(table_name)
+        with db.engine.begin() as conn:
+            conn.execute(text('UPDATE {} SET {}'.format(table, ', '.join(
+                f'{name}_cents = CAST(ROUND({name} * 100) AS BIGINT)' for name in legacy))))
+            for name in legacy:
+                conn.execute(text(f'ALTER TABLE {table} DROP COLUMN {name}'))
+        migrated.extend(f'{table_name}.{name} -> {name}_cents' for name in legacy)
+    return migrated
+
+def backfill_booking_dedup_keys(batch_size=1000):
+    """Fill Booking.dedup_key for rows that lack one, in id order and batches.
+    A row whose key is already taken by an earlier booking is a duplicate and
+    keeps a NULL key. Returns (keys_filled, duplicates_found).
+    """
+    table = Booking.__table__
+    last_id = 0
+    filled = duplicates = 0
+    while True:
+        batch = db.session.query(Booking.id, Booking.name, Booking.date, Booking.time, Booking.service) \
+            .filter(Booking.dedup_key.is_(None), Booking.id > last_id) \
+            .order_by(Booking.id).limit(batch_size).all()
+        if not batch:
+            return filled, duplicates
+        last_id = batch[-1].id
+        keys = {row.id: Booking.make_dedup_key(row.name, row.date, row.time, row.service) for row in batch}
+        taken = {key for (key,) in db.session.query(Booking.dedup_key)
+                 .filter(Booking.dedup_key.in_(set(keys.values())))}
+        updates = []
+        for booking_id, key in keys.items():
+            if key in taken:
+                duplicates += 1
+            else:
+                taken.add(key)
+                updates.append({'b_id': booking_id, 'b_key': key})
+        if updates:
+            db.session.execute(
+                table.update().where(table.c.id == bindparam('b_id')).values(dedup_key=bindparam('b_key')),
+                updates
+            )
+        db.session.commit()
+        filled += len(updates)
+
+def backfill_service_request_items(batch_size=500):
+    """Populate service_request_item from selected_items for requests that have no
+    item rows yet. Works through the table in request_id order, one bulk INSERT and
+    commit per batch. Returns the number of requests backfilled.
+    """
+    last_id = 0
+    backfilled = 0
+    has_items = db.session.query(ServiceRequestItem.id) \
+        .filter(ServiceRequestItem.request_id == ServiceRequest.request_id).exists()
+    while True:
+        batch = db.session.query(ServiceRequest.request_id, ServiceRequest.selected_items) \
+            .filter(ServiceRequest.request_id > last_id, ~has_items) \
+            .order_by(ServiceRequest.request_id).limit(batch_size).all()
+        if not batch:
+            return backfilled
+        last_id = batch[-1].request_id
+        rows = []
+        for request_id, selected_items in batch:
+            rows.extend(ServiceRequestItem.rows_for(request_id, json.loads(selected_items or '[]')))
+        if rows:
+            db.session.execute(ServiceRequestItem.__table__.insert(), rows)
+        db.session.commit()
+        backfilled += len(batch)
+
+# ========== KEYSET PAGINATION ==========
+
+class InvalidCursor(ValueError):
+    pass
+
+@app.errorhandler(InvalidCursor)
+def handle_invalid_cursor(e):
+    return jsonify({'error': str(e) or 'Invalid cursor'}), 400
+
+def encode_cursor(values):
+    """Opaque cursor for the last row of a page: urlsafe base64 of the sort key values"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def _cursor_value(column, value):
+    """A decoded cursor value as the column's Python type; ValueError if it is not one"""
+    if isinstance(column.type, db.DateTime):
+        return datetime.fromisoformat(value)
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if isinstance(value, bool) or value is None or isinstance(value, (list, dict)):
+        raise ValueError
+    if python_type is float and isinstance(value, int):
+        return float(value)
+    if python_type is not None and not isinstance(value, python_type):
+        raise ValueError
+    return value
+
+def decode_cursor(cursor, sort_columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(sort_columns):
+            raise ValueError
+        return [_cursor_value(column, v) for column, v in zip(sort_columns, values)]
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+def _keyset_after(sort_columns, values):
+    """Rows strictly after `values` in descending (col1, col2, ...) order"""
+    column, value = sort_columns[0], values[0]
+    if len(sort_columns) == 1:
+        return column < value
+    return or_(column < value, and_(column == value, _keyset_after(sort_columns[1:], values[1:])))
+
+def _keyset_query(query, sort_columns, cursor, limit):
+    query = query.order_by(None)
+    if cursor:
+        query = query.filter(_keyset_after(sort_columns, decode_cursor(cursor, sort_columns)))
+    return query.order_by(*[column.desc() for column in sort_columns]).limit(limit)
+
+def _page_limit():
+    limit = request.args.get('limit', type=int)
+    return min(max(limit or app.config['DEFAULT_PAGE_SIZE'], 1), app.config['MAX_PAGE_SIZE'])
+
+def paginate(query, sort_columns, cursor_values=None):
+    """Keyset pagination driven by the ?limit= and ?cursor= query parameters.
+
+    Pages are ordered newest first by `sort_columns` (e.g. created_at, id), which
+    must be backed by a matching index so every page is an index range scan.
+    Returns (rows, next_cursor). Without either parameter the query is returned
+    in full, exactly as before, so existing clients are unaffected.
+    `cursor_values(row)` gives the sort key of a row that is not a plain model instance.
+    """
+    cursor = request.args.get('cursor')
+    if 'limit' not in request.args and not cursor:
+        return query.all(), None
+
+    limit = _page_limit()
+    rows = _keyset_query(query, sort_columns, cursor, limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    if cursor_values:
+        return rows, encode_cursor(cursor_values(rows[-1]))
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in sort_columns])
+
+def page_response(rows, next_cursor, serialize=None):
+    """JSON list response; the next page is advertised in X-Next-Cursor and Link headers"""
+    serialize = serialize or serialize_row
+    response = jsonify([serialize(row) for row in rows])
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
+
+# ========== STREAMING RESPONSES ==========
+
+def requested_stream_format():
+    """'json' or 'ndjson' when the client asked for a streamed collection, else None.
+    Chosen with ?stream=json|ndjson, or an Accept: application/x-ndjson header.
+    """
+    stream = request.args.get('stream')
+    if stream:
+        return 'ndjson' if stream.lower() == 'ndjson' else 'json'
+    if request.accept_mimetypes.best == 'application/x-ndjson':
+        return 'ndjson'
+    return None
+
+def stream_response(query, stream_format, serialize=None):
+    """Stream a query as a JSON array or as NDJSON (one object per line).
+    Rows are fetched `STREAM_BATCH_SIZE` at a time (a server-side cursor on
+    Postgres) and each batch is written out as soon as it is serialized, so
+    memory stays flat and the first bytes leave before the query is exhausted.
+    """
+    serialize = serialize or serialize_row
+    batch_size = app.config['STREAM_BATCH_SIZE']
+    rows = query.execution_options(stream_results=True, max_row_buffer=batch_size).yield_per(batch_size)
+    dumps = lambda obj: app.json.dumps(obj, separators=(',', ':'))
+
+    def generate():
+        separator = '\n' if stream_format == 'ndjson' else ','
+        if stream_format == 'json':
+            yield '['
+        buffer = []
+        first = True
+        for row in rows:
+            buffer.append(dumps(serialize(row)))
+            if len(buffer) >= batch_size:
+                yield ('' if first else separator) + separator.join(buffer)
+                first = False
+                buffer = []
+        if buffer:
+            yield ('' if first else separator) + separator.join(buffer)
+            first = False
+        if stream_format == 'json':
+            yield ']'
+        elif not first:
+            yield '\n'
+
+    mimetype = 'application/x-ndjson' if stream_format == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+# ========== CONDITIONAL GET ==========
+
+def conditional_response(etag, build, cache_control):
+    """Answer 304 Not Modified when If-None-Match carries `etag`; otherwise call
+    build() for the full response. Either way the strong ETag and Cache-Control
+    headers are set. `etag` must be derived from data versions, not from the body,
+    so the 304 path never touches the rows or the serializer.
+    """
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept')
+    return response
+
+def pricing_etag():
+    pricing_catalog.refresh()
+    return f'pricing-v{pricing_catalog.version}'
+
+def pricing_cache_control():
+    max_age = app.config['PRICING_MAX_AGE']
+    return f'public, max-age={max_age}, stale-while-revalidate={max_age * 5}'
+
+def providers_etag():
+    """Changes whenever a provider is created, updated or deleted"""
+    count, max_id, last_update = db.session.query(
+        func.count(ServiceProvider.id), func.max(ServiceProvider.id), func.max(ServiceProvider.updated_at)
+    ).one()
+    stamp = last_update.strftime('%Y%m%d%H%M%S%f') if isinstance(last_update, datetime) else last_update
+    return f'providers-{count}-{max_id or 0}-{stamp or 0}'
+
+def list_response(query, sort_columns, serialize=None):
+    """Serve a collection endpoint as a full list, a keyset page (?limit=/?cursor=)
+    or a stream (?stream=json|ndjson). `sort_columns` are the indexed keyset columns.
+    Rows are limited to the ?fields= columns unless a custom `serialize` is given.
+    """
+    if serialize is None:
+        model = sort_columns[0].class_
+        fields = requested_fields(model)
+        query = project_fields(query, model, fields, sort_columns)
+        serialize = row_serializer(model, fields)
+    stream_format = requested_stream_format()
+    if stream_format:
+        cursor = request.args.get('cursor')
+        if 'limit' in request.args or cursor:
+            query = _keyset_query(query, sort_columns, cursor, _page_limit())
+        return stream_response(query, stream_format, serialize)
+    rows, next_cursor = paginate(query, sort_columns)
+    return page_response(rows, next_cursor, serialize)
+
+# ========== SPARSE FIELDSETS ==========
+# ?fields=a,b picks the to_dict() fields a list or detail endpoint returns. Only
+# the columns behind them (plus the primary key and keyset columns) are fetched,
+# and the compiled serializer for that subset skips every other conversion.
+
+class InvalidFields(ValueError):
+    pass
+
+@app.errorhandler(InvalidFields)
+def handle_invalid_fields(e):
+    return jsonify({'error': str(e)}), 400
+
+def requested_fields(model):
+    """Tuple of field names from ?fields=, or None when the parameter is absent"""
+    raw = request.args.get('fields')
+    if raw is None:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    if not fields:
+        raise InvalidFields('fields must name at least one field')
+    known = serializer_fields(model)
+    unknown = [name for name in fields if name not in known]
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(known)}")
+    return fields
+
+def project_fields(query, model, fields, extra_columns=()):
+    """Load only the columns behind `fields`, plus any of `extra_columns` (e.g. keyset
+    sort columns) that belong to `model`; the primary key is always loaded"""
+    if fields is None:
+        return query
+    spec = serializer_fields(model)
+    keys = dict.fromkeys([spec[name][0] for name in fields] +
+                         [column.key for column in extra_columns if getattr(column, 'class_', None) is model])
+    return query.options(load_only(*[getattr(model, key) for key in keys]))
+
+def pick_fields(items, fields):
+    """Limit already-serialized dicts (e.g. the cached pricing catalog) to `fields`"""
+    if fields is None:
+        return items
+    return [{name: item[name] for name in fields} for item in items]
+
+def fields_etag(etag, fields):
+    """A representation limited by ?fields= needs its own strong ETag"""
+    return f"{etag}-fields-{'.'.join(fields)}" if fields else etag
+
+def detail_response(model, ident):
+    """One row as JSON (404 when missing), limited to the ?fields= columns"""
+    fields = requested_fields(model)
+    row = project_fields(model.query, model, fields).get_or_404(ident)
+    return jsonify(row_serializer(model, fields)(row))
+
+# ========== FULL-TEXT SEARCH ==========
+# Models list their searchable text columns in __search_columns__. SQLite keeps an
+# external-content FTS5 table (<table>_fts) in sync with triggers; Postgres uses a
+# GIN index over the same to_tsvector() expression the queries filter on, which
+# the database maintains on every insert and update. Other databases fall back to LIKE.
+
+SEARCHABLE_MODELS = []
+SEARCH_MAX_TERMS = 10
+
+def _search_document(columns):
+    """to_tsvector('simple', coalesce(a, '') || ' ' || coalesce(b, '') ...)"""
+    document = None
+    for column in columns:
+        part = func.coalesce(column, literal_column("''"))
+        document = part if document is None else document.op('||')(literal_column("' '")).op('||')(part)
+    return func.to_tsvector(literal_column("'simple'"), document)
+
+def _search_index_statements(model, dialect_name):
+    """(existence check, DDL statements) for a model's search index"""
+    table = model.__tablename__
+    pk = inspect(model).primary_key[0].name
+    columns = model.__search_columns__
+    if dialect_name == 'sqlite':
+        fts = f'{table}_fts'
+        cols = ', '.join(columns)
+        new_cols = ', '.join(f'new.{c}' for c in columns)
+        old_cols = ', '.join(f'old.{c}' for c in columns)
+        insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new_cols});"
+        delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old_cols});"
+        return (
+            f"SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = '{fts}'",
+            [
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='{pk}')",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} "
+                f"BEGIN {delete_old} {insert_new} END",
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            ]
+        )
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects import postgresql
+        document = _search_document([literal_column(c) for c in columns])
+        expression = document.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True})
+        return (
+            f"SELECT 1 FROM pg_indexes WHERE indexname = 'ix_{table}_search'",
+            [f"CREATE INDEX ix_{table}_search ON {table} USING gin ({expression})"]
+        )
+    return None, []
+
+def install_search_index(connection, model):
+    """Create (and populate) a model's search index if it is missing. Returns True if created."""
+    exists_sql, statements = _search_index_statements(model, connection.dialect.name)
+    if not statements or connection.execute(text(exists_sql)).first():
+        return False
+    for statement in statements:
+        connection.execute(text(statement))
+    return True
+
+def searchable(model):
+    """Register a model for full-text search; its index follows the table's create/drop"""
+    SEARCHABLE_MODELS.append(model)
+    event.listen(model.__table__, 'after_create',
+                 lambda target, connection, **kw: install_search_index(connection, model))
+    event.listen(model.__table__, 'before_drop',
+                 lambda target, connection, **kw: connection.dialect.name == 'sqlite' and
+                 connection.execute(text(f'DROP TABLE IF EXISTS {model.__tablename__}_fts')))
+    return model
+
+for _model in (ServiceRequest, Customer, Complaint):
+    searchable(_model)
+
+def search_terms(search):
+    return re.findall(r'\w+', search or '')[:SEARCH_MAX_TERMS]
+
+def search_hits(model, terms):
+    """Subquery of (rowid, score) for rows matching every term as a prefix;
+    a higher score is a better match."""
+    pk = inspect(model).primary_key[0]
+    dialect_name = db.engine.dialect.name
+    if dialect_name == 'sqlite':
+        fts = literal_column(f'{model.__tablename__}_fts')
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return select(literal_column('rowid').label('rowid'), (-func.bm25(fts)).label('score')) \
+            .select_from(text(f'{model.__tablename__}_fts')) \
+            .where(fts.op('MATCH')(match))
+    columns = [getattr(model, c) for c in model.__search_columns__]
+    if dialect_name == 'postgresql':
+        document = _search_document(columns)
+        query = func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{term}:*' for term in terms))
+        return select(pk.label('rowid'), func.ts_rank(document, query).label('score')) \
+            .where(document.op('@@')(query))
+    return select(pk.label('rowid'), literal(0.0).label('score')) \
+        .where(and_(*[or_(*[column.contains(term) for column in columns]) for term in terms]))
+
+def search_response(query, model, search, exact_id=None):
+    """Ranked full-text results for `search`, best match first, with the same
+    ?limit=/?cursor= keyset pagination as the other list endpoints.
+    `exact_id` is a primary key that, when it exists, ranks above every text match.
+    """
+    terms = search_terms(search)
+    pk = inspect(model).primary_key[0]
+    fields = requested_fields(model)
+    if not terms and exact_id is None:
+        return page_response([], None)
+    parts = [search_hits(model, terms)] if terms else []
+    if exact_id is not None:
+        parts.append(select(pk.label('rowid'), literal(1e12).label('score')).where(pk == exact_id))
+    if len(parts) == 1:
+        hits = parts[0].subquery()
+    else:
+        union = parts[0].union_all(*parts[1:]).subquery()
+        hits = select(union.c.rowid, func.max(union.c.score).label('score')) \
+            .group_by(union.c.rowid).subquery()
+    query = project_fields(query, model, fields) \
+        .join(hits, pk == hits.c.rowid).add_columns(hits.c.score) \
+        .order_by(hits.c.score.desc(), pk.desc())
+    rows, next_cursor = paginate(query, [hits.c.score, pk],
+                                 cursor_values=lambda row: [row.score, getattr(row[0], pk.key)])
+    return page_response([row[0] for row in rows], next_cursor, row_serializer(model, fields))
+
+# ========== IDEMPOTENCY KEYS ==========
+
+_last_idempotency_purge = 0.0
+
+def purge_idempotency_keys():
+    """Delete expired idempotency keys; returns the number removed"""
+    removed = IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+def _maybe_purge_idempotency_keys():
+    """Opportunistic purge, at most once per IDEMPOTENCY_PURGE_INTERVAL per process"""
+    global _last_idempotency_purge
+    now = time.monotonic()
+    if now - _last_idempotency_purge < app.config['IDEMPOTENCY_PURGE_INTERVAL']:
+        return
+    _last_idempotency_purge = now
+    try:
+        purge_idempotency_keys()
+    except Exception as e:
+        db.session.rollback()
+        print('Idempotency key purge failed:', e)
+
+def _claim_idempotency_key(key, endpoint, request_hash, attempts=3):
+    """Reserve `key` for this request. Returns (True, None) when reserved, otherwise
+    (False, row) with the live IdempotencyKey row that holds it. If the holder's row
+    is gone by the time it is read (released or purged), the claim is tried again;
+    after `attempts` tries it gives up with (False, None) rather than proceed unreserved.
+    """
+    for _ in range(attempts):
+        now = datetime.utcnow()
+        lock_until = now + timedelta(seconds=app.config['IDEMPOTENCY_LOCK_SECONDS'])
+        # Take over an expired row in place, so the purge is never a prerequisite
+        taken_over = db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.expires_at < now)
+            .values(endpoint=endpoint, request_hash=request_hash, status_code=None,
+                    response_body=None, created_at=now, expires_at=lock_until)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not taken_over:
+            db.session.add(IdempotencyKey(key=key, endpoint=endpoint, request_hash=request_hash,
+                                          created_at=now, expires_at=lock_until))
+        try:
+            db.session.commit()
+            return True, None
+        except IntegrityError:
+            db.session.rollback()
+            existing = db.session.get(IdempotencyKey, key)
+            if existing is not None:
+                return False, existing
+    return False, None
+
+def idempotent(view):
+    """Honour an Idempotency-Key header on a POST endpoint.
+    The first request reserves the key and runs the view; a successful response is
+    stored and replayed verbatim to retries within IDEMPOTENCY_TTL_SECONDS, so they
+    cost one primary-key lookup and repeat none of the work or emails. Failed
+    responses release the key so the client can retry for real.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), 400
+
+        endpoint = request.endpoint
+        request_hash = hashlib.sha256(request.get_data()).hexdigest()
+        claimed, existing = _claim_idempotency_key(key, endpoint, request_hash)
+        if not claimed:
+            if existing is None:
+                return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409
+            if existing.endpoint != endpoint or existing.request_hash != request_hash:
+                return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+            if existing.status_code is None:
+                return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409
+            response = Response(existing.response_body, status=existing.status_code, mimetype='application/json')
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            IdempotencyKey.query.filter_by(key=key).delete(synchronize_session=False)
+            db.session.commit()
+            raise
+        db.session.rollback()
+        stored = IdempotencyKey.query.filter_by(key=key)
+        if 200 <= response.status_code < 300:
+            stored.update({
+                'status_code': response.status_code,
+                'response_body': response.get_data(as_text=True),
+                'expires_at': datetime.utcnow() + timedelta(seconds=app.config['IDEMPOTENCY_TTL_SECONDS'])
+            }, synchronize_session=False)
+        else:
+            stored.delete(synchronize_session=False)
+        db.session.commit()
+        _maybe_purge_idempotency_keys()
+        return response
+    return wrapper
+
 @app.route('/api/health')
 def health_check():
     return jsonify({'status': 'healthy', 'message': 'House Hero Backend is running!'})
@@ -380,88 +1703,90 @@ def login():
     return jsonify({'error': 'Invalid email or password'}), 401
 
 @app.route('/api/bookings', methods=['POST'])
+@idempotent
 def create_booking():
     data = request.get_json()
-    # Improved duplicate check: case-insensitive, trimmed
-    existing = Booking.query.filter(
-        func.lower(func.trim(Booking.name)) == data.get('name', '').strip().lower(),
-        Booking.date == data.get('date'),
-        Booking.time == data.get('time'),
-        func.lower(func.trim(Booking.service)) == data.get('service', '').strip().lower()
-    ).first()
-    if existing:
-        return jsonify({'error': 'Duplicate booking detected'}), 409
+    booking_time = Booking.normalize_time(data.get('time'))
     booking = Booking(
         name=data.get('name'),
         address=data.get('address'),
         date=data.get('date'),
-        time=data.get('time'),
+        time=booking_time,
         service=data.get('service'),
         details=data.get('details'),
         status=data.get('status', 'pending'),
-        amount=float(data.get('amount', 0.0))
+        amount=float(data.get('amount', 0.0)),
+        # Duplicate check: case-insensitive, trimmed - enforced by the unique index
+        dedup_key=Booking.make_dedup_key(data.get('name'), data.get('date'), booking_time, data.get('service'))
     )
     db.session.add(booking)
-    db.session.commit()
-    # Try sending customer and admin notifications
     try:
-        ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL')
-        EMAIL_FROM = os.environ.get('EMAIL_FROM')
-
-        # Customer email (if provided in request payload)
-        customer_email = data.get('email')
-        customer_name = data.get('name')
-
-        if customer_email:
-            cust_subject = 'Your service request has been received - HomeSwift'
-            cust_body = (
-                f"Hi {customer_name},\n\n"
-                "Thank you for booking with HomeSwift!\n\n"
-                "Your Request Details:\n"
-                f"- Service Type: {data.get('service')}\n"
-                f"- Date: {data.get('date')}\n"
-                f"- Location: {data.get('address')}\n"
-                "- Status: Pending Confirmation\n\n"
-                "We're finding the best provider for you and will confirm within 2 hours.\n\n"
-                f"Request ID: {booking.id}\n\n"
-                "Questions? Reply to this email.\n\n"
-                "- HomeSwift Team"
-            )
-            send_email(customer_email, cust_subject, cust_body, reply_to=EMAIL_FROM)
-
-        # Admin notification
-        if ADMIN_EMAIL:
-            admin_subject = f"NEW BOOKING: {data.get('service')} - {data.get('address')}"
-            admin_body = (
-                "New service request received!\n\n"
-                f"Customer: {data.get('name')}\n"
-                f"Phone: {data.get('phone')}\n"
-                f"Email: {data.get('email')}\n"
-                f"Service: {data.get('service')}\n"
-                f"Date: {data.get('date')}\n"
-                f"Time: {data.get('time')}\n"
-                f"Address: {data.get('address')}\n"
-                f"Description: {data.get('details')}\n"
-                f"Priority: {data.get('priority_level', 'normal')}\n\n"
-                f"Request ID: {booking.id}\n\n"
-                "ACTION REQUIRED: Assign a provider and confirm booking."
-            )
-            send_email(ADMIN_EMAIL, admin_subject, admin_body, reply_to=EMAIL_FROM)
-    except Exception as e:
-        print('Error sending booking emails:', e)
+        db.session.flush()
+    except IntegrityError as e:
+        db.session.rollback()
+        if 'dedup_key' not in str(e.orig):
+            raise
+        return jsonify({'error': 'Duplicate booking detected'}), 409
+
+    # Queue customer and admin notifications in the same transaction as the booking
+    ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL')
+    EMAIL_FROM = os.environ.get('EMAIL_FROM')
+
+    # Customer email (if provided in request payload)
+    customer_email = data.get('email')
+    customer_name = data.get('name')
+
+    if customer_email:
+        cust_subject = 'Your service request has been received - HomeSwift'
+        cust_body = (
+            f"Hi {customer_name},\n\n"
+            "Thank you for booking with HomeSwift!\n\n"
+            "Your Request Details:\n"
+            f"- Service Type: {data.get('service')}\n"
+            f"- Date: {data.get('date')}\n"
+            f"- Location: {data.get('address')}\n"
+            "- Status: Pending Confirmation\n\n"
+            "We're finding the best provider for you and will confirm within 2 hours.\n\n"
+            f"Request ID: {booking.id}\n\n"
+            "Questions? Reply to this email.\n\n"
+            "- HomeSwift Team"
+        )
+        queue_email(customer_email, cust_subject, cust_body, reply_to=EMAIL_FROM)
+
+    # Admin notification
+    if ADMIN_EMAIL:
+        admin_subject = f"NEW BOOKING: {data.get('service')} - {data.get('address')}"
+        admin_body = (
+            "New service request received!\n\n"
+            f"Customer: {data.get('name')}\n"
+            f"Phone: {data.get('phone')}\n"
+            f"Email: {data.get('email')}\n"
+            f"Service: {data.get('service')}\n"
+            f"Date: {data.get('date')}\n"
+            f"Time: {data.get('time')}\n"
+            f"Address: {data.get('address')}\n"
+            f"Description: {data.get('details')}\n"
+            f"Priority: {data.get('priority_level', 'normal')}\n\n"
+            f"Request ID: {booking.id}\n\n"
+            "ACTION REQUIRED: Assign a provider and confirm booking."
+        )
+        queue_email(ADMIN_EMAIL, admin_subject, admin_body, reply_to=EMAIL_FROM)
+
+    db.session.commit()
 
     return jsonify({'message': 'Booking created', 'booking': booking.to_dict()}), 201
 
 @app.route('/api/bookings', methods=['GET'])
 def get_bookings():
-    bookings = Booking.query.all()
-    return jsonify([b.to_dict() for b in bookings])
+    return list_response(Booking.query, [Booking.created_at, Booking.id])
 
 @app.route('/api/bookings/<int:booking_id>', methods=['PATCH'])
 def update_booking(booking_id):
     booking = Booking.query.get_or_404(booking_id)
     data = request.get_json()
     if 'status' in data:
+        move_job_counters((booking.assigned_provider_id, booking.status),
+                          (booking.assigned_provider_id, data['status']))
         booking.status = data['status']
     db.session.commit()
     return jsonify({'message': 'Booking updated', 'booking': booking.to_dict()})
@@ -469,6 +1794,7 @@ def update_booking(booking_id):
 @app.route('/api/bookings/<int:booking_id>', methods=['DELETE'])
 def delete_booking(booking_id):
     booking = Booking.query.get_or_404(booking_id)
+    move_job_counters((booking.assigned_provider_id, booking.status), (None, None))
     db.session.delete(booking)
     db.session.commit()
     return jsonify({'message': 'Booking deleted'})
@@ -505,8 +1831,10 @@ def create_complaint():
 
 @app.route('/api/complaints', methods=['GET'])
 def get_complaints():
-    complaints = Complaint.query.all()
-    return jsonify([c.to_dict() for c in complaints])
+    search = request.args.get('search')
+    if search:
+        return search_response(Complaint.query, Complaint, search)
+    return list_response(Complaint.query, [Complaint.created_at, Complaint.id])
 
 @app.route('/api/complaints/<int:complaint_id>', methods=['PATCH'])
 def update_complaint(complaint_id):
@@ -532,8 +1860,7 @@ def update_complaint(complaint_id):
 
 @app.route('/api/complaints/<int:complaint_id>', methods=['GET'])
 def get_complaint(complaint_id):
-    complaint = Complaint.query.get_or_404(complaint_id)
-    return jsonify(complaint.to_dict())
+    return detail_response(Complaint, complaint_id)
 
 @app.route('/api/complaints/<int:complaint_id>', methods=['DELETE'])
 def delete_complaint(complaint_id):
@@ -544,8 +1871,8 @@ def delete_complaint(complaint_id):
 
 @app.route('/api/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    # Users have no creation timestamp; ids are assigned in creation order
+    return list_response(User.query, [User.id])
 
 @app.route('/api/users/<int:user_id>', methods=['PATCH'])
 def update_user(user_id):
@@ -592,49 +1919,59 @@ def create_provider():
         experience_years=data.get('experience_years', 0),
         hourly_rate=float(data.get('hourly_rate', 0.0)),
         rating=float(data.get('rating', 0.0)),
-        total_bookings=data.get('total_bookings', 0),
         status=data.get('status', 'active'),
         registered=datetime.now().strftime('%Y-%m-%d')
     )
+    set_location(provider, provider.address)
     db.session.add(provider)
     db.session.commit()
+    provider_matcher.invalidate()
     return jsonify({'message': 'Provider created', 'provider': provider.to_dict()}), 201
 
 @app.route('/api/providers', methods=['GET'])
 def get_providers():
-    providers = ServiceProvider.query.all()
-    return jsonify([p.to_dict() for p in providers])
+    # Provider records carry contact details, so only the browser may cache them,
+    # and it must revalidate (cheaply, via the ETag) on every use
+    return conditional_response(
+        fields_etag(providers_etag(), requested_fields(ServiceProvider)),
+        lambda: list_response(ServiceProvider.query, [ServiceProvider.created_at, ServiceProvider.id]),
+        'private, no-cache'
+    )
 
 @app.route('/api/providers/<int:provider_id>', methods=['GET'])
 def get_provider(provider_id):
     """Get a specific provider by ID"""
-    provider = ServiceProvider.query.get_or_404(provider_id)
-    return jsonify(provider.to_dict())
+    return detail_response(ServiceProvider, provider_id)
 
 @app.route('/api/providers/<int:provider_id>', methods=['PATCH'])
 def update_provider(provider_id):
     provider = ServiceProvider.query.get_or_404(provider_id)
     data = request.get_json()
     
-    # Update fields if provided
+    # Update fields if provided. Job counters are not editable here: they are kept
+    # by move_job_counters and corrected with reconcile_counters
     updateable_fields = [
         'name', 'service_type', 'phone', 'email', 'address', 
-        'experience_years', 'hourly_rate', 'rating', 'total_bookings', 'status'
+        'experience_years', 'hourly_rate', 'rating', 'status'
     ]
     
     for field in updateable_fields:
         if field in data and data[field] is not None:
-            if field in ['experience_years', 'total_bookings']:
+            if field == 'experience_years':
                 setattr(provider, field, int(data[field]))
             elif field in ['hourly_rate', 'rating']:
                 setattr(provider, field, float(data[field]))
             else:
                 setattr(provider, field, data[field])
     
+    if 'address' in data:
+        set_location(provider, provider.address)
+
     # Update the updated_at timestamp
     provider.updated_at = datetime.utcnow()
     
     db.session.commit()
+    provider_matcher.invalidate()
     return jsonify({'message': 'Provider updated', 'provider': provider.to_dict()})
 
 @app.route('/api/providers/<int:provider_id>', methods=['DELETE'])
@@ -642,12 +1979,13 @@ def delete_provider(provider_id):
     provider = ServiceProvider.query.get_or_404(provider_id)
     db.session.delete(provider)
     db.session.commit()
+    provider_matcher.invalidate()
     return jsonify({'message': 'Provider deleted'})
 
 @app.route('/api/bookings/<int:booking_id>/assign', methods=['POST'])
 def assign_provider(booking_id):
     """Assign a provider to a booking and notify provider + customer.
-    Body: { provider_id: int, priority_level?: str, estimated_price?: float }
+    Body: { provider_id: int, priority_level?: str, estimated_price?: float, allow_conflict?: bool }
     """
     booking = Booking.query.get_or_404(booking_id)
     data = request.get_json()
@@ -656,6 +1994,17 @@ def assign_provider(booking_id):
         return jsonify({'error': 'provider_id required'}), 400
     provider = ServiceProvider.query.get_or_404(provider_id)
 
+    # Refuse to double-book the provider unless the admin explicitly allows it
+    try:
+        booking_day = datetime.strptime(booking.date, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        booking_day = None
+    conflicts = schedule_conflicts(provider.id, booking_day, booking.time, exclude=('booking', booking.id))
+    if conflicts and not data.get('allow_conflict'):
+        return jsonify({'error': 'Provider already has a job at that time',
+                        'conflicts': [job_dict(job) for job in conflicts]}), 409
+
+    move_job_counters((booking.assigned_provider_id, booking.status), (provider.id, 'confirmed'))
     booking.assigned_provider_id = provider.id
     booking.provider_name = provider.name
     booking.provider_email = provider.email
@@ -663,85 +2012,538 @@ def assign_provider(booking_id):
     booking.priority_level = data.get('priority_level')
     booking.estimated_price = float(data.get('estimated_price')) if data.get('estimated_price') else None
     booking.status = 'confirmed'
-    db.session.commit()
 
     # Notify provider
-    try:
-        EMAIL_FROM = os.environ.get('EMAIL_FROM')
-        provider_subject = f"New Job Assignment - HomeSwift - {booking.date}"
-        provider_body = (
-            f"Hi {provider.name},\n\n"
-            "You have a new job assignment!\n\n"
-            "Job Details:\n"
-            f"- Service: {booking.service} - {booking.cleaning_type or ''}\n"
+    EMAIL_FROM = os.environ.get('EMAIL_FROM')
+    provider_subject = f"New Job Assignment - HomeSwift - {booking.date}"
+    provider_body = (
+        f"Hi {provider.name},\n\n"
+        "You have a new job assignment!\n\n"
+        "Job Details:\n"
+        f"- Service: {booking.service} - {booking.cleaning_type or ''}\n"
+        f"- Date: {booking.date}\n"
+        f"- Time: {booking.time}\n"
+        f"- Location: {booking.address}\n"
+        f"- Customer: {booking.name} - {getattr(booking, 'phone', '')}\n\n"
+        "Job Description:\n"
+        f"{booking.details}\n\n"
+        f"Priority: {booking.priority_level or 'normal'}\n\n"
+        "PLEASE CONFIRM:\n"
+        f"Reply to this email or call {EMAIL_FROM} to confirm you can take this job.\n\n"
+        f"Customer expects you at {booking.time} on {booking.date}.\n\n"
+        f"Job ID: {booking.id}"
+    )
+    queue_email(provider.email, provider_subject, provider_body)
+
+    # Notify customer (if email present)
+    customer_email = data.get('customer_email') or data.get('email')
+    if customer_email:
+        cust_subject = 'Your service is confirmed! - HomeSwift'
+        cust_body = (
+            f"Hi {booking.name},\n\n"
+            "Great news! Your service has been confirmed.\n\n"
+            "Booking Details:\n"
+            f"- Service: {booking.service}\n"
             f"- Date: {booking.date}\n"
             f"- Time: {booking.time}\n"
-            f"- Location: {booking.address}\n"
-            f"- Customer: {booking.name} - {getattr(booking, 'phone', '')}\n\n"
-            "Job Description:\n"
-            f"{booking.details}\n\n"
-            f"Priority: {booking.priority_level or 'normal'}\n\n"
-            "PLEASE CONFIRM:\n"
-            f"Reply to this email or call {EMAIL_FROM} to confirm you can take this job.\n\n"
-            f"Customer expects you at {booking.time} on {booking.date}.\n\n"
-            f"Job ID: {booking.id}"
+            f"- Provider: {provider.name}\n"
+            f"- Provider Contact: {provider.phone}\n\n"
+            f"Your provider will arrive at the scheduled time.\n\n"
+            f"Estimated Price: R{booking.estimated_price or 'TBD'}\n\n"
+            "Need to reschedule? Reply to this email or call us.\n\n"
+            f"Request ID: {booking.id}\n\n"
+            "- HomeSwift Team"
         )
-        send_email(provider.email, provider_subject, provider_body)
-    except Exception as e:
-        print('Error sending provider email:', e)
+        queue_email(customer_email, cust_subject, cust_body)
 
-    # Notify customer (if email present)
-    try:
-        customer_email = data.get('customer_email') or data.get('email')
-        if customer_email:
-            cust_subject = 'Your service is confirmed! - HomeSwift'
-            cust_body = (
-                f"Hi {booking.name},\n\n"
-                "Great news! Your service has been confirmed.\n\n"
-                "Booking Details:\n"
-                f"- Service: {booking.service}\n"
-                f"- Date: {booking.date}\n"
-                f"- Time: {booking.time}\n"
-                f"- Provider: {provider.name}\n"
-                f"- Provider Contact: {provider.phone}\n\n"
-                f"Your provider will arrive at the scheduled time.\n\n"
-                f"Estimated Price: R{booking.estimated_price or 'TBD'}\n\n"
-                "Need to reschedule? Reply to this email or call us.\n\n"
-                f"Request ID: {booking.id}\n\n"
-                "- HomeSwift Team"
-            )
-            send_email(customer_email, cust_subject, cust_body)
-    except Exception as e:
-        print('Error sending customer confirmation email:', e)
+    db.session.commit()
 
-    return jsonify({'message': 'Provider assigned and notifications sent', 'booking': booking.to_dict()})
+    response = {'message': 'Provider assigned and notifications sent', 'booking': booking.to_dict()}
+    if conflicts:
+        response['conflicts'] = [job_dict(job) for job in conflicts]
+    return jsonify(response)
 
 # ========== DYNAMIC PRICING SYSTEM ENDPOINTS ==========
 
-# Email helper function (unified - tries Flask-Mail first, falls back to SMTP)
+class CircuitBreaker:
+    """Tracks the health of one email transport.
+    closed: calls go through. After `failure_threshold` consecutive failures the
+    breaker opens and rejects calls for `reset_timeout` seconds; it then lets a
+    single trial call through (half-open) and closes again if that succeeds.
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                return True
+            # open, or half-open with the trial call still in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def to_dict(self):
+        return {'state': self.state, 'failures': self.failures}
+
+def send_emails_flask_mail(emails):
+    """Send (to, subject, body, reply_to) emails over one Flask-Mail connection (MAIL_* settings).
+    Results and errors are as for send_emails_smtp: True, False for a rejected message,
+    None for messages left unsent by a transport error after the first send.
+    """
+    results = []
+    with mail.connect() as connection:
+        for to, subject, body, reply_to in emails:
+            try:
+                msg = Message(subject, recipients=[to], body=body)
+                if reply_to:
+                    msg.reply_to = reply_to
+                connection.send(msg)
+                results.append(True)
+            except Exception as e:
+                if is_transport_error(e):
+                    if not results:
+                        raise
+                    print('send_email: flask_mail transport error:', e)
+                    results.extend([None] * (len(emails) - len(results)))
+                    break
+                print('send_email: flask_mail error:', e)
+                results.append(False)
+    return results
+
+# Transports in default preference order: Flask-Mail first, SMTP as fallback.
+# Each takes a list of (to, subject, body, reply_to) tuples and returns one result per
+# email (True / False / None for unsent), raising on a transport error before any send.
+EMAIL_TRANSPORTS = {
+    'flask_mail': send_emails_flask_mail,
+    'smtp': lambda emails: send_emails_smtp(emails),
+}
+email_breakers = {}
+_preferred_transport = None
+_transport_lock = threading.Lock()
+
+def reset_email_transports():
+    """Forget the remembered transport and rebuild breakers from config"""
+    global _preferred_transport
+    with _transport_lock:
+        _preferred_transport = None
+        email_breakers.clear()
+        for name in EMAIL_TRANSPORTS:
+            email_breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=app.config['EMAIL_BREAKER_THRESHOLD'],
+                reset_timeout=app.config['EMAIL_BREAKER_RESET_SECONDS']
+            )
+
+reset_email_transports()
+
+def email_transport_status():
+    return {
+        'preferred': _preferred_transport,
+        'breakers': {name: breaker.to_dict() for name, breaker in email_breakers.items()}
+    }
+
+# Email helper function (unified - remembers the working transport, skips unhealthy ones)
 def send_email(to, subject, body, reply_to=None):
-    """Send email using Flask-Mail, or fall back to SMTP if Flask-Mail not configured"""
-    # Try Flask-Mail first
+    """Send email over the transport that last worked, falling back to the others.
+    Transports whose circuit breaker is open are skipped, so while the mail
+    server is down this returns False immediately instead of waiting on it.
+    """
+    return send_email_batch([(to, subject, body, reply_to)])[0]
+
+def send_email_batch(emails):
+    """Send several (to, subject, body, reply_to) emails over a single transport session.
+    Returns one boolean per email. A transport error (cannot connect or log in, sender
+    refused) counts as a failure on that transport's breaker, and the emails it left
+    unsent go to the next healthy transport. Messages rejected individually are
+    reported as False without a fallback.
+    """
+    global _preferred_transport
+    results = [False] * len(emails)
+    pending = list(range(len(emails)))
+    order = list(EMAIL_TRANSPORTS)
+    preferred = _preferred_transport
+    if preferred in order:
+        order.remove(preferred)
+        order.insert(0, preferred)
+
+    for name in order:
+        if not pending:
+            break
+        breaker = email_breakers[name]
+        if not breaker.allow():
+            continue
+        try:
+            outcome = EMAIL_TRANSPORTS[name]([emails[i] for i in pending])
+        except Exception as e:
+            print(f'send_email: {name} transport failed:', e)
+            breaker.record_failure()
+            continue
+        unsent = [i for i, ok in zip(pending, outcome) if ok is None]
+        for i, ok in zip(pending, outcome):
+            results[i] = bool(ok)
+        if unsent:
+            breaker.record_failure()
+        else:
+            # Individual rejections are message problems, not transport health
+            breaker.record_success()
+            _preferred_transport = name
+        pending = unsent
+    return results
+
+# ========== EMAIL OUTBOX ==========
+
+def queue_email(to, subject, body, reply_to=None):
+    """Queue an email in the outbox as part of the current transaction.
+    Nothing is sent until the caller commits; the outbox workers deliver it afterwards.
+    """
+    if not to:
+        return None
+    message = EmailOutbox(to_email=to, subject=subject, body=body, reply_to=reply_to)
+    db.session.add(message)
+    return message
+
+_outbox_executor = None
+_outbox_executor_lock = threading.Lock()
+
+def _get_outbox_executor():
+    global _outbox_executor
+    with _outbox_executor_lock:
+        if _outbox_executor is None:
+            _outbox_executor = ThreadPoolExecutor(
+                max_workers=max(1, app.config['OUTBOX_WORKERS']),
+                thread_name_prefix='outbox-send'
+            )
+        return _outbox_executor
+
+def _outbox_due_filter(now):
+    """Pending messages whose retry time has come, plus 'sending' claims abandoned by a dead worker"""
+    stale_before = now - timedelta(seconds=app.config['OUTBOX_LOCK_TIMEOUT_SECONDS'])
+    return or_(
+        and_(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now),
+        and_(EmailOutbox.status == 'sending', EmailOutbox.locked_at < stale_before)
+    )
+
+def _claim_outbox_batch(limit):
+    """Atomically mark up to `limit` due messages as 'sending' and return their payloads.
+    The conditional UPDATE makes claims safe across threads and gunicorn processes.
+    """
+    now = datetime.utcnow()
+    candidate_ids = [row[0] for row in db.session.query(EmailOutbox.id)
+                     .filter(_outbox_due_filter(now))
+                     .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+                     .limit(limit)]
+    claimed_ids = []
+    for outbox_id in candidate_ids:
+        result = db.session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == outbox_id, _outbox_due_filter(now))
+            .values(status='sending', locked_at=now, attempts=EmailOutbox.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(outbox_id)
+    db.session.commit()
+
+    if not claimed_ids:
+        return []
+    rows = db.session.query(
+        EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject,
+        EmailOutbox.body, EmailOutbox.reply_to, EmailOutbox.attempts
+    ).filter(EmailOutbox.id.in_(claimed_ids)).all()
+    return [tuple(row) for row in rows]
+
+def _deliver_outbox_message(message):
+    """Runs on a worker thread: send one claimed message and report the outcome"""
+    outbox_id, to_email, subject, body, reply_to, attempts = message
     try:
-        msg = Message(subject, recipients=[to], body=body)
-        if reply_to:
-            msg.reply_to = reply_to
-        mail.send(msg)
-        return True
+        with app.app_context():
+            if send_email(to_email, subject, body, reply_to):
+                return outbox_id, attempts, None
+        return outbox_id, attempts, 'send_email returned False'
     except Exception as e:
-        # Fall back to SMTP if Flask-Mail fails
-        return send_email_smtp(to, subject, body, reply_to)
+        return outbox_id, attempts, str(e)[:500]
+
+def _record_outbox_results(results):
+    now = datetime.utcnow()
+    summary = {'sent': 0, 'retrying': 0, 'failed': 0}
+    for outbox_id, attempts, error in results:
+        if error is None:
+            values = {'status': 'sent', 'sent_at': now, 'locked_at': None, 'last_error': None}
+            summary['sent'] += 1
+        elif attempts >= app.config['OUTBOX_MAX_ATTEMPTS']:
+            values = {'status': 'failed', 'locked_at': None, 'last_error': error}
+            summary['failed'] += 1
+        else:
+            # Exponential backoff: base, 2x base, 4x base, ...
+            delay = app.config['OUTBOX_RETRY_BASE_SECONDS'] * (2 ** (attempts - 1))
+            values = {'status': 'pending', 'locked_at': None, 'last_error': error,
+                      'next_attempt_at': now + timedelta(seconds=delay)}
+            summary['retrying'] += 1
+        db.session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == outbox_id, EmailOutbox.status == 'sending')
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return summary
+
+def process_outbox(limit=None):
+    """Claim one batch of due outbox messages, deliver them concurrently on the
+    worker pool and record the results. Must be called inside an app context.
+    Returns a summary dict with claimed/sent/retrying/failed counts.
+    """
+    batch = _claim_outbox_batch(limit or app.config['OUTBOX_BATCH_SIZE'])
+    if not batch:
+        return {'claimed': 0, 'sent': 0, 'retrying': 0, 'failed': 0}
+    results = list(_get_outbox_executor().map(_deliver_outbox_message, batch))
+    summary = _record_outbox_results(results)
+    summary['claimed'] = len(batch)
+    return summary
+
+class OutboxDispatcher:
+    """Background thread that keeps draining the outbox while the process runs"""
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
 
-def format_currency(amount):
-    """Format amount as South African Rand"""
-    return f"R{amount:,.2f}".replace(',', ' ')
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='outbox-dispatcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                with app.app_context():
+                    claimed = process_outbox()['claimed']
+                    db.session.remove()
+            except Exception as e:
+                print('Outbox dispatcher error:', e)
+            # Keep going straight away while there is a backlog
+            if not claimed:
+                self._stop.wait(app.config['OUTBOX_POLL_SECONDS'])
+
+outbox_dispatcher = OutboxDispatcher()
+
+@app.before_request
+def ensure_outbox_dispatcher():
+    """Start the outbox dispatcher in each serving process (gunicorn workers included)"""
+    if app.config['OUTBOX_WORKERS'] > 0 and not app.config.get('TESTING'):
+        outbox_dispatcher.start()
+
+@app.route('/api/admin/outbox', methods=['GET'])
+def get_outbox_status():
+    """Outbox queue depth by status, plus the most recent failures"""
+    counts = dict(db.session.query(EmailOutbox.status, func.count(EmailOutbox.id))
+                  .group_by(EmailOutbox.status).all())
+    failures = EmailOutbox.query.filter_by(status='failed') \
+        .order_by(EmailOutbox.id.desc()).limit(20).all()
+    return jsonify({
+        'counts': counts,
+        'transports': email_transport_status(),
+        'recent_failures': [m.to_dict() for m in failures]
+    })
+
+def format_currency(cents):
+    """Format an amount in cents as South African Rand"""
+    return f"R{cents // 100:,}.{cents % 100:02d}".replace(',', ' ')
+
+# In-process pricing catalog
+PricingEntry = namedtuple('PricingEntry', [
+    'id', 'service_category', 'service_type', 'item_description',
+    'provider_base_price_cents', 'customer_display_price_cents',
+    'color_surcharge_provider_cents', 'color_surcharge_customer_cents',
+    'is_white_applicable', 'commission_percentage'
+])
+
+class PricingCatalog:
+    """Read-only snapshot of the service_pricing table, indexed by (category, type)
+    and by category. Pricing only changes through seed-pricing, which bumps the
+    'pricing' data version; each process re-checks that version at most every
+    PRICING_CACHE_TTL seconds and reloads when it has moved, so lookups are
+    dictionary hits and every worker picks up new prices within the TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._checked_at = 0.0
+        self._by_key = {}
+        self._units = {}
+        self._by_category = {}
+        self._categories = []
+        self._all = []
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+
+    def refresh(self):
+        """Reload if the TTL has passed and the stored version differs from ours"""
+        now = time.monotonic()
+        if self.version is not None and now - self._checked_at < app.config['PRICING_CACHE_TTL']:
+            return
+        with self._lock:
+            if self.version is not None and now - self._checked_at < app.config['PRICING_CACHE_TTL']:
+                return
+            version = get_data_version('pricing')
+            if version != self.version:
+                self._load(version)
+            self._checked_at = now
+
+    def _load(self, version):
+        by_key, units, by_category, all_items = {}, {}, {}, []
+        for row in ServicePricing.query.order_by(ServicePricing.id).all():
+            entry = PricingEntry(
+                row.id, row.service_category, row.service_type, row.item_description,
+                row.provider_base_price_cents, row.customer_display_price_cents,
+                row.color_surcharge_provider_cents or 0, row.color_surcharge_customer_cents or 0,
+                row.is_white_applicable, Decimal(str(row.commission_percentage or 0))
+            )
+            as_dict = row.to_dict()
+            by_key.setdefault((entry.service_category, entry.service_type), entry)
+            # Unit prices for both colour options, so pricing a line is a dict hit and a multiply
+            plain = (entry.customer_display_price_cents, entry.provider_base_price_cents)
+            white = (entry.customer_display_price_cents + entry.color_surcharge_customer_cents,
+                     entry.provider_base_price_cents + entry.color_surcharge_provider_cents) \
+                if entry.is_white_applicable else plain
+            for is_white, prices in ((False, plain), (True, white)):
+                units.setdefault((entry.service_category, entry.service_type, is_white), (entry,) + prices)
+            by_category.setdefault(entry.service_category, []).append(as_dict)
+            all_items.append(as_dict)
+        self._by_key, self._units, self._by_category, self._all = by_key, units, by_category, all_items
+        self._categories = list(by_category)
+        self.version = version
+
+    def lookup(self, category, service_type):
+        self.refresh()
+        return self._by_key.get((category, service_type))
+
+    def unit_prices(self, category, service_type, is_white):
+        """(entry, customer unit cents, provider unit cents), white surcharge applied"""
+        self.refresh()
+        return self._units.get((category, service_type, bool(is_white)))
+
+    def for_category(self, category):
+        self.refresh()
+        return self._by_category.get(category, [])
+
+    def all_items(self):
+        self.refresh()
+        return self._all
+
+    def categories(self):
+        self.refresh()
+        return self._categories
+
+pricing_catalog = PricingCatalog()
+
+# Callout fee (charged to customer only, not part of provider payout - it's a HomeSwift fee)
+CALLOUT_FEE_CENTS = 10000
+
+class CartError(ValueError):
+    """A cart that cannot be priced; status_code is the HTTP status to answer with"""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def price_cart(items):
+    """Price a cart of {category, type, quantity, is_white} items against the cached catalog.
+    Returns the selected_items breakdown stored on a service request plus totals in cents;
+    raises CartError for a malformed cart, an invalid quantity or an unknown item.
+    """
+    if not isinstance(items, list):
+        raise CartError('items must be a list')
+    lines = []
+    for item_input in items:
+        if not isinstance(item_input, dict):
+            raise CartError('Each item must be an object')
+        category = item_input.get('category')
+        service_type = item_input.get('type')
+        if not isinstance(category, str) or not isinstance(service_type, str):
+            raise CartError('Each item needs a category and type')
+        is_white = item_input.get('is_white', False)
+        quantity = item_input.get('quantity', 1)
+        if isinstance(quantity, bool) or not isinstance(quantity, (int, str)):
+            raise CartError('Quantity must be an integer')
+        try:
+            quantity = int(quantity)
+        except ValueError:
+            raise CartError('Quantity must be an integer')
+        if quantity < 1 or quantity > 10:
+            raise CartError('Quantity must be between 1 and 10')
+        priced = pricing_catalog.unit_prices(category, service_type, is_white)
+        if not priced:
+            raise CartError(f'Pricing not found for {category} - {service_type}', 404)
+        lines.append((priced, is_white, quantity))
+
+    selected_items = []
+    customer_prices, provider_prices = [], []
+    for (entry, customer_unit, provider_unit), is_white, quantity in lines:
+        item_price_customer = customer_unit * quantity
+        item_price_provider = provider_unit * quantity
+        customer_prices.append(item_price_customer)
+        provider_prices.append(item_price_provider)
+        selected_items.append({
+            'category': entry.service_category,
+            'type': entry.service_type,
+            'is_white': is_white,
+            'quantity': quantity,
+            'customer_price': from_cents(item_price_customer),
+            'provider_price': from_cents(item_price_provider),
+            'commission': from_cents(item_price_customer - item_price_provider)
+        })
+
+    total_provider_payout = sum(provider_prices)
+    # The callout fee is 100% commission for HomeSwift
+    total_customer_paid = sum(customer_prices) + CALLOUT_FEE_CENTS
+    return {
+        'items': selected_items,
+        'total_customer_paid_cents': total_customer_paid,
+        'total_provider_payout_cents': total_provider_payout,
+        'total_commission_earned_cents': total_customer_paid - total_provider_payout
+    }
 
 # Pricing endpoints
 @app.route('/api/pricing/categories', methods=['GET'])
 def get_categories():
     """Get all unique service categories"""
-    categories = db.session.query(ServicePricing.service_category).distinct().all()
-    return jsonify([cat[0] for cat in categories])
+    return conditional_response(pricing_etag(), lambda: jsonify(pricing_catalog.categories()),
+                                pricing_cache_control())
 
 @app.route('/api/pricing', methods=['GET'])
 def get_pricing():
@@ -750,17 +2552,22 @@ def get_pricing():
     if not category:
         return jsonify({'error': 'Category parameter required'}), 400
     
-    pricing_items = ServicePricing.query.filter_by(service_category=category).all()
-    return jsonify([item.to_dict() for item in pricing_items])
+    fields = requested_fields(ServicePricing)
+    return conditional_response(fields_etag(pricing_etag(), fields),
+                                lambda: jsonify(pick_fields(pricing_catalog.for_category(category), fields)),
+                                pricing_cache_control())
 
 @app.route('/api/pricing/all', methods=['GET'])
 def get_all_pricing():
     """Get all pricing items"""
-    pricing_items = ServicePricing.query.all()
-    return jsonify([item.to_dict() for item in pricing_items])
+    fields = requested_fields(ServicePricing)
+    return conditional_response(fields_etag(pricing_etag(), fields),
+                                lambda: jsonify(pick_fields(pricing_catalog.all_items(), fields)),
+                                pricing_cache_control())
 
 # Service Request endpoints
 @app.route('/api/service-requests', methods=['POST'])
+@idempotent
 def create_service_request():
     """Create a new service request with backend calculations"""
     try:
@@ -783,64 +2590,12 @@ def create_service_request():
         if preferred_date < datetime.now().date():
             return jsonify({'error': 'Preferred date cannot be in the past'}), 400
         
-        # Start transaction
-        total_customer_paid = Decimal('0')
-        total_provider_payout = Decimal('0')
-        total_commission_earned = Decimal('0')
-        selected_items_array = []
-        
-        # Callout fee constant (R100 - charged to customer only, not part of provider payout)
-        CALLOUT_FEE = Decimal('100.00')
-        
-        # Process each item
-        for item_input in data.get('items', []):
-            category = item_input.get('category')
-            service_type = item_input.get('type')
-            quantity = int(item_input.get('quantity', 1))
-            is_white = item_input.get('is_white', False)
-            
-            if quantity < 1 or quantity > 10:
-                return jsonify({'error': 'Quantity must be between 1 and 10'}), 400
-            
-            # Get pricing from database (server-side validation)
-            pricing = ServicePricing.query.filter_by(
-                service_category=category,
-                service_type=service_type
-            ).first()
-            
-            if not pricing:
-                return jsonify({'error': f'Pricing not found for {category} - {service_type}'}), 404
-            
-            # Calculate prices
-            customer_line_price = Decimal(str(pricing.customer_display_price))
-            provider_line_price = Decimal(str(pricing.provider_base_price))
-            
-            if is_white and pricing.is_white_applicable:
-                customer_line_price += Decimal(str(pricing.color_surcharge_customer))
-                provider_line_price += Decimal(str(pricing.color_surcharge_provider))
-            
-            item_price_customer = customer_line_price * quantity
-            item_price_provider = provider_line_price * quantity
-            item_commission = item_price_customer - item_price_provider
-            
-            total_customer_paid += item_price_customer
-            total_provider_payout += item_price_provider
-            total_commission_earned += item_commission
-            
-            selected_items_array.append({
-                'category': pricing.service_category,
-                'type': pricing.service_type,
-                'is_white': is_white,
-                'quantity': quantity,
-                'customer_price': float(item_price_customer),
-                'provider_price': float(item_price_provider),
-                'commission': float(item_commission)
-            })
-        
-        # Add callout fee to customer total (NOT to provider payout - it's a HomeSwift fee)
-        # The callout fee is 100% commission for HomeSwift
-        total_customer_paid += CALLOUT_FEE
-        total_commission_earned += CALLOUT_FEE
+        # Price the cart from the cached catalog (server-side validation)
+        try:
+            cart = price_cart(data.get('items', []))
+        except CartError as e:
+            return jsonify({'error': str(e)}), e.status_code
+        selected_items_array = cart['items']
         
         # Create or find customer
         customer = Customer.query.filter_by(customer_email=data.get('customer_email')).first()
@@ -848,12 +2603,18 @@ def create_service_request():
             customer = Customer(
                 customer_name=data.get('customer_name'),
                 customer_email=data.get('customer_email'),
-                customer_phone=phone
+                customer_phone=phone,
+                total_bookings=1
             )
             db.session.add(customer)
             db.session.flush()
         else:
-            customer.total_bookings += 1
+            # Incremented in SQL so concurrent requests from one customer all count
+            db.session.execute(
+                update(Customer).where(Customer.customer_id == customer.customer_id)
+                .values(total_bookings=func.coalesce(Customer.total_bookings, 0) + 1)
+                .execution_options(synchronize_session=False)
+            )
         
         # Create service request
         preferred_time_obj = datetime.strptime(data.get('preferred_time'), '%H:%M').time()
@@ -871,29 +2632,71 @@ def create_service_request():
             preferred_time=preferred_time_obj,
             additional_notes=data.get('additional_notes'),
             selected_items=json.dumps(selected_items_array),
-            total_customer_paid=total_customer_paid,
-            total_provider_payout=total_provider_payout,
-            total_commission_earned=total_commission_earned,
+            total_customer_paid_cents=cart['total_customer_paid_cents'],
+            total_provider_payout_cents=cart['total_provider_payout_cents'],
+            total_commission_earned_cents=cart['total_commission_earned_cents'],
             status='pending'
         )
+        set_location(service_request, service_request.customer_address)
         
         db.session.add(service_request)
-        db.session.commit()
+        db.session.flush()
+        db.session.execute(
+            ServiceRequestItem.__table__.insert(),
+            ServiceRequestItem.rows_for(service_request.request_id, selected_items_array)
+        )
         
-        # Send emails
+        # Queue emails (delivered by the outbox workers after commit)
         send_booking_confirmation_email(service_request)
         send_admin_alert_email(service_request)
         
+        db.session.commit()
+        
         return jsonify({
             'message': 'Service request created successfully',
             'request_id': service_request.request_id,
-            'total_customer_paid': float(total_customer_paid)
+            'total_customer_paid': from_cents(cart['total_customer_paid_cents'])
         }), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/service-requests/quote', methods=['POST'])
+def quote_service_requests():
+    """Price one cart ({"items": [...]}) or many ({"carts": [{"items": [...]}, ...]})
+    exactly as create_service_request would, without writing anything"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    carts = data.get('carts')
+    if carts is None:
+        carts = [data]
+    if not isinstance(carts, list) or not carts:
+        return jsonify({'error': 'carts must be a non-empty list'}), 400
+    if len(carts) > app.config['MAX_QUOTE_CARTS']:
+        return jsonify({'error': f"At most {app.config['MAX_QUOTE_CARTS']} carts per quote"}), 400
+
+    quotes = []
+    for cart_input in carts:
+        items = cart_input.get('items') if isinstance(cart_input, dict) else None
+        if not items:
+            quotes.append({'error': 'Missing required field: items', 'status': 400})
+            continue
+        try:
+            cart = price_cart(items)
+        except CartError as e:
+            quotes.append({'error': str(e), 'status': e.status_code})
+            continue
+        quotes.append({
+            'items': cart['items'],
+            'callout_fee': from_cents(CALLOUT_FEE_CENTS),
+            'total_customer_paid': from_cents(cart['total_customer_paid_cents']),
+            'total_provider_payout': from_cents(cart['total_provider_payout_cents']),
+            'total_commission_earned': from_cents(cart['total_commission_earned_cents'])
+        })
+    return jsonify({'quotes': quotes, 'pricing_version': pricing_catalog.version})
+
 def send_booking_confirmation_email(request):
     """Email 1: Customer confirmation - New service request received"""
     items = json.loads(request.selected_items)
@@ -918,7 +2721,7 @@ Questions? Reply to this email.
 
 - HomeSwift Team"""
     
-    send_email(request.customer_email, f"Your service request has been received - HomeSwift", body)
+    queue_email(request.customer_email, f"Your service request has been received - HomeSwift", body)
 
 def send_admin_alert_email(request):
     """Email 2: Admin alert - New booking received"""
@@ -951,7 +2754,7 @@ Request ID: {request.request_id}
 
 ACTION REQUIRED: Assign a provider and confirm booking."""
     
-    send_email(app.config['ADMIN_EMAIL'], f"NEW BOOKING: {service_type} - {request.customer_address.split(',')[0] if request.customer_address else 'Location'}", body)
+    queue_email(app.config['ADMIN_EMAIL'], f"NEW BOOKING: {service_type} - {request.customer_address.split(',')[0] if request.customer_address else 'Location'}", body)
 
 @app.route('/api/service-requests', methods=['GET'])
 def get_service_requests():
@@ -965,58 +2768,176 @@ def get_service_requests():
     if status_filter:
         query = query.filter_by(status=status_filter)
     if category_filter:
-        query = query.filter(ServiceRequest.selected_items.contains(category_filter))
+        query = query.filter(ServiceRequest.request_id.in_(
+            db.session.query(ServiceRequestItem.request_id)
+            .filter(ServiceRequestItem.category == category_filter)
+        ))
     if search:
-        query = query.filter(
-            (ServiceRequest.customer_name.contains(search)) |
-            (ServiceRequest.request_id == search)
-        )
+        return search_response(query, ServiceRequest, search,
+                               exact_id=int(search) if search.strip().isdigit() else None)
     
-    requests = query.order_by(ServiceRequest.created_at.desc()).all()
-    return jsonify([req.to_dict() for req in requests])
+    return list_response(
+        query.order_by(ServiceRequest.created_at.desc()),
+        [ServiceRequest.created_at, ServiceRequest.request_id]
+    )
+
+@app.route('/api/customers', methods=['GET'])
+def get_customers():
+    """Get customers (admin), optionally ranked by ?search="""
+    search = request.args.get('search')
+    if search:
+        return search_response(Customer.query, Customer, search)
+    return list_response(Customer.query.order_by(Customer.customer_id.desc()), [Customer.customer_id])
 
 @app.route('/api/service-requests/<int:request_id>', methods=['GET'])
 def get_service_request(request_id):
     """Get a specific service request"""
-    request_obj = ServiceRequest.query.get_or_404(request_id)
-    return jsonify(request_obj.to_dict())
+    return detail_response(ServiceRequest, request_id)
 
-@app.route('/api/service-requests/<int:request_id>', methods=['PATCH'])
-def update_service_request(request_id):
-    """Update a service request (admin)"""
-    request_obj = ServiceRequest.query.get_or_404(request_id)
-    data = request.get_json()
+SERVICE_REQUEST_UPDATE_FIELDS = [
+    'status', 'priority', 'assigned_provider_id', 'provider_name',
+    'provider_phone', 'provider_email', 'payment_method',
+    'customer_payment_received', 'provider_payment_made',
+    'commission_collected', 'admin_notes'
+]
     
-    updateable_fields = [
-        'status', 'priority', 'assigned_provider_id', 'provider_name',
-        'provider_phone', 'provider_email', 'payment_method',
-        'customer_payment_received', 'provider_payment_made',
-        'commission_collected', 'admin_notes'
-    ]
+# Fields a dispatcher may change across many requests at once
+SERVICE_REQUEST_BULK_FIELDS = [
+    'status', 'payment_method', 'customer_payment_received',
+    'provider_payment_made', 'commission_collected'
+]
     
-    for field in updateable_fields:
+def apply_service_request_changes(request_obj, data, now=None):
+    """Apply an admin update to a service request without committing: set the fields,
+    keep the revenue rollup in step, stamp confirmed_at/completed_at and queue the
+    status-change notifications in the outbox, all in the caller's transaction.
+    """
+    now = now or datetime.utcnow()
+    previous_status = request_obj.status
+    previous_provider_id = request_obj.assigned_provider_id
+    
+    for field in SERVICE_REQUEST_UPDATE_FIELDS:
         if field in data:
             setattr(request_obj, field, data[field])
     
+    move_job_counters((previous_provider_id, previous_status),
+                      (request_obj.assigned_provider_id, request_obj.status))
+    
+    # Keep the revenue rollup in step, in the same transaction as the status change
+    if (previous_status == 'completed') != (request_obj.status == 'completed'):
+        apply_rollup_delta(request_obj, 1 if request_obj.status == 'completed' else -1)
+    
     # Handle status changes
     if 'status' in data:
         if data['status'] == 'confirmed' and not request_obj.confirmed_at:
-            request_obj.confirmed_at = datetime.utcnow()
+            request_obj.confirmed_at = now
             # Send provider assignment emails
             if request_obj.assigned_provider_id:
                 send_provider_assignment_email(request_obj)
                 send_customer_provider_confirmed_email(request_obj)
-        elif data['status'] == 'in_progress' and request_obj.status != 'in_progress':
+        elif data['status'] == 'in_progress' and previous_status != 'in_progress':
             send_in_progress_email(request_obj)
         elif data['status'] == 'completed' and not request_obj.completed_at:
-            request_obj.completed_at = datetime.utcnow()
+            request_obj.completed_at = now
             send_completion_email(request_obj)
             send_admin_completion_email(request_obj)
     
-    request_obj.updated_at = datetime.utcnow()
+    request_obj.updated_at = now
+    
+@app.route('/api/service-requests/<int:request_id>', methods=['PATCH'])
+def update_service_request(request_id):
+    """Update a service request (admin)"""
+    request_obj = ServiceRequest.query.get_or_404(request_id)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
+    if data.get('assigned_provider_id') is not None:
+        provider_id = data['assigned_provider_id']
+        try:
+            if isinstance(provider_id, (bool, float)):
+                raise ValueError
+            provider_id = int(provider_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'assigned_provider_id must be an integer'}), 400
+        if db.session.get(ServiceProvider, provider_id) is None:
+            return jsonify({'error': 'Service provider not found'}), 400
+        data = dict(data, assigned_provider_id=provider_id)
+    
+    # Refuse to double-book a provider unless the admin explicitly allows it
+    conflicts = []
+    if data.get('assigned_provider_id') and data['assigned_provider_id'] != request_obj.assigned_provider_id:
+        conflicts = schedule_conflicts(data['assigned_provider_id'], request_obj.preferred_date,
+                                       request_obj.preferred_time, exclude=('service_request', request_id))
+        if conflicts and not data.get('allow_conflict'):
+            return jsonify({'error': 'Provider already has a job at that time',
+                            'conflicts': [job_dict(job) for job in conflicts]}), 409
+    
+    apply_service_request_changes(request_obj, data)
     db.session.commit()
     
-    return jsonify({'message': 'Service request updated', 'request': request_obj.to_dict()})
+    response = {'message': 'Service request updated', 'request': request_obj.to_dict()}
+    if conflicts:
+        response['conflicts'] = [job_dict(job) for job in conflicts]
+    return jsonify(response)
+    
+@app.route('/api/service-requests/bulk-update', methods=['POST'])
+def bulk_update_service_requests():
+    """Apply status and payment-flag changes to many service requests in one transaction.
+    Body: {"ids": [...], "changes": {...}} for one change set, or
+    {"updates": [{"request_id": 1, "status": "completed", ...}, ...]} for one per request.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    if 'updates' in data:
+        if not isinstance(data['updates'], list) or not all(isinstance(u, dict) for u in data['updates']):
+            return jsonify({'error': 'updates must be a list of objects'}), 400
+        updates = [(u.get('request_id'), {k: v for k, v in u.items() if k != 'request_id'})
+                   for u in data['updates']]
+    else:
+        ids = data.get('ids') or []
+        changes = data.get('changes') or {}
+        if not isinstance(ids, list):
+            return jsonify({'error': 'ids must be a list of request ids'}), 400
+        if not isinstance(changes, dict):
+            return jsonify({'error': 'changes must be an object'}), 400
+        updates = [(request_id, changes) for request_id in ids]
+    if any(isinstance(request_id, bool) or not isinstance(request_id, int) for request_id, _ in updates):
+        return jsonify({'error': 'request ids must be integers'}), 400
+    if not updates:
+        return jsonify({'error': 'Provide ids and changes, or updates'}), 400
+    if len(updates) > app.config['BULK_UPDATE_MAX']:
+        return jsonify({'error': f"At most {app.config['BULK_UPDATE_MAX']} requests per call"}), 400
+    
+    # One query loads every request; one flush writes them
+    ids = {request_id for request_id, _ in updates}
+    requests_by_id = {r.request_id: r for r in ServiceRequest.query.filter(ServiceRequest.request_id.in_(ids))}
+    now = datetime.utcnow()
+    results = []
+    for request_id, changes in updates:
+        unknown = sorted(set(changes) - set(SERVICE_REQUEST_BULK_FIELDS))
+        request_obj = requests_by_id.get(request_id)
+        if unknown:
+            results.append({'request_id': request_id, 'error': f"Fields cannot be bulk updated: {', '.join(unknown)}"})
+        elif not changes:
+            results.append({'request_id': request_id, 'error': 'No changes given'})
+        elif request_obj is None:
+            results.append({'request_id': request_id, 'error': 'Service request not found'})
+        else:
+            apply_service_request_changes(request_obj, changes, now)
+            results.append({'request_id': request_id, 'updated': True, 'status': request_obj.status})
+    
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'updated': sum(1 for result in results if result.get('updated')),
+        'results': results
+    })
 
 def send_provider_assignment_email(request):
     """Email 3: Provider assignment - When status changes to Confirmed"""
@@ -1059,7 +2980,7 @@ Customer expects you at {request.preferred_time.strftime('%I:%M %p')} on {reques
 
 Job ID: {request.request_id}"""
     
-    send_email(request.provider_email, f"New Job Assignment - HomeSwift - {request.preferred_date}", body)
+    queue_email(request.provider_email, f"New Job Assignment - HomeSwift - {request.preferred_date}", body)
 
 def send_customer_provider_confirmed_email(request):
     """Email 4: Customer confirmation - When provider is assigned"""
@@ -1079,7 +3000,7 @@ Booking Details:
 
 Your provider will arrive at the scheduled time.
 
-Estimated Price: {format_currency(request.total_customer_paid)} (final price may vary based on actual work)
+Estimated Price: {format_currency(request.total_customer_paid_cents)} (final price may vary based on actual work)
 
 Need to reschedule? Reply to this email or call us at {app.config['ADMIN_PHONE']}.
 
@@ -1087,7 +3008,7 @@ Request ID: {request.request_id}
 
 - HomeSwift Team"""
     
-    send_email(request.customer_email, f"Your service is confirmed! - HomeSwift", body)
+    queue_email(request.customer_email, f"Your service is confirmed! - HomeSwift", body)
 
 def send_in_progress_email(request):
     """Email 5: Job in progress notification"""
@@ -1106,7 +3027,7 @@ Any issues? Contact us at {app.config['ADMIN_PHONE']}.
 
 - HomeSwift Team"""
     
-    send_email(request.customer_email, f"Your service is in progress - HomeSwift", body)
+    queue_email(request.customer_email, f"Your service is in progress - HomeSwift", body)
 
 def send_completion_email(request):
     """Email 6: Service completion - Customer"""
@@ -1117,7 +3038,7 @@ def send_completion_email(request):
 
 Your {service_type} has been completed!
 
-Final Amount: {format_currency(request.total_customer_paid)}
+Final Amount: {format_currency(request.total_customer_paid_cents)}
 Payment Method: {request.payment_method or 'Cash/Card'}
 
 HOW DID WE DO?
@@ -1129,7 +3050,7 @@ Thank you for using HomeSwift!
 
 Request ID: {request.request_id}"""
     
-    send_email(request.customer_email, f"Service completed! How did we do? - HomeSwift", body)
+    queue_email(request.customer_email, f"Service completed! How did we do? - HomeSwift", body)
 
 def send_admin_completion_email(request):
     """Email 7: Admin - Job completion notification"""
@@ -1141,17 +3062,17 @@ def send_admin_completion_email(request):
 Customer: {request.customer_name}
 Provider: {request.provider_name}
 Service: {service_type}
-Amount: {format_currency(request.total_customer_paid)}
+Amount: {format_currency(request.total_customer_paid_cents)}
 Date: {request.preferred_date}
 
-Commission Due: {format_currency(request.total_commission_earned)} (10%)
+Commission Due: {format_currency(request.total_commission_earned_cents)} (10%)
 
 Request ID: {request.request_id}"""
     
-    send_email(app.config['ADMIN_EMAIL'], f"Job Completed - {service_type} - {format_currency(request.total_customer_paid)}", body)
+    queue_email(app.config['ADMIN_EMAIL'], f"Job Completed - {service_type} - {format_currency(request.total_customer_paid_cents)}", body)
 
-def send_reminder_email(request):
-    """Email 8: Reminder (24 hours before service)"""
+def build_reminder_email(request):
+    """Email 8: Reminder (24 hours before service) - returns (to, subject, body, reply_to)"""
     items = json.loads(request.selected_items)
     service_type = items[0].get('category', 'Cleaning Service') if items else 'Cleaning Service'
     
@@ -1172,58 +3093,946 @@ Need to reschedule? Call us at {app.config['ADMIN_PHONE']}.
 See you tomorrow!
 - HomeSwift Team"""
     
-    send_email(request.customer_email, f"Reminder: Your service is tomorrow - HomeSwift", body)
+    return (request.customer_email, f"Reminder: Your service is tomorrow - HomeSwift", body, None)
+
+def send_reminder_email(request):
+    """Email 8: Reminder (24 hours before service)"""
+    return send_email(*build_reminder_email(request))
+
+def _send_reminder_batch(emails):
+    with app.app_context():
+        return send_email_batch(emails)
+
+def run_reminders(day=None, chunk_size=None, concurrency=None):
+    """Send reminder emails for services on `day` (default: tomorrow).
+
+    Candidates are read in keyset-paginated chunks of `chunk_size`. Each chunk is
+    split across `concurrency` threads, each sending its share over one shared
+    transport session, and the delivered requests are marked with a single bulk
+    UPDATE and committed before the next chunk is read. A failure partway through
+    therefore keeps the progress of every completed chunk.
+    """
+    day = day or (datetime.now().date() + timedelta(days=1))
+    chunk_size = chunk_size or app.config['REMINDER_CHUNK_SIZE']
+    concurrency = max(1, concurrency or app.config['REMINDER_CONCURRENCY'])
+
+    report = {'date': day.isoformat(), 'sent': 0, 'failed': 0, 'chunks': []}
+    run_started = time.perf_counter()
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='reminders') as executor:
+        while True:
+            chunk_started = time.perf_counter()
+            candidates = ServiceRequest.query.filter(
+                ServiceRequest.preferred_date == day,
+                ServiceRequest.status.in_(['confirmed', 'pending']),
+                ServiceRequest.reminder_sent_at.is_(None),
+                ServiceRequest.request_id > last_id
+            ).order_by(ServiceRequest.request_id).limit(chunk_size).all()
+            if not candidates:
+                break
+            last_id = candidates[-1].request_id
+            emails = [build_reminder_email(req) for req in candidates]
+            query_seconds = time.perf_counter() - chunk_started
+
+            # One slice per thread; each slice goes out over a single session
+            slice_size = -(-len(emails) // concurrency)
+            slices = [emails[i:i + slice_size] for i in range(0, len(emails), slice_size)]
+            send_started = time.perf_counter()
+            results = [ok for outcome in executor.map(_send_reminder_batch, slices) for ok in outcome]
+            send_seconds = time.perf_counter() - send_started
+
+            sent_ids = [req.request_id for req, ok in zip(candidates, results) if ok]
+            if sent_ids:
+                db.session.execute(
+                    update(ServiceRequest)
+                    .where(ServiceRequest.request_id.in_(sent_ids),
+                           ServiceRequest.reminder_sent_at.is_(None))
+                    .values(reminder_sent_at=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+            db.session.expunge_all()
+
+            report['sent'] += len(sent_ids)
+            report['failed'] += len(candidates) - len(sent_ids)
+            report['chunks'].append({
+                'size': len(candidates),
+                'sent': len(sent_ids),
+                'query_seconds': round(query_seconds, 4),
+                'send_seconds': round(send_seconds, 4),
+                'total_seconds': round(time.perf_counter() - chunk_started, 4)
+            })
+
+    elapsed = time.perf_counter() - run_started
+    report['elapsed_seconds'] = round(elapsed, 4)
+    report['emails_per_second'] = round(report['sent'] / elapsed, 2) if elapsed > 0 else 0
+    return report
 
 @app.route('/api/admin/send-reminders', methods=['POST'])
 def send_reminders():
     """Send reminder emails for services scheduled 24 hours from now"""
     try:
-        tomorrow = datetime.now().date() + timedelta(days=1)
-        requests = ServiceRequest.query.filter(
-            ServiceRequest.preferred_date == tomorrow,
-            ServiceRequest.status.in_(['confirmed', 'pending']),
-            ServiceRequest.reminder_sent_at.is_(None)
-        ).all()
-        
-        sent_count = 0
-        for request in requests:
-            if send_reminder_email(request):
-                request.reminder_sent_at = datetime.utcnow()
-                sent_count += 1
-        
+        chunk_size = request.args.get('chunk_size', type=int)
+        report = run_reminders(chunk_size=chunk_size)
+        report['message'] = f"Sent {report['sent']} reminder emails"
+        return jsonify(report)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# ========== GEOCODING ==========
+# Addresses are located offline: the words of an address are matched against the
+# gazetteer's place names (and any 4-digit postcode), and the place's centroid is
+# stored with the row. Providers also store a geohash of it; a geohash prefix is
+# the cell containing the point, so cells of any size are prefix lookups.
+
+GAZETTEER_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'za_gazetteer.csv')
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 7
+EARTH_RADIUS_KM = 6371.0
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits, bounds[0] = bits * 2 + 1, mid
+        else:
+            bits, bounds[1] = bits * 2, mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+def geohash_cell_size(precision):
+    """(latitude, longitude) degrees spanned by one cell"""
+    lon_bits = (5 * precision + 1) // 2
+    return 180.0 / 2 ** (5 * precision - lon_bits), 360.0 / 2 ** lon_bits
+
+def geohash_block(latitude, longitude, precision):
+    """The cell containing the point and its eight neighbours"""
+    lat_size, lon_size = geohash_cell_size(precision)
+    return {
+        geohash_encode(max(min(latitude + dy * lat_size, 89.999999), -89.999999),
+                       (longitude + dx * lon_size + 180) % 360 - 180, precision)
+        for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+    }
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    dlat, dlon = math.radians(lat2 - lat1), math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def _address_words(text):
+    return re.findall(r'[a-z0-9]+', (text or '').lower())
+
+class Gazetteer:
+    """In-memory copy of the gazetteer_place table for locating addresses. Reloaded when
+    the 'gazetteer' data version moves, checked at most every GAZETTEER_CACHE_TTL seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._checked_at = 0.0
+        self._by_name = {}
+        self._by_postcode = {}
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+
+    def refresh(self):
+        now = time.monotonic()
+        if self.version is not None and now - self._checked_at < app.config['GAZETTEER_CACHE_TTL']:
+            return
+        with self._lock:
+            if self.version is not None and now - self._checked_at < app.config['GAZETTEER_CACHE_TTL']:
+                return
+            version = get_data_version('gazetteer')
+            if version != self.version:
+                by_name, by_postcode = {}, {}
+                for place in GazetteerPlace.query.order_by(GazetteerPlace.id):
+                    entry = (place.name, place.postcode, tuple(_address_words(place.city)),
+                             place.latitude, place.longitude)
+                    by_name.setdefault(tuple(_address_words(place.name)), []).append(entry)
+                    by_postcode.setdefault(place.postcode, []).append(entry)
+                self._by_name, self._by_postcode = by_name, by_postcode
+                self.version = version
+            self._checked_at = now
+
+    def locate(self, address):
+        """(latitude, longitude) of the place an address names, or None. Prefers, in order:
+        a place whose postcode the address also gives, a suburb over a bare city, a place
+        whose city is mentioned too, the longer name, and the name nearer the end."""
+        self.refresh()
+        words = _address_words(address)
+        postcodes = {word for word in words if len(word) == 4 and word.isdigit()}
+        joined = ' ' + ' '.join(words) + ' '
+        best = None
+        for size in (3, 2, 1):
+            for position in range(len(words) - size + 1):
+                for name, postcode, city, latitude, longitude in self._by_name.get(tuple(words[position:position + size]), ()):
+                    rank = (postcode in postcodes, city != tuple(_address_words(name)),
+                            f" {' '.join(city)} " in joined, size, position)
+                    if best is None or rank > best[0]:
+                        best = (rank, latitude, longitude)
+        if best:
+            return best[1], best[2]
+        for postcode in sorted(postcodes):
+            if postcode in self._by_postcode:
+                _, _, _, latitude, longitude = self._by_postcode[postcode][0]
+                return latitude, longitude
+        return None
+
+gazetteer = Gazetteer()
+
+def locate_address(address):
+    """(latitude, longitude, geohash) for an address; all None when it cannot be placed"""
+    point = gazetteer.locate(address) if address else None
+    if point is None:
+        return None, None, None
+    return point[0], point[1], geohash_encode(*point)
+
+def set_location(row, address):
+    """Store the located address on a provider or service request"""
+    latitude, longitude, geohash = locate_address(address)
+    row.latitude, row.longitude = latitude, longitude
+    if hasattr(row, 'geohash'):
+        row.geohash = geohash
+
+def seed_gazetteer(path=GAZETTEER_CSV):
+    """Upsert the gazetteer CSV into gazetteer_place; returns the number of rows written"""
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = [{
+            'name': row['name'].strip(), 'postcode': row['postcode'].strip(), 'city': row['city'].strip(),
+            'province': (row.get('province') or '').strip() or None,
+            'latitude': float(row['latitude']), 'longitude': float(row['longitude'])
+        } for row in csv.DictReader(f)]
+    statement = dialect_insert(GazetteerPlace.__table__)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['name', 'postcode'],
+        set_={column: statement.excluded[column] for column in ('city', 'province', 'latitude', 'longitude')}
+    ), rows)
+    bump_data_version('gazetteer')
+    db.session.commit()
+    gazetteer.invalidate()
+    return len(rows)
+
+def backfill_coordinates(batch_size=500, relocate=False):
+    """Locate providers and service requests that have no coordinates yet (every row
+    with `relocate`), in id order and batches. Returns {table: rows located}."""
+    located = {}
+    for model, key, address in ((ServiceProvider, ServiceProvider.id, ServiceProvider.address),
+                                (ServiceRequest, ServiceRequest.request_id, ServiceRequest.customer_address)):
+        table = model.__table__
+        has_geohash = 'geohash' in table.c
+        last_id = 0
+        located[table.name] = 0
+        while True:
+            query = db.session.query(key, address).filter(key > last_id, address.isnot(None))
+            if not relocate:
+                query = query.filter(model.latitude.is_(None))
+            batch = query.order_by(key).limit(batch_size).all()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            updates = []
+            for row_id, row_address in batch:
+                latitude, longitude, geohash = locate_address(row_address)
+                if latitude is not None or relocate:
+                    update_row = {'g_id': row_id, 'g_lat': latitude, 'g_lon': longitude}
+                    if has_geohash:
+                        update_row['g_hash'] = geohash
+                    updates.append(update_row)
+            if updates:
+                values = {'latitude': bindparam('g_lat'), 'longitude': bindparam('g_lon')}
+                if has_geohash:
+                    values['geohash'] = bindparam('g_hash')
+                db.session.execute(table.update().where(table.c[key.key] == bindparam('g_id')).values(**values),
+                                   updates)
+            db.session.commit()
+            located[table.name] += sum(1 for row in updates if row['g_lat'] is not None)
+    return located
+
+# ========== PROVIDER SCHEDULES ==========
+# Every job - a service request or a legacy booking - holds its provider for
+# SERVICE_SLOT_MINUTES from its start time. A provider's jobs over a date range come
+# from one range scan of the (assigned_provider_id, date) indexes. Per day they are
+# kept sorted by start; with fixed-length slots, the jobs overlapping a new slot are
+# exactly those starting within one slot length either side of it, so an overlap
+# check is two bisects and a slice.
+
+# Statuses whose jobs no longer hold a slot
+UNSCHEDULED_STATUSES = ('cancelled',)
+SCHEDULE_MAX_DAYS = 62
+
+ScheduledJob = namedtuple('ScheduledJob', ['start', 'end', 'kind', 'id', 'status'])
+
+def _minutes(value):
+    """Minutes since midnight for a time or an 'HH:MM' string; None if unparseable"""
+    if isinstance(value, dt_time):
+        return value.hour * 60 + value.minute
+    try:
+        parsed = datetime.strptime((value or '').strip(), '%H:%M')
+    except ValueError:
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+def _clock(minutes):
+    return f'{min(minutes, 24 * 60) // 60:02d}:{min(minutes, 24 * 60) % 60:02d}'
+
+def job_dict(job):
+    return {'kind': job.kind, 'id': job.id, 'status': job.status,
+            'start': _clock(job.start), 'end': _clock(job.end)}
+
+class ProviderSchedule:
+    """One provider's jobs between two dates, indexed per day by start minute"""
+
+    def __init__(self, provider_id, jobs):
+        self.provider_id = provider_id
+        self._days = {}
+        for day, job in sorted(jobs, key=lambda entry: (entry[0], entry[1].start)):
+            starts, day_jobs = self._days.setdefault(day, ([], []))
+            starts.append(job.start)
+            day_jobs.append(job)
+
+    @classmethod
+    def load(cls, provider_id, first_day, last_day, exclude=None):
+        """Jobs from both tables; `exclude` is a (kind, id) left out, e.g. the job being reassigned"""
+        slot = app.config['SERVICE_SLOT_MINUTES']
+        jobs = []
+        requests = db.session.query(ServiceRequest.request_id, ServiceRequest.preferred_date,
+                                    ServiceRequest.preferred_time, ServiceRequest.status) \
+            .filter(ServiceRequest.assigned_provider_id == provider_id,
+                    ServiceRequest.preferred_date.between(first_day, last_day),
+                    ServiceRequest.status.notin_(UNSCHEDULED_STATUSES))
+        for request_id, day, start_time, status in requests:
+            start = _minutes(start_time)
+            jobs.append((day, ScheduledJob(start, start + slot, 'service_request', request_id, status)))
+        bookings = db.session.query(Booking.id, Booking.date, Booking.time, Booking.status) \
+            .filter(Booking.assigned_provider_id == provider_id,
+                    Booking.date.between(first_day.isoformat(), last_day.isoformat()),
+                    Booking.status.notin_(UNSCHEDULED_STATUSES))
+        for booking_id, day, start_time, status in bookings:
+            start = _minutes(start_time)
+            try:
+                day = datetime.strptime(day, '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                continue
+            if start is not None:
+                jobs.append((day, ScheduledJob(start, start + slot, 'booking', booking_id, status)))
+        return cls(provider_id, [(day, job) for day, job in jobs if (job.kind, job.id) != exclude])
+
+    def jobs(self, day):
+        return self._days.get(day, ([], []))[1]
+
+    def conflicts(self, day, start):
+        """Jobs overlapping a slot starting `start` minutes after midnight on `day`"""
+        starts, jobs = self._days.get(day, ([], []))
+        slot = app.config['SERVICE_SLOT_MINUTES']
+        return jobs[bisect_right(starts, start - slot):bisect_left(starts, start + slot)]
+
+    def free_periods(self, day):
+        """(start, end) gaps in the working day"""
+        cursor = app.config['WORKDAY_START_HOUR'] * 60
+        day_end = app.config['WORKDAY_END_HOUR'] * 60
+        periods = []
+        for job in self.jobs(day):
+            if job.start > cursor:
+                periods.append((cursor, min(job.start, day_end)))
+            cursor = max(cursor, job.end)
+            if cursor >= day_end:
+                break
+        if cursor < day_end:
+            periods.append((cursor, day_end))
+        return [(start, end) for start, end in periods if end > start]
+
+def schedule_conflicts(provider_id, day, start_time, exclude=None):
+    """Jobs of `provider_id` overlapping a new job at day/start_time"""
+    start = _minutes(start_time)
+    if not provider_id or day is None or start is None:
+        return []
+    return ProviderSchedule.load(provider_id, day, day, exclude).conflicts(day, start)
+
+def schedule_clash(provider_id, day, start_time):
+    """SQL condition: the provider already has a job overlapping day/start_time.
+    The same window ProviderSchedule.conflicts uses, for guarding conditional UPDATEs."""
+    start, slot = _minutes(start_time), app.config['SERVICE_SLOT_MINUTES']
+    lower, upper = start - slot, start + slot
+    as_time = lambda minutes: dt_time(minutes // 60, minutes % 60)
+    request_window = [ServiceRequest.preferred_time > as_time(lower)] if lower >= 0 else []
+    request_window += [ServiceRequest.preferred_time < as_time(upper)] if upper < 24 * 60 else []
+    booking_window = [Booking.time > _clock(lower)] if lower >= 0 else []
+    booking_window += [Booking.time < _clock(upper)] if upper < 24 * 60 else []
+    return or_(
+        exists().where(ServiceRequest.assigned_provider_id == provider_id,
+                       ServiceRequest.preferred_date == day,
+                       ServiceRequest.status.notin_(UNSCHEDULED_STATUSES), *request_window),
+        exists().where(Booking.assigned_provider_id == provider_id, Booking.date == day.isoformat(),
+                       Booking.status.notin_(UNSCHEDULED_STATUSES), *booking_window),
+    )
+
+def _schedule_date(name, default):
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+@app.route('/api/providers/<int:provider_id>/schedule', methods=['GET'])
+def get_provider_schedule(provider_id):
+    """A provider's jobs and free time per day.
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: the next 7 days); ?time=HH:MM also
+    reports whether a job starting then would fit on each day.
+    """
+    ServiceProvider.query.get_or_404(provider_id)
+    first_day = _schedule_date('from', datetime.utcnow().date())
+    last_day = _schedule_date('to', first_day + timedelta(days=6) if first_day else None)
+    if first_day is None or last_day is None:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD'}), 400
+    if last_day < first_day or (last_day - first_day).days >= SCHEDULE_MAX_DAYS:
+        return jsonify({'error': f'to must be on or after from, at most {SCHEDULE_MAX_DAYS} days'}), 400
+    at = _minutes(request.args['time']) if request.args.get('time') else None
+    if request.args.get('time') and at is None:
+        return jsonify({'error': 'time must be HH:MM'}), 400
+
+    schedule = ProviderSchedule.load(provider_id, first_day, last_day)
+    days = []
+    for offset in range((last_day - first_day).days + 1):
+        day = first_day + timedelta(days=offset)
+        entry = {
+            'date': day.isoformat(),
+            'jobs': [job_dict(job) for job in schedule.jobs(day)],
+            'free': [{'start': _clock(start), 'end': _clock(end)} for start, end in schedule.free_periods(day)]
+        }
+        if at is not None:
+            entry['available'] = not schedule.conflicts(day, at)
+        days.append(entry)
+    return jsonify({'provider_id': provider_id, 'slot_minutes': app.config['SERVICE_SLOT_MINUTES'], 'days': days})
+
+# ========== PROVIDER MATCHING ==========
+
+# Statuses in which an assigned request counts towards its provider's workload
+OPEN_JOB_STATUSES = ('pending', 'confirmed', 'in_progress')
+# Finest geohash prefix the proximity buckets use (6 is about 1.2 x 0.6 km)
+GEO_BUCKET_PRECISION = 6
+NEAREST_MAX_K = 50
+# Batch auto-assignment serves the most urgent requests first
+PRIORITY_ORDER = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+ProviderCandidate = namedtuple('ProviderCandidate', ['id', 'name', 'service_type', 'rating',
+                                                     'latitude', 'longitude', 'geohash'])
+
+def _service_words(name):
+    return frozenset(re.findall(r'[a-z0-9]+', (name or '').lower()))
+
+class ProviderMatcher:
+    """In-memory index of active providers by service_type, with their rating and
+    open job count, so ranking candidates for a request needs no query.
+
+    A provider can take a category when every word of its service_type appears in
+    the category name ('House Cleaning' covers 'House Deep Cleaning'); a request
+    needs one provider covering all of its categories. Open job counts are the
+    providers' active_jobs counters; changing one moves the providers ETag, which is
+    checked every MATCH_INDEX_TTL seconds. Assignments made by this process adjust
+    the counts immediately.
+
+    For proximity, each candidate pool is also bucketed by geohash prefix at every
+    precision up to GEO_BUCKET_PRECISION, so the providers near a point are read
+    from the 3x3 block of cells around it, widening to coarser cells as needed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._checked_at = 0.0
+        self._by_type = {}
+        self._type_words = {}
+        self._pools = {}
+        self._geo_buckets = {}
+        self._open_jobs = {}
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+
+    def refresh(self):
+        now = time.monotonic()
+        if self.version is not None and now - self._checked_at < app.config['MATCH_INDEX_TTL']:
+            return
+        with self._lock:
+            if self.version is not None and now - self._checked_at < app.config['MATCH_INDEX_TTL']:
+                return
+            version = providers_etag()
+            if version != self.version:
+                self._load_providers(version)
+            self._checked_at = now
+
+    def _load_providers(self, version):
+        by_type = {}
+        rows = db.session.query(ServiceProvider.id, ServiceProvider.name, ServiceProvider.service_type,
+                                ServiceProvider.rating, ServiceProvider.latitude, ServiceProvider.longitude,
+                                ServiceProvider.geohash, ServiceProvider.active_jobs) \
+            .filter(ServiceProvider.status == 'active').order_by(ServiceProvider.id)
+        open_jobs = {}
+        for row in rows:
+            by_type.setdefault(row.service_type, []).append(ProviderCandidate(
+                row.id, row.name, row.service_type, row.rating or 0.0, row.latitude, row.longitude, row.geohash))
+            if row.active_jobs:
+                open_jobs[row.id] = row.active_jobs
+        self._by_type = by_type
+        self._open_jobs = open_jobs
+        self._type_words = {service_type: _service_words(service_type) for service_type in by_type}
+        self._pools = {}
+        self._geo_buckets = {}
+        self.version = version
+
+    def _pool(self, categories):
+        """Providers that can take every one of `categories`, highest rated first
+        (built once per set of categories)"""
+        key = tuple(sorted(set(categories)))
+        pool = self._pools.get(key)
+        if pool is None:
+            if len(key) == 1:
+                words = _service_words(key[0])
+                pool = tuple(sorted(
+                    (c for service_type, type_words in self._type_words.items() if type_words and type_words <= words
+                     for c in self._by_type[service_type]),
+                    key=lambda c: (-c.rating, c.id)
+                ))
+            else:
+                pool = self._pool(key[:1])
+                for category in key[1:]:
+                    allowed = {c.id for c in self._pool((category,))}
+                    pool = tuple(c for c in pool if c.id in allowed)
+            self._pools[key] = pool
+        return pool
+
+    def rank(self, categories, limit=5):
+        """Up to `limit` (candidate, open_jobs, score) for a request needing all of
+        `categories`, best first: score is rating less MATCH_WORKLOAD_PENALTY per open job,
+        ties going to the less busy provider. Providers at MATCH_MAX_OPEN_JOBS are left out.
+        """
+        self.refresh()
+        if not categories:
+            return []
+        pool = self._pool(categories)
+        penalty = app.config['MATCH_WORKLOAD_PENALTY']
+        max_jobs = app.config['MATCH_MAX_OPEN_JOBS']
+        open_jobs = self._open_jobs
+        best = []  # min-heap of the top `limit` (score, -jobs, -id, candidate)
+        for candidate in pool:
+            # The pool is in rating order and a score never exceeds the rating,
+            # so nobody further down can displace the current top `limit`
+            if len(best) == limit and candidate.rating < best[0][0]:
+                break
+            jobs = open_jobs.get(candidate.id, 0)
+            if jobs >= max_jobs:
+                continue
+            entry = (candidate.rating - penalty * jobs, -jobs, -candidate.id, candidate)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        return [(candidate, -jobs, round(score, 3)) for score, jobs, _, candidate in sorted(best, reverse=True)]
+
+    def nearest(self, categories, latitude, longitude, k=5):
+        """The `k` located providers closest to a point that can take all of `categories`:
+        [(candidate, open_jobs, distance_km)], nearest first."""
+        self.refresh()
+        if not categories:
+            return []
+        key = tuple(sorted(set(categories)))
+        buckets = self._geo_buckets.get(key)
+        if buckets is None:
+            buckets = {precision: {} for precision in range(1, GEO_BUCKET_PRECISION + 1)}
+            for candidate in self._pool(key):
+                if candidate.geohash:
+                    for precision, cells in buckets.items():
+                        cells.setdefault(candidate.geohash[:precision], []).append(candidate)
+            self._geo_buckets[key] = buckets
+        distance = lambda c: haversine_km(latitude, longitude, c.latitude, c.longitude)
+        for precision in range(GEO_BUCKET_PRECISION, 0, -1):
+            cells = buckets[precision]
+            found = [c for cell in geohash_block(latitude, longitude, precision) for c in cells.get(cell, ())]
+            if len(found) < k:
+                continue
+            closest = heapq.nsmallest(k, ((distance(c), c.id, c) for c in found))
+            # The 3x3 block reaches at least one whole cell beyond the point in every
+            # direction, so nothing outside it can be nearer than that
+            lat_size, lon_size = geohash_cell_size(precision)
+            reach = min(lat_size, lon_size * math.cos(math.radians(latitude))) * math.pi * EARTH_RADIUS_KM / 180
+            if closest[-1][0] <= reach:
+                break
+        else:
+            located = [c for cells in buckets[1].values() for c in cells]
+            closest = heapq.nsmallest(k, ((distance(c), c.id, c) for c in located))
+        return [(c, self._open_jobs.get(c.id, 0), round(km, 3)) for km, _, c in closest]
+
+    def record_assignment(self, provider_id):
+        with self._lock:
+            self._open_jobs[provider_id] = self._open_jobs.get(provider_id, 0) + 1
+
+provider_matcher = ProviderMatcher()
+
+def request_categories(request_ids):
+    """{request_id: [category, ...]} from the normalized line items"""
+    categories = {}
+    rows = db.session.query(ServiceRequestItem.request_id, ServiceRequestItem.category) \
+        .filter(ServiceRequestItem.request_id.in_(request_ids)).distinct()
+    for request_id, category in rows:
+        categories.setdefault(request_id, []).append(category)
+    return categories
+
+def claim_service_request(request_id, provider_id, now, when=None):
+    """Assign an active provider to a pending, unassigned request, copying the provider's
+    name, email and phone, in one conditional UPDATE. With `when` (preferred_date,
+    preferred_time) the provider must also be free then. False when the request was
+    taken or moved on meanwhile, or the provider is inactive or busy."""
+    provider = ServiceProvider.__table__
+    active = and_(provider.c.id == provider_id, provider.c.status == 'active')
+    detail = lambda column: select(column).where(active).scalar_subquery()
+    free = [~schedule_clash(provider_id, *when)] if when and _minutes(when[1]) is not None else []
+    result = db.session.execute(
+        update(ServiceRequest)
+        .where(ServiceRequest.request_id == request_id,
+               ServiceRequest.assigned_provider_id.is_(None),
+               ServiceRequest.status == 'pending',
+               exists().where(active), *free)
+        .values(assigned_provider_id=provider_id, provider_name=detail(provider.c.name),
+                provider_email=detail(provider.c.email), provider_phone=detail(provider.c.phone),
+                updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    move_job_counters((None, None), (provider_id, 'pending'))
+    return True
+
+def candidate_dict(candidate, open_jobs, score):
+    return {
+        'provider_id': candidate.id,
+        'name': candidate.name,
+        'service_type': candidate.service_type,
+        'rating': candidate.rating,
+        'open_jobs': open_jobs,
+        'score': score
+    }
+
+# Ranked candidates tried, best first, before auto-assignment gives up on a request
+MATCH_CLAIM_ATTEMPTS = 10
+
+def auto_assign(request_id, categories, when, confirm=False, now=None):
+    """Assign the best-ranked provider that is free at `when` (preferred_date, preferred_time)
+    and can still be claimed, without committing.
+    Returns (request_obj or None, ranked candidates, error message or None)."""
+    now = now or datetime.utcnow()
+    if not categories:
+        return None, [], 'Service request has no items to match on'
+    ranked = provider_matcher.rank(categories, MATCH_CLAIM_ATTEMPTS)
+    for candidate, _, _ in ranked:
+        if claim_service_request(request_id, candidate.id, now, when):
+            provider_matcher.record_assignment(candidate.id)
+            request_obj = ServiceRequest.query.populate_existing().get(request_id)
+            if confirm:
+                apply_service_request_changes(request_obj, {'status': 'confirmed'}, now)
+            return request_obj, ranked, None
+        # Either the request was taken meanwhile, or this provider is busy then or just went inactive
+        still_open = db.session.query(ServiceRequest.request_id).filter(
+            ServiceRequest.request_id == request_id, ServiceRequest.assigned_provider_id.is_(None),
+            ServiceRequest.status == 'pending').first()
+        if not still_open:
+            return None, ranked, 'Service request is no longer pending and unassigned'
+    return None, ranked, 'No available provider matches this request'
+
+@app.route('/api/service-requests/<int:request_id>/candidates', methods=['GET'])
+def get_provider_candidates(request_id):
+    """Ranked providers for a service request, best first (?limit=, default 5)"""
+    ServiceRequest.query.get_or_404(request_id)
+    limit = min(max(request.args.get('limit', 5, type=int), 1), 50)
+    categories = request_categories([request_id]).get(request_id, [])
+    return jsonify({
+        'request_id': request_id,
+        'categories': categories,
+        'candidates': [candidate_dict(*ranked) for ranked in provider_matcher.rank(categories, limit)]
+    })
+
+@app.route('/api/service-requests/<int:request_id>/nearest-providers', methods=['GET'])
+def get_nearest_providers(request_id):
+    """The ?k= (default 5) closest active providers that can do the request's items"""
+    request_obj = ServiceRequest.query.get_or_404(request_id)
+    if request_obj.latitude is None:
+        return jsonify({'error': 'Service request address could not be located'}), 422
+    k = min(max(request.args.get('k', 5, type=int), 1), NEAREST_MAX_K)
+    categories = request_categories([request_id]).get(request_id, [])
+    nearest = provider_matcher.nearest(categories, request_obj.latitude, request_obj.longitude, k)
+    return jsonify({
+        'request_id': request_id,
+        'latitude': request_obj.latitude,
+        'longitude': request_obj.longitude,
+        'providers': [{
+            'provider_id': candidate.id,
+            'name': candidate.name,
+            'service_type': candidate.service_type,
+            'rating': candidate.rating,
+            'open_jobs': open_jobs,
+            'distance_km': distance_km
+        } for candidate, open_jobs, distance_km in nearest]
+    })
+
+@app.route('/api/service-requests/<int:request_id>/auto-assign', methods=['POST'])
+def auto_assign_service_request(request_id):
+    """Assign the best available provider to a pending request.
+    Body: { confirm?: bool } - confirm also moves it to 'confirmed' and sends the assignment emails
+    """
+    request_obj = ServiceRequest.query.get_or_404(request_id)
+    data = request.get_json(silent=True) or {}
+    if request_obj.assigned_provider_id or request_obj.status != 'pending':
+        return jsonify({'error': 'Service request is no longer pending and unassigned'}), 409
+    categories = request_categories([request_id]).get(request_id, [])
+    request_obj, ranked, error = auto_assign(request_id, categories,
+                                             (request_obj.preferred_date, request_obj.preferred_time),
+                                             bool(data.get('confirm')))
+    if error:
+        db.session.rollback()
+        return jsonify({'error': error, 'categories': categories,
+                        'candidates': [candidate_dict(*r) for r in ranked]}), 409
+    db.session.commit()
+    return jsonify({
+        'message': 'Provider assigned',
+        'request': request_obj.to_dict(),
+        'candidates': [candidate_dict(*r) for r in ranked]
+    })
+
+@app.route('/api/service-requests/auto-assign', methods=['POST'])
+def auto_assign_pending_queue():
+    """Auto-assign every pending, unassigned request for one day, most urgent and oldest first.
+    Body: { date?: 'YYYY-MM-DD' (default today), confirm?: bool }
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        day = datetime.strptime(data['date'], '%Y-%m-%d').date() if data.get('date') else datetime.utcnow().date()
+    except (TypeError, ValueError):
+        return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+
+    queue = db.session.query(ServiceRequest.request_id, ServiceRequest.preferred_time) \
+        .filter(ServiceRequest.preferred_date == day, ServiceRequest.status == 'pending',
+                ServiceRequest.assigned_provider_id.is_(None)) \
+        .order_by(case(PRIORITY_ORDER, value=func.lower(ServiceRequest.priority), else_=PRIORITY_ORDER['medium']),
+                  ServiceRequest.created_at, ServiceRequest.request_id) \
+        .limit(app.config['MATCH_BATCH_MAX']).all()
+    categories = request_categories([row.request_id for row in queue])
+
+    now = datetime.utcnow()
+    results = []
+    for row in queue:
+        request_obj, _, error = auto_assign(row.request_id, categories.get(row.request_id, []),
+                                            (day, row.preferred_time), bool(data.get('confirm')), now)
+        if error:
+            results.append({'request_id': row.request_id, 'error': error})
+        else:
+            results.append({'request_id': row.request_id, 'assigned_provider_id': request_obj.assigned_provider_id,
+                            'provider_name': request_obj.provider_name})
+
+    try:
         db.session.commit()
-        return jsonify({'message': f'Sent {sent_count} reminder emails'})
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+    return jsonify({
+        'date': day.isoformat(),
+        'assigned': sum(1 for result in results if 'assigned_provider_id' in result),
+        'results': results
+    })
+
+# ========== JOB COUNTERS ==========
+# Providers keep running counts of the jobs (service requests and bookings) assigned
+# to them, and customers of their service requests. They change by UPDATE ... SET
+# n = n + delta in the transaction that changes the job, so concurrent changes never
+# overwrite each other, and reconcile_counters() rebuilds them from history.
+
+PROVIDER_COUNTERS = ('total_bookings', 'active_jobs', 'completed_jobs')
+
+def move_job_counters(before, after):
+    """Adjust provider counters for a job whose (assigned provider, status) went from
+    `before` to `after`; (None, None) stands for no job. Bumps updated_at on each
+    provider changed, so the providers ETag follows the counters."""
+    deltas = {}
+    for (provider_id, status), sign in ((before, -1), (after, 1)):
+        if provider_id:
+            counts = deltas.setdefault(provider_id, dict.fromkeys(PROVIDER_COUNTERS, 0))
+            counts['total_bookings'] += sign
+            if status in OPEN_JOB_STATUSES:
+                counts['active_jobs'] += sign
+            elif status == 'completed':
+                counts['completed_jobs'] += sign
+    now = datetime.utcnow()
+    for provider_id, counts in deltas.items():
+        changes = {name: func.coalesce(getattr(ServiceProvider, name), 0) + delta
+                   for name, delta in counts.items() if delta}
+        if changes:
+            db.session.execute(
+                update(ServiceProvider).where(ServiceProvider.id == provider_id)
+                .values(updated_at=now, **changes)
+                .execution_options(synchronize_session=False)
+            )
+
+def reconcile_counters():
+    """Recompute every provider's and customer's counters from the service requests
+    and bookings on record, one UPDATE per table. Rows that are already right are left
+    alone. Returns {table: rows corrected}."""
+    provider = ServiceProvider.__table__
+    def jobs(condition=None):
+        total = None
+        for model in (ServiceRequest, Booking):
+            count = select(func.count()).select_from(model).where(model.assigned_provider_id == provider.c.id)
+            if condition is not None:
+                count = count.where(condition(model))
+            total = count.scalar_subquery() if total is None else total + count.scalar_subquery()
+        return total
+    counts = {
+        'total_bookings': jobs(),
+        'active_jobs': jobs(lambda model: model.status.in_(OPEN_JOB_STATUSES)),
+        'completed_jobs': jobs(lambda model: model.status == 'completed')
+    }
+    stale = or_(*[func.coalesce(provider.c[name], -1) != value for name, value in counts.items()])
+    corrected = {provider.name: db.session.execute(
+        provider.update().where(stale).values(updated_at=datetime.utcnow(), **counts)).rowcount}
+
+    customer = Customer.__table__
+    requests = select(func.count()).select_from(ServiceRequest) \
+        .where(ServiceRequest.customer_id == customer.c.customer_id).scalar_subquery()
+    corrected[customer.name] = db.session.execute(
+        customer.update().where(func.coalesce(customer.c.total_bookings, -1) != requests)
+        .values(total_bookings=requests)).rowcount
+    db.session.commit()
+    provider_matcher.invalidate()
+    return corrected
+
+@app.route('/api/admin/reconcile-counters', methods=['POST'])
+def reconcile_counters_endpoint():
+    """Rebuild provider and customer job counters from the jobs on record"""
+    return jsonify({'corrected': reconcile_counters()})
+
+# ========== REVENUE ROLLUPS ==========
+
+def _add_to_rollup(day, category, job_count, customer_paid_cents, provider_payout_cents, commission_cents):
+    table = DailyRevenueRollup.__table__
+    stmt = dialect_insert(table).values(
+        day=day, category=category, job_count=job_count, customer_paid_cents=customer_paid_cents,
+        provider_payout_cents=provider_payout_cents, commission_cents=commission_cents
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.category],
+        set_={
+            'job_count': table.c.job_count + stmt.excluded.job_count,
+            'customer_paid_cents': table.c.customer_paid_cents + stmt.excluded.customer_paid_cents,
+            'provider_payout_cents': table.c.provider_payout_cents + stmt.excluded.provider_payout_cents,
+            'commission_cents': table.c.commission_cents + stmt.excluded.commission_cents,
+        }
+    ))
+
+def apply_rollup_delta(service_request, sign):
+    """Add (sign=1) or remove (sign=-1) a request's totals from the daily rollup.
+    Uses INSERT ... ON CONFLICT DO UPDATE SET x = x + delta, so concurrent updates
+    to the same day never overwrite each other.
+    """
+    day = (service_request.created_at or datetime.utcnow()).date()
+    _add_to_rollup(
+        day, ROLLUP_ALL_CATEGORIES, sign,
+        sign * (service_request.total_customer_paid_cents or 0),
+        sign * (service_request.total_provider_payout_cents or 0),
+        sign * (service_request.total_commission_earned_cents or 0)
+    )
+    item_totals = db.session.query(
+        ServiceRequestItem.category,
+        func.count(ServiceRequestItem.id),
+        func.sum(ServiceRequestItem.customer_price_cents),
+        func.sum(ServiceRequestItem.provider_price_cents),
+        func.sum(ServiceRequestItem.commission_cents)
+    ).filter(ServiceRequestItem.request_id == service_request.request_id) \
+        .group_by(ServiceRequestItem.category).all()
+    for category, count, customer_paid, provider_payout, commission in item_totals:
+        _add_to_rollup(
+            day, category, sign * count,
+            sign * (customer_paid or 0),
+            sign * (provider_payout or 0),
+            sign * (commission or 0)
+        )
+
+def rebuild_daily_rollups():
+    """Regenerate daily_revenue_rollup from the full request history with two
+    INSERT ... SELECT ... GROUP BY statements. Returns the number of rollup rows.
+    """
+    table = DailyRevenueRollup.__table__
+    # SQLite has no DATE type to CAST to; date() yields the same 'YYYY-MM-DD' text
+    if db.engine.dialect.name == 'sqlite':
+        day = func.date(ServiceRequest.created_at)
+    else:
+        day = cast(ServiceRequest.created_at, db.Date)
+    columns = ['day', 'category', 'job_count', 'customer_paid_cents', 'provider_payout_cents', 'commission_cents']
+    completed = ServiceRequest.status == 'completed'
+
+    db.session.execute(table.delete())
+    db.session.execute(table.insert().from_select(columns, db.session.query(
+        day, literal(ROLLUP_ALL_CATEGORIES),
+        func.count(ServiceRequest.request_id),
+        func.coalesce(func.sum(ServiceRequest.total_customer_paid_cents), 0),
+        func.coalesce(func.sum(ServiceRequest.total_provider_payout_cents), 0),
+        func.coalesce(func.sum(ServiceRequest.total_commission_earned_cents), 0)
+    ).filter(completed).group_by(day).statement))
+    db.session.execute(table.insert().from_select(columns, db.session.query(
+        day, ServiceRequestItem.category,
+        func.count(ServiceRequestItem.id),
+        func.coalesce(func.sum(ServiceRequestItem.customer_price_cents), 0),
+        func.coalesce(func.sum(ServiceRequestItem.provider_price_cents), 0),
+        func.coalesce(func.sum(ServiceRequestItem.commission_cents), 0)
+    ).join(ServiceRequest, ServiceRequest.request_id == ServiceRequestItem.request_id)
+        .filter(completed).group_by(day, ServiceRequestItem.category).statement))
+    db.session.commit()
+    return DailyRevenueRollup.query.count()
+
 # Admin dashboard endpoints
 @app.route('/api/admin/stats', methods=['GET'])
 def get_admin_stats():
     """Get admin dashboard statistics"""
-    total_bookings = ServiceRequest.query.count()
-    pending = ServiceRequest.query.filter_by(status='pending').count()
-    completed = ServiceRequest.query.filter_by(status='completed').count()
-    
     # This month's revenue
     now = datetime.utcnow()
     month_start = datetime(now.year, now.month, 1)
-    this_month = ServiceRequest.query.filter(
-        ServiceRequest.created_at >= month_start,
-        ServiceRequest.status == 'completed'
-    ).all()
     
-    this_month_revenue = sum(float(req.total_customer_paid) for req in this_month)
-    this_month_commission = sum(float(req.total_commission_earned) for req in this_month)
-    avg_commission = this_month_commission / len(this_month) if this_month else 0
+    # Whole dashboard in one statement: request counts come from service_request,
+    # revenue from the daily rollup (a few hundred rows, not the whole history)
+    rollup = DailyRevenueRollup
+    totals = rollup.category == ROLLUP_ALL_CATEGORIES
+    this_month = and_(totals, rollup.day >= month_start.date())
+    (total_bookings, pending, completed_count, this_month_jobs,
+     this_month_revenue, this_month_commission, total_commission) = db.session.query(
+        db.session.query(func.count(ServiceRequest.request_id)).scalar_subquery(),
+        db.session.query(func.count(ServiceRequest.request_id))
+            .filter(ServiceRequest.status == 'pending').scalar_subquery(),
+        db.session.query(func.coalesce(func.sum(rollup.job_count), 0)).filter(totals).scalar_subquery(),
+        db.session.query(func.coalesce(func.sum(rollup.job_count), 0)).filter(this_month).scalar_subquery(),
+        db.session.query(func.sum(rollup.customer_paid_cents)).filter(this_month).scalar_subquery(),
+        db.session.query(func.sum(rollup.commission_cents)).filter(this_month).scalar_subquery(),
+        db.session.query(func.sum(rollup.commission_cents)).filter(totals).scalar_subquery()
+    ).one()
     
-    # Total commission
-    all_completed = ServiceRequest.query.filter_by(status='completed').all()
-    total_commission = sum(float(req.total_commission_earned) for req in all_completed)
+    this_month_revenue = from_cents(this_month_revenue) if this_month_revenue is not None else 0
+    this_month_commission = from_cents(this_month_commission) if this_month_commission is not None else 0
+    total_commission = from_cents(total_commission) if total_commission is not None else 0
+    avg_commission = this_month_commission / this_month_jobs if this_month_jobs else 0
     
     return jsonify({
         'total_bookings': total_bookings,
         'pending': pending,
-        'completed': completed,
+        'completed': completed_count,
         'this_month_revenue': this_month_revenue,
         'this_month_commission': this_month_commission,
         'total_commission': total_commission,
@@ -1236,264 +4045,412 @@ def get_financial_report():
     from_date = request.args.get('from')
     to_date = request.args.get('to')
     
-    query = ServiceRequest.query.filter_by(status='completed')
-    
+    # Read from the daily rollup. created_at <= 'to' (midnight) covers days before 'to'
+    rollup = DailyRevenueRollup
+    filters = []
     if from_date:
-        query = query.filter(ServiceRequest.created_at >= datetime.strptime(from_date, '%Y-%m-%d'))
+        filters.append(rollup.day >= datetime.strptime(from_date, '%Y-%m-%d').date())
     if to_date:
-        query = query.filter(ServiceRequest.created_at <= datetime.strptime(to_date, '%Y-%m-%d'))
+        filters.append(rollup.day < datetime.strptime(to_date, '%Y-%m-%d').date())
     
-    requests = query.all()
+    number_of_jobs, total_customer_payments, total_provider_payouts, total_commission = db.session.query(
+        func.coalesce(func.sum(rollup.job_count), 0),
+        func.sum(rollup.customer_paid_cents),
+        func.sum(rollup.provider_payout_cents),
+        func.sum(rollup.commission_cents)
+    ).filter(rollup.category == ROLLUP_ALL_CATEGORIES, *filters).one()
     
-    total_customer_payments = sum(float(req.total_customer_paid) for req in requests)
-    total_provider_payouts = sum(float(req.total_provider_payout) for req in requests)
-    total_commission = sum(float(req.total_commission_earned) for req in requests)
-    avg_commission = total_commission / len(requests) if requests else 0
+    total_customer_payments = from_cents(total_customer_payments) if total_customer_payments is not None else 0
+    total_provider_payouts = from_cents(total_provider_payouts) if total_provider_payouts is not None else 0
+    total_commission = from_cents(total_commission) if total_commission is not None else 0
+    avg_commission = total_commission / number_of_jobs if number_of_jobs else 0
     
-    # Breakdown by category
-    category_breakdown = {}
-    for req in requests:
-        items = json.loads(req.selected_items)
-        for item in items:
-            cat = item.get('category')
-            if cat not in category_breakdown:
-                category_breakdown[cat] = {'count': 0, 'commission': 0}
-            category_breakdown[cat]['count'] += 1
-            category_breakdown[cat]['commission'] += item.get('commission', 0)
+    # Breakdown by category (one count per line item)
+    breakdown_rows = db.session.query(
+        rollup.category,
+        func.sum(rollup.job_count),
+        func.sum(rollup.commission_cents)
+    ).filter(rollup.category != ROLLUP_ALL_CATEGORIES, *filters) \
+        .group_by(rollup.category).having(func.sum(rollup.job_count) > 0).all()
+    category_breakdown = {
+        category: {'count': count, 'commission': from_cents(commission) if commission is not None else 0}
+        for category, count, commission in breakdown_rows
+    }
     
     return jsonify({
         'total_customer_payments': total_customer_payments,
         'total_provider_payouts': total_provider_payouts,
         'total_commission': total_commission,
         'avg_commission': avg_commission,
-        'number_of_jobs': len(requests),
+        'number_of_jobs': number_of_jobs,
         'category_breakdown': category_breakdown
     })
 
+def calc_provider_price(customer_price):
+    """Provider base price for a customer price (10% commission)"""
+    return int(round(customer_price * 0.9))
+
+# (category, type, description, provider price, customer price,
+#  provider white surcharge, customer white surcharge, white surcharge applies)
+PRICING_SEED_DATA = [
+    # Couch Deep Cleaning (+10% commission)
+    ('Couch Deep Cleaning', '1 Seater Couch', '1 Seater Couch', calc_provider_price(220), 220, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '2 Seater Couch', '2 Seater Couch', calc_provider_price(440), 440, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '3 Seater Couch', '3 Seater Couch', calc_provider_price(550), 550, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '4 Seater Couch', '4 Seater Couch', calc_provider_price(660), 660, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '5 Seater Couch', '5 Seater Couch', calc_provider_price(770), 770, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '6 Seater Couch', '6 Seater Couch', calc_provider_price(880), 880, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '3 Seater L Couch', '3 Seater L Couch', calc_provider_price(660), 660, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '4 Seater L Couch', '4 Seater L Couch', calc_provider_price(770), 770, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '5 Seater L Couch', '5 Seater L Couch', calc_provider_price(880), 880, calc_provider_price(220), 220, True),
+    ('Couch Deep Cleaning', '6 Seater L Couch', '6 Seater L Couch', calc_provider_price(990), 990, calc_provider_price(220), 220, True),
+    # Carpet Deep Cleaning
+    ('Carpet Deep Cleaning', 'Extra-Small', 'Extra-Small', calc_provider_price(275), 275, 0, 0, False),
+    ('Carpet Deep Cleaning', 'Small', 'Small', calc_provider_price(330), 330, 0, 0, False),
+    ('Carpet Deep Cleaning', 'Medium', 'Medium', calc_provider_price(385), 385, 0, 0, False),
+    ('Carpet Deep Cleaning', 'Large', 'Large', calc_provider_price(440), 440, 0, 0, False),
+    ('Carpet Deep Cleaning', 'X-Large', 'X-Large', calc_provider_price(495), 495, 0, 0, False),
+    # Fitted Carpet Deep Cleaning
+    ('Fitted Carpet Deep Cleaning', 'Standard Room', 'Standard Room', calc_provider_price(495), 495, 0, 0, False),
+    ('Fitted Carpet Deep Cleaning', 'Master Bedroom', 'Master Bedroom', calc_provider_price(660), 660, 0, 0, False),
+    # Mattress Deep Cleaning
+    ('Mattress Deep Cleaning', 'Single', 'Single', calc_provider_price(385), 385, 0, 0, False),
+    ('Mattress Deep Cleaning', 'Double', 'Double', calc_provider_price(495), 495, 0, 0, False),
+    ('Mattress Deep Cleaning', 'Queen', 'Queen', calc_provider_price(550), 550, 0, 0, False),
+    ('Mattress Deep Cleaning', 'King', 'King', calc_provider_price(605), 605, 0, 0, False),
+    # Headboard Deep Cleaning
+    ('Headboard Deep Cleaning', 'Single', 'Single Headboard', calc_provider_price(220), 220, calc_provider_price(110), 110, True),
+    ('Headboard Deep Cleaning', 'Double', 'Double Headboard', calc_provider_price(275), 275, calc_provider_price(110), 110, True),
+    ('Headboard Deep Cleaning', 'Queen', 'Queen Headboard', calc_provider_price(330), 330, calc_provider_price(110), 110, True),
+    ('Headboard Deep Cleaning', 'King', 'King Headboard', calc_provider_price(385), 385, calc_provider_price(110), 110, True),
+    # Sleigh Bed Deep Cleaning
+    ('Sleigh Bed Deep Cleaning', 'Single', 'Single Sleigh Bed', calc_provider_price(330), 330, calc_provider_price(165), 165, True),
+    ('Sleigh Bed Deep Cleaning', 'Double', 'Double Sleigh Bed', calc_provider_price(385), 385, calc_provider_price(165), 165, True),
+    ('Sleigh Bed Deep Cleaning', 'Queen', 'Queen Sleigh Bed', calc_provider_price(418), 418, calc_provider_price(165), 165, True),
+    ('Sleigh Bed Deep Cleaning', 'King', 'King Sleigh Bed', calc_provider_price(440), 440, calc_provider_price(165), 165, True),
+    # Standard Apartment Cleaning
+    ('Standard Apartment Cleaning', 'Bachelor Apartment', 'Bachelor Apartment', calc_provider_price(330), 330, 0, 0, False),
+    ('Standard Apartment Cleaning', '1 Bedroom Apartment', '1BR Apartment', calc_provider_price(385), 385, 0, 0, False),
+    ('Standard Apartment Cleaning', '2 Bedroom Apartment', '2BR Apartment', calc_provider_price(440), 440, 0, 0, False),
+    ('Standard Apartment Cleaning', '3 Bedroom Apartment', '3BR Apartment', calc_provider_price(495), 495, 0, 0, False),
+    # Apartment Spring Cleaning
+    ('Apartment Spring Cleaning', 'Bachelor Apartment', 'Bachelor Apartment Spring', calc_provider_price(660), 660, 0, 0, False),
+    ('Apartment Spring Cleaning', '1 Bedroom Apartment', '1BR Spring', calc_provider_price(770), 770, 0, 0, False),
+    ('Apartment Spring Cleaning', '2 Bedroom Apartment', '2BR Spring', calc_provider_price(880), 880, 0, 0, False),
+    ('Apartment Spring Cleaning', '3 Bedroom Apartment', '3BR Spring', calc_provider_price(1100), 1100, 0, 0, False),
+    # Apartment Deep Cleaning
+    ('Apartment Deep Cleaning', 'Bachelor Apartment', 'Empty/With Items - Bachelor', calc_provider_price(1980), 1980, 0, 0, False),
+    ('Apartment Deep Cleaning', '1 Bedroom Apartment', '1BR Deep', calc_provider_price(2200), 2200, 0, 0, False),
+    ('Apartment Deep Cleaning', '2 Bedroom Apartment', '2BR Deep', calc_provider_price(2750), 2750, 0, 0, False),
+    ('Apartment Deep Cleaning', '3 Bedroom Apartment', '3BR Deep', calc_provider_price(3300), 3300, 0, 0, False),
+    # Empty Apartment Deep Cleaning
+    ('Empty Apartment Deep Cleaning', 'Bachelor Apartment', 'Empty Bachelor', calc_provider_price(1320), 1320, 0, 0, False),
+    ('Empty Apartment Deep Cleaning', '1 Bedroom Apartment', 'Empty 1BR', calc_provider_price(1430), 1430, 0, 0, False),
+    ('Empty Apartment Deep Cleaning', '2 Bedroom Apartment', 'Empty 2BR', calc_provider_price(1650), 1650, 0, 0, False),
+    ('Empty Apartment Deep Cleaning', '3 Bedroom Apartment', 'Empty 3BR', calc_provider_price(1980), 1980, 0, 0, False),
+    # House Spring Cleaning
+    ('House Spring Cleaning', '2 Bedroom House', '2BR Spring', calc_provider_price(1980), 1980, 0, 0, False),
+    ('House Spring Cleaning', '3 Bedroom House', '3BR Spring', calc_provider_price(2310), 2310, 0, 0, False),
+    ('House Spring Cleaning', '4 Bedroom House', '4BR Spring', calc_provider_price(2750), 2750, 0, 0, False),
+    ('House Spring Cleaning', '5 Bedroom House', '5BR Spring', calc_provider_price(3300), 3300, 0, 0, False),
+    # House Deep Cleaning
+    ('House Deep Cleaning', '2 Bedroom House', '2BR Deep', calc_provider_price(3960), 3960, 0, 0, False),
+    ('House Deep Cleaning', '3 Bedroom House', '3BR Deep', calc_provider_price(4950), 4950, 0, 0, False),
+    ('House Deep Cleaning', '4 Bedroom House', '4BR Deep', calc_provider_price(5940), 5940, 0, 0, False),
+    ('House Deep Cleaning', '5 Bedroom House', '5BR Deep', calc_provider_price(7150), 7150, 0, 0, False),
+    # Empty House Deep Cleaning
+    ('Empty House Deep Cleaning', '2 Bedroom House', 'Empty 2BR', calc_provider_price(2750), 2750, 0, 0, False),
+    ('Empty House Deep Cleaning', '3 Bedroom House', 'Empty 3BR', calc_provider_price(3850), 3850, 0, 0, False),
+    ('Empty House Deep Cleaning', '4 Bedroom House', 'Empty 4BR', calc_provider_price(4950), 4950, 0, 0, False),
+    ('Empty House Deep Cleaning', '5 Bedroom House', 'Empty 5BR', calc_provider_price(6050), 6050, 0, 0, False),
+]
+
+def seed_pricing_rows():
+    """Upsert PRICING_SEED_DATA into service_pricing; returns the number of rows written"""
+    rows = [{
+        'service_category': data[0], 'service_type': data[1], 'item_description': data[2],
+        'provider_base_price_cents': to_cents(data[3]), 'customer_display_price_cents': to_cents(data[4]),
+        'color_surcharge_provider_cents': to_cents(data[5]), 'color_surcharge_customer_cents': to_cents(data[6]),
+        'is_white_applicable': data[7], 'commission_percentage': 10
+    } for data in PRICING_SEED_DATA]
+    upsert_pricing_rows(rows)
+    bump_data_version('pricing')
+    db.session.commit()
+    pricing_catalog.invalidate()
+    return len(rows)
+
 # Seed pricing data endpoint (for initialization)
 @app.route('/api/admin/seed-pricing', methods=['POST'])
 def seed_pricing():
     """Seed the service_pricing table with initial data"""
-    # Helper function to calculate provider base price (10% commission)
-    def calc_provider_price(customer_price):
-        return int(round(customer_price * 0.9))
-    
-    pricing_data = [
-        # Couch Deep Cleaning (+10% commission)
-        ('Couch Deep Cleaning', '1 Seater Couch', '1 Seater Couch', calc_provider_price(220), 220, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '2 Seater Couch', '2 Seater Couch', calc_provider_price(440), 440, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '3 Seater Couch', '3 Seater Couch', calc_provider_price(550), 550, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '4 Seater Couch', '4 Seater Couch', calc_provider_price(660), 660, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '5 Seater Couch', '5 Seater Couch', calc_provider_price(770), 770, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '6 Seater Couch', '6 Seater Couch', calc_provider_price(880), 880, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '3 Seater L Couch', '3 Seater L Couch', calc_provider_price(660), 660, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '4 Seater L Couch', '4 Seater L Couch', calc_provider_price(770), 770, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '5 Seater L Couch', '5 Seater L Couch', calc_provider_price(880), 880, calc_provider_price(220), 220, True),
-        ('Couch Deep Cleaning', '6 Seater L Couch', '6 Seater L Couch', calc_provider_price(990), 990, calc_provider_price(220), 220, True),
-        # Carpet Deep Cleaning
-        ('Carpet Deep Cleaning', 'Extra-Small', 'Extra-Small', calc_provider_price(275), 275, 0, 0, False),
-        ('Carpet Deep Cleaning', 'Small', 'Small', calc_provider_price(330), 330, 0, 0, False),
-        ('Carpet Deep Cleaning', 'Medium', 'Medium', calc_provider_price(385), 385, 0, 0, False),
-        ('Carpet Deep Cleaning', 'Large', 'Large', calc_provider_price(440), 440, 0, 0, False),
-        ('Carpet Deep Cleaning', 'X-Large', 'X-Large', calc_provider_price(495), 495, 0, 0, False),
-        # Fitted Carpet Deep Cleaning
-        ('Fitted Carpet Deep Cleaning', 'Standard Room', 'Standard Room', calc_provider_price(495), 495, 0, 0, False),
-        ('Fitted Carpet Deep Cleaning', 'Master Bedroom', 'Master Bedroom', calc_provider_price(660), 660, 0, 0, False),
-        # Mattress Deep Cleaning
-        ('Mattress Deep Cleaning', 'Single', 'Single', calc_provider_price(385), 385, 0, 0, False),
-        ('Mattress Deep Cleaning', 'Double', 'Double', calc_provider_price(495), 495, 0, 0, False),
-        ('Mattress Deep Cleaning', 'Queen', 'Queen', calc_provider_price(550), 550, 0, 0, False),
-        ('Mattress Deep Cleaning', 'King', 'King', calc_provider_price(605), 605, 0, 0, False),
-        # Headboard Deep Cleaning
-        ('Headboard Deep Cleaning', 'Single', 'Single Headboard', calc_provider_price(220), 220, calc_provider_price(110), 110, True),
-        ('Headboard Deep Cleaning', 'Double', 'Double Headboard', calc_provider_price(275), 275, calc_provider_price(110), 110, True),
-        ('Headboard Deep Cleaning', 'Queen', 'Queen Headboard', calc_provider_price(330), 330, calc_provider_price(110), 110, True),
-        ('Headboard Deep Cleaning', 'King', 'King Headboard', calc_provider_price(385), 385, calc_provider_price(110), 110, True),
-        # Sleigh Bed Deep Cleaning
-        ('Sleigh Bed Deep Cleaning', 'Single', 'Single Sleigh Bed', calc_provider_price(330), 330, calc_provider_price(165), 165, True),
-        ('Sleigh Bed Deep Cleaning', 'Double', 'Double Sleigh Bed', calc_provider_price(385), 385, calc_provider_price(165), 165, True),
-        ('Sleigh Bed Deep Cleaning', 'Queen', 'Queen Sleigh Bed', calc_provider_price(418), 418, calc_provider_price(165), 165, True),
-        ('Sleigh Bed Deep Cleaning', 'King', 'King Sleigh Bed', calc_provider_price(440), 440, calc_provider_price(165), 165, True),
-        # Standard Apartment Cleaning
-        ('Standard Apartment Cleaning', 'Bachelor Apartment', 'Bachelor Apartment', calc_provider_price(330), 330, 0, 0, False),
-        ('Standard Apartment Cleaning', '1 Bedroom Apartment', '1BR Apartment', calc_provider_price(385), 385, 0, 0, False),
-        ('Standard Apartment Cleaning', '2 Bedroom Apartment', '2BR Apartment', calc_provider_price(440), 440, 0, 0, False),
-        ('Standard Apartment Cleaning', '3 Bedroom Apartment', '3BR Apartment', calc_provider_price(495), 495, 0, 0, False),
-        # Apartment Spring Cleaning
-        ('Apartment Spring Cleaning', 'Bachelor Apartment', 'Bachelor Apartment Spring', calc_provider_price(660), 660, 0, 0, False),
-        ('Apartment Spring Cleaning', '1 Bedroom Apartment', '1BR Spring', calc_provider_price(770), 770, 0, 0, False),
-        ('Apartment Spring Cleaning', '2 Bedroom Apartment', '2BR Spring', calc_provider_price(880), 880, 0, 0, False),
-        ('Apartment Spring Cleaning', '3 Bedroom Apartment', '3BR Spring', calc_provider_price(1100), 1100, 0, 0, False),
-        # Apartment Deep Cleaning
-        ('Apartment Deep Cleaning', 'Bachelor Apartment', 'Empty/With Items - Bachelor', calc_provider_price(1980), 1980, 0, 0, False),
-        ('Apartment Deep Cleaning', '1 Bedroom Apartment', '1BR Deep', calc_provider_price(2200), 2200, 0, 0, False),
-        ('Apartment Deep Cleaning', '2 Bedroom Apartment', '2BR Deep', calc_provider_price(2750), 2750, 0, 0, False),
-        ('Apartment Deep Cleaning', '3 Bedroom Apartment', '3BR Deep', calc_provider_price(3300), 3300, 0, 0, False),
-        # Empty Apartment Deep Cleaning
-        ('Empty Apartment Deep Cleaning', 'Bachelor Apartment', 'Empty Bachelor', calc_provider_price(1320), 1320, 0, 0, False),
-        ('Empty Apartment Deep Cleaning', '1 Bedroom Apartment', 'Empty 1BR', calc_provider_price(1430), 1430, 0, 0, False),
-        ('Empty Apartment Deep Cleaning', '2 Bedroom Apartment', 'Empty 2BR', calc_provider_price(1650), 1650, 0, 0, False),
-        ('Empty Apartment Deep Cleaning', '3 Bedroom Apartment', 'Empty 3BR', calc_provider_price(1980), 1980, 0, 0, False),
-        # House Spring Cleaning
-        ('House Spring Cleaning', '2 Bedroom House', '2BR Spring', calc_provider_price(1980), 1980, 0, 0, False),
-        ('House Spring Cleaning', '3 Bedroom House', '3BR Spring', calc_provider_price(2310), 2310, 0, 0, False),
-        ('House Spring Cleaning', '4 Bedroom House', '4BR Spring', calc_provider_price(2750), 2750, 0, 0, False),
-        ('House Spring Cleaning', '5 Bedroom House', '5BR Spring', calc_provider_price(3300), 3300, 0, 0, False),
-        # House Deep Cleaning
-        ('House Deep Cleaning', '2 Bedroom House', '2BR Deep', calc_provider_price(3960), 3960, 0, 0, False),
-        ('House Deep Cleaning', '3 Bedroom House', '3BR Deep', calc_provider_price(4950), 4950, 0, 0, False),
-        ('House Deep Cleaning', '4 Bedroom House', '4BR Deep', calc_provider_price(5940), 5940, 0, 0, False),
-        ('House Deep Cleaning', '5 Bedroom House', '5BR Deep', calc_provider_price(7150), 7150, 0, 0, False),
-        # Empty House Deep Cleaning
-        ('Empty House Deep Cleaning', '2 Bedroom House', 'Empty 2BR', calc_provider_price(2750), 2750, 0, 0, False),
-        ('Empty House Deep Cleaning', '3 Bedroom House', 'Empty 3BR', calc_provider_price(3850), 3850, 0, 0, False),
-        ('Empty House Deep Cleaning', '4 Bedroom House', 'Empty 4BR', calc_provider_price(4950), 4950, 0, 0, False),
-        ('Empty House Deep Cleaning', '5 Bedroom House', 'Empty 5BR', calc_provider_price(6050), 6050, 0, 0, False),
-    ]
-    
-    count = 0
-    for data in pricing_data:
-        existing = ServicePricing.query.filter_by(
-            service_category=data[0],
-            service_type=data[1]
-        ).first()
-        if existing:
-            # Update existing record
-            existing.item_description = data[2]
-            existing.provider_base_price = data[3]
-            existing.customer_display_price = data[4]
-            existing.color_surcharge_provider = data[5]
-            existing.color_surcharge_customer = data[6]
-            existing.is_white_applicable = data[7]
-            existing.commission_percentage = 10
-            count += 1
-        else:
-            # Create new record
-            pricing = ServicePricing(
-                service_category=data[0],
-                service_type=data[1],
-                item_description=data[2],
-                provider_base_price=data[3],
-                customer_display_price=data[4],
-                color_surcharge_provider=data[5],
-                color_surcharge_customer=data[6],
-                is_white_applicable=data[7],
-                commission_percentage=10
-            )
-            db.session.add(pricing)
-            count += 1
-    
-    db.session.commit()
+    count = seed_pricing_rows()
     return jsonify({'message': f'Updated/Created {count} pricing records'})
 
+# ========== BULK IMPORT ==========
+
+class ImportRowError(ValueError):
+    pass
+
+def _import_value(row, field, convert, default=None, required=False):
+    value = row.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ImportRowError(f'Missing required field: {field}')
+        return default
+    try:
+        return convert(value.strip() if isinstance(value, str) else value)
+    except (TypeError, ValueError, ArithmeticError):
+        raise ImportRowError(f'Invalid value for {field}: {value!r}')
+
+def _import_bool(value):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('1', 'true', 'yes', 'y'):
+        return True
+    if str(value).lower() in ('0', 'false', 'no', 'n'):
+        return False
+    raise ValueError(value)
+
+def _import_datetime(value):
+    return datetime.fromisoformat(value)
+
+def upsert_pricing_rows(rows):
+    """INSERT ... ON CONFLICT (service_category, service_type) DO UPDATE for pricing dicts"""
+    if not rows:
+        return
+    table = ServicePricing.__table__
+    now = datetime.utcnow()
+    stmt = dialect_insert(table)
+    updated = [name for name in rows[0] if name not in ('service_category', 'service_type')] + ['updated_at']
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.service_category, table.c.service_type],
+        set_={name: stmt.excluded[name] for name in updated}
+    ), [dict(row, created_at=now, updated_at=now) for row in rows])
+
+def _provider_import_row(row):
+    return {
+        'name': _import_value(row, 'name', str, required=True),
+        'service_type': _import_value(row, 'service_type', str, required=True),
+        'phone': _import_value(row, 'phone', str, required=True),
+        'email': _import_value(row, 'email', str, required=True),
+        'address': _import_value(row, 'address', str),
+        'experience_years': _import_value(row, 'experience_years', int, 0),
+        'hourly_rate': _import_value(row, 'hourly_rate', float, 0.0),
+        'rating': _import_value(row, 'rating', float, 0.0),
+        'status': _import_value(row, 'status', str, 'active'),
+        'registered': _import_value(row, 'registered', str, datetime.now().strftime('%Y-%m-%d')),
+    }
+
+def _import_providers(parsed):
+    """Providers are unique by email, as in create_provider: one IN query per chunk
+    finds the emails already registered, then the rest go in as one bulk insert."""
+    emails = {row['email'] for _, row in parsed}
+    taken = {email for (email,) in db.session.query(ServiceProvider.email)
+             .filter(ServiceProvider.email.in_(emails))}
+    rows, errors = [], []
+    for number, row in parsed:
+        if row['email'] in taken:
+            errors.append((number, 'Email already registered'))
+            continue
+        taken.add(row['email'])
+        rows.append(row)
+    if rows:
+        now = datetime.utcnow()
+        located = [dict(zip(('latitude', 'longitude', 'geohash'), locate_address(row['address']))) for row in rows]
+        db.session.execute(ServiceProvider.__table__.insert(),
+                           [dict(row, created_at=now, updated_at=now, **location)
+                            for row, location in zip(rows, located)])
+    return len(rows), 0, errors
+
+def _pricing_import_row(row):
+    customer_price = _import_value(row, 'customer_display_price', to_cents, required=True)
+    return {
+        'service_category': _import_value(row, 'service_category', str, required=True),
+        'service_type': _import_value(row, 'service_type', str, required=True),
+        'item_description': _import_value(row, 'item_description', str),
+        'provider_base_price_cents': _import_value(row, 'provider_base_price', to_cents,
+                                                   to_cents(calc_provider_price(customer_price / 100))),
+        'customer_display_price_cents': customer_price,
+        'color_surcharge_provider_cents': _import_value(row, 'color_surcharge_provider', to_cents, 0),
+        'color_surcharge_customer_cents': _import_value(row, 'color_surcharge_customer', to_cents, 0),
+        'is_white_applicable': _import_value(row, 'is_white_applicable', _import_bool, False),
+        'commission_percentage': _import_value(row, 'commission_percentage', Decimal, 10),
+    }
+
+def _import_pricing(parsed):
+    # Last row wins for a (category, type) repeated within the chunk
+    rows = {(row['service_category'], row['service_type']): row for _, row in parsed}
+    upsert_pricing_rows(list(rows.values()))
+    bump_data_version('pricing')
+    return len(rows), len(parsed) - len(rows), []
+
+def _booking_import_row(row):
+    booking = {
+        'name': _import_value(row, 'name', str, required=True),
+        'address': _import_value(row, 'address', str, required=True),
+        'date': _import_value(row, 'date', str, required=True),
+        'time': Booking.normalize_time(_import_value(row, 'time', str, required=True)),
+        'service': _import_value(row, 'service', str, required=True),
+        'details': _import_value(row, 'details', str),
+        'status': _import_value(row, 'status', str, 'pending'),
+        'amount': _import_value(row, 'amount', float, 0.0),
+        'created_at': _import_value(row, 'created_at', _import_datetime, datetime.utcnow()),
+    }
+    booking['updated_at'] = booking['created_at']
+    booking['dedup_key'] = Booking.make_dedup_key(booking['name'], booking['date'], booking['time'], booking['service'])
+    return booking
+
+def _import_bookings(parsed):
+    """Bulk insert of bookings whose dedup key is new. Keys already stored are found
+    with one IN query; ON CONFLICT DO NOTHING covers bookings created concurrently."""
+    table = Booking.__table__
+    keys = {row['dedup_key'] for _, row in parsed}
+    taken = {key for (key,) in db.session.query(Booking.dedup_key).filter(Booking.dedup_key.in_(keys))}
+    rows = []
+    for _, row in parsed:
+        if row['dedup_key'] not in taken:
+            taken.add(row['dedup_key'])
+            rows.append(row)
+    if rows:
+        db.session.execute(dialect_insert(table).on_conflict_do_nothing(index_elements=[table.c.dedup_key]), rows)
+    return len(rows), len(parsed) - len(rows), []
+
+# kind -> (row parser, chunk writer). A writer gets [(row number, parsed row)] and
+# returns (rows written, rows skipped, [(row number, error)]).
+IMPORTERS = {
+    'providers': (_provider_import_row, _import_providers),
+    'pricing': (_pricing_import_row, _import_pricing),
+    'bookings': (_booking_import_row, _import_bookings),
+}
+
+def read_import_rows(stream, fmt):
+    """Yield (row number, dict or None, error) from a text stream of NDJSON or CSV"""
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row, None
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, None, 'Invalid JSON'
+            continue
+        if isinstance(row, dict):
+            yield number, row, None
+        else:
+            yield number, None, 'Each line must be a JSON object'
+
+def import_rows(kind, stream, fmt='ndjson', chunk_size=None):
+    """Stream rows of `kind` from `stream`, validating and writing them a chunk at a
+    time (one bulk statement and one commit per chunk). A chunk the database rejects
+    is rolled back and its rows are reported as errors; the other chunks still load.
+    """
+    parse, write = IMPORTERS[kind]
+    chunk_size = chunk_size or app.config['IMPORT_CHUNK_SIZE']
+    report = {'kind': kind, 'received': 0, 'written': 0, 'skipped': 0, 'error_count': 0, 'errors': []}
+
+    def add_errors(errors):
+        report['error_count'] += len(errors)
+        room = app.config['IMPORT_MAX_ERRORS'] - len(report['errors'])
+        report['errors'].extend({'row': number, 'error': error} for number, error in errors[:max(room, 0)])
+
+    def flush(parsed):
+        try:
+            written, skipped, errors = write(parsed)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            written, skipped, errors = 0, 0, [(number, str(getattr(e, 'orig', e))) for number, _ in parsed]
+        report['written'] += written
+        report['skipped'] += skipped
+        add_errors(errors)
+
+    parsed = []
+    for number, row, error in read_import_rows(stream, fmt):
+        report['received'] += 1
+        if row is not None:
+            try:
+                parsed.append((number, parse(row)))
+            except ImportRowError as e:
+                error = str(e)
+        if error:
+            add_errors([(number, error)])
+        if len(parsed) >= chunk_size:
+            flush(parsed)
+            parsed = []
+    if parsed:
+        flush(parsed)
+    if kind == 'pricing':
+        pricing_catalog.invalidate()
+    return report
+
+@app.route('/api/admin/import/<kind>', methods=['POST'])
+def bulk_import(kind):
+    """Bulk-load providers, pricing or bookings from an NDJSON (default) or CSV body
+    (Content-Type: text/csv or ?format=csv), streamed and written in chunks"""
+    if kind not in IMPORTERS:
+        return jsonify({'error': f'Unknown import type: {kind}'}), 404
+    fmt = request.args.get('format') or ('csv' if 'csv' in (request.mimetype or '') else 'ndjson')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    return jsonify(import_rows(kind, stream, fmt))
+
 if __name__ == '__main__':
     import sys
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
         # Seed pricing data if table is empty
         if ServicePricing.query.count() == 0:
-            # Call seed function directly
-            # Helper function to calculate provider base price (10% commission)
-            def calc_provider_price(customer_price):
-                return int(round(customer_price * 0.9))
-            
-            pricing_data = [
-                # Couch Deep Cleaning (+10% commission)
-                ('Couch Deep Cleaning', '1 Seater Couch', '1 Seater Couch', calc_provider_price(220), 220, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '2 Seater Couch', '2 Seater Couch', calc_provider_price(440), 440, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '3 Seater Couch', '3 Seater Couch', calc_provider_price(550), 550, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '4 Seater Couch', '4 Seater Couch', calc_provider_price(660), 660, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '5 Seater Couch', '5 Seater Couch', calc_provider_price(770), 770, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '6 Seater Couch', '6 Seater Couch', calc_provider_price(880), 880, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '3 Seater L Couch', '3 Seater L Couch', calc_provider_price(660), 660, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '4 Seater L Couch', '4 Seater L Couch', calc_provider_price(770), 770, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '5 Seater L Couch', '5 Seater L Couch', calc_provider_price(880), 880, calc_provider_price(220), 220, True),
-                ('Couch Deep Cleaning', '6 Seater L Couch', '6 Seater L Couch', calc_provider_price(990), 990, calc_provider_price(220), 220, True),
-                # Carpet Deep Cleaning
-                ('Carpet Deep Cleaning', 'Extra-Small', 'Extra-Small', calc_provider_price(275), 275, 0, 0, False),
-                ('Carpet Deep Cleaning', 'Small', 'Small', calc_provider_price(330), 330, 0, 0, False),
-                ('Carpet Deep Cleaning', 'Medium', 'Medium', calc_provider_price(385), 385, 0, 0, False),
-                ('Carpet Deep Cleaning', 'Large', 'Large', calc_provider_price(440), 440, 0, 0, False),
-                ('Carpet Deep Cleaning', 'X-Large', 'X-Large', calc_provider_price(495), 495, 0, 0, False),
-                # Fitted Carpet Deep Cleaning
-                ('Fitted Carpet Deep Cleaning', 'Standard Room', 'Standard Room', calc_provider_price(495), 495, 0, 0, False),
-                ('Fitted Carpet Deep Cleaning', 'Master Bedroom', 'Master Bedroom', calc_provider_price(660), 660, 0, 0, False),
-                # Mattress Deep Cleaning
-                ('Mattress Deep Cleaning', 'Single', 'Single', calc_provider_price(385), 385, 0, 0, False),
-                ('Mattress Deep Cleaning', 'Double', 'Double', calc_provider_price(495), 495, 0, 0, False),
-                ('Mattress Deep Cleaning', 'Queen', 'Queen', calc_provider_price(550), 550, 0, 0, False),
-                ('Mattress Deep Cleaning', 'King', 'King', calc_provider_price(605), 605, 0, 0, False),
-                # Headboard Deep Cleaning
-                ('Headboard Deep Cleaning', 'Single', 'Single Headboard', calc_provider_price(220), 220, calc_provider_price(110), 110, True),
-                ('Headboard Deep Cleaning', 'Double', 'Double Headboard', calc_provider_price(275), 275, calc_provider_price(110), 110, True),
-                ('Headboard Deep Cleaning', 'Queen', 'Queen Headboard', calc_provider_price(330), 330, calc_provider_price(110), 110, True),
-                ('Headboard Deep Cleaning', 'King', 'King Headboard', calc_provider_price(385), 385, calc_provider_price(110), 110, True),
-                # Sleigh Bed Deep Cleaning
-                ('Sleigh Bed Deep Cleaning', 'Single', 'Single Sleigh Bed', calc_provider_price(330), 330, calc_provider_price(165), 165, True),
-                ('Sleigh Bed Deep Cleaning', 'Double', 'Double Sleigh Bed', calc_provider_price(385), 385, calc_provider_price(165), 165, True),
-                ('Sleigh Bed Deep Cleaning', 'Queen', 'Queen Sleigh Bed', calc_provider_price(418), 418, calc_provider_price(165), 165, True),
-                ('Sleigh Bed Deep Cleaning', 'King', 'King Sleigh Bed', calc_provider_price(440), 440, calc_provider_price(165), 165, True),
-                # Standard Apartment Cleaning
-                ('Standard Apartment Cleaning', 'Bachelor Apartment', 'Bachelor Apartment', calc_provider_price(330), 330, 0, 0, False),
-                ('Standard Apartment Cleaning', '1 Bedroom Apartment', '1BR Apartment', calc_provider_price(385), 385, 0, 0, False),
-                ('Standard Apartment Cleaning', '2 Bedroom Apartment', '2BR Apartment', calc_provider_price(440), 440, 0, 0, False),
-                ('Standard Apartment Cleaning', '3 Bedroom Apartment', '3BR Apartment', calc_provider_price(495), 495, 0, 0, False),
-                # Apartment Spring Cleaning
-                ('Apartment Spring Cleaning', 'Bachelor Apartment', 'Bachelor Apartment Spring', calc_provider_price(660), 660, 0, 0, False),
-                ('Apartment Spring Cleaning', '1 Bedroom Apartment', '1BR Spring', calc_provider_price(770), 770, 0, 0, False),
-                ('Apartment Spring Cleaning', '2 Bedroom Apartment', '2BR Spring', calc_provider_price(880), 880, 0, 0, False),
-                ('Apartment Spring Cleaning', '3 Bedroom Apartment', '3BR Spring', calc_provider_price(1100), 1100, 0, 0, False),
-                # Apartment Deep Cleaning
-                ('Apartment Deep Cleaning', 'Bachelor Apartment', 'Empty/With Items - Bachelor', calc_provider_price(1980), 1980, 0, 0, False),
-                ('Apartment Deep Cleaning', '1 Bedroom Apartment', '1BR Deep', calc_provider_price(2200), 2200, 0, 0, False),
-                ('Apartment Deep Cleaning', '2 Bedroom Apartment', '2BR Deep', calc_provider_price(2750), 2750, 0, 0, False),
-                ('Apartment Deep Cleaning', '3 Bedroom Apartment', '3BR Deep', calc_provider_price(3300), 3300, 0, 0, False),
-                # Empty Apartment Deep Cleaning
-                ('Empty Apartment Deep Cleaning', 'Bachelor Apartment', 'Empty Bachelor', calc_provider_price(1320), 1320, 0, 0, False),
-                ('Empty Apartment Deep Cleaning', '1 Bedroom Apartment', 'Empty 1BR', calc_provider_price(1430), 1430, 0, 0, False),
-                ('Empty Apartment Deep Cleaning', '2 Bedroom Apartment', 'Empty 2BR', calc_provider_price(1650), 1650, 0, 0, False),
-                ('Empty Apartment Deep Cleaning', '3 Bedroom Apartment', 'Empty 3BR', calc_provider_price(1980), 1980, 0, 0, False),
-                # House Spring Cleaning
-                ('House Spring Cleaning', '2 Bedroom House', '2BR Spring', calc_provider_price(1980), 1980, 0, 0, False),
-                ('House Spring Cleaning', '3 Bedroom House', '3BR Spring', calc_provider_price(2310), 2310, 0, 0, False),
-                ('House Spring Cleaning', '4 Bedroom House', '4BR Spring', calc_provider_price(2750), 2750, 0, 0, False),
-                ('House Spring Cleaning', '5 Bedroom House', '5BR Spring', calc_provider_price(3300), 3300, 0, 0, False),
-                # House Deep Cleaning
-                ('House Deep Cleaning', '2 Bedroom House', '2BR Deep', calc_provider_price(3960), 3960, 0, 0, False),
-                ('House Deep Cleaning', '3 Bedroom House', '3BR Deep', calc_provider_price(4950), 4950, 0, 0, False),
-                ('House Deep Cleaning', '4 Bedroom House', '4BR Deep', calc_provider_price(5940), 5940, 0, 0, False),
-                ('House Deep Cleaning', '5 Bedroom House', '5BR Deep', calc_provider_price(7150), 7150, 0, 0, False),
-                # Empty House Deep Cleaning
-                ('Empty House Deep Cleaning', '2 Bedroom House', 'Empty 2BR', calc_provider_price(2750), 2750, 0, 0, False),
-                ('Empty House Deep Cleaning', '3 Bedroom House', 'Empty 3BR', calc_provider_price(3850), 3850, 0, 0, False),
-                ('Empty House Deep Cleaning', '4 Bedroom House', 'Empty 4BR', calc_provider_price(4950), 4950, 0, 0, False),
-                ('Empty House Deep Cleaning', '5 Bedroom House', 'Empty 5BR', calc_provider_price(6050), 6050, 0, 0, False),
-            ]
-            for data in pricing_data:
-                pricing = ServicePricing(
-                    service_category=data[0], service_type=data[1], item_description=data[2],
-                    provider_base_price=data[3], customer_display_price=data[4],
-                    color_surcharge_provider=data[5], color_surcharge_customer=data[6],
-                    is_white_applicable=data[7], commission_percentage=10
-                )
-                db.session.add(pricing)
-            db.session.commit()
+            seed_pricing_rows()
             print("Pricing data seeded successfully")
+        if GazetteerPlace.query.count() == 0:
+            print("Seeded {} gazetteer places.".format(seed_gazetteer()))
         if '--cleanup-duplicates' in sys.argv:
-            # Remove duplicate bookings
-            from sqlalchemy import and_
-            seen = set()
-            duplicates = []
-            for b in Booking.query.order_by(Booking.id).all():
-                key = (b.name.strip().lower(), b.date, b.time, b.service.strip().lower())
-                if key in seen:
-                    duplicates.append(b)
-                else:
-                    seen.add(key)
-            for dup in duplicates:
-                db.session.delete(dup)
+            # Remove duplicate bookings: after a full backfill, rows left without a
+            # dedup key are exactly the ones that repeat an earlier booking
+            backfill_booking_dedup_keys()
+            removed = Booking.query.filter(Booking.dedup_key.is_(None)).delete(synchronize_session=False)
             db.session.commit()
-            print("Removed {} duplicate bookings.".format(len(duplicates)))
+            print("Removed {} duplicate bookings.".format(removed))
+        elif '--rebuild-rollups' in sys.argv:
+            print("Rebuilt {} daily rollup rows.".format(rebuild_daily_rollups()))
+        elif '--backfill-items' in sys.argv:
+            print("Backfilled line items for {} service requests.".format(backfill_service_request_items()))
+        elif '--send-reminders' in sys.argv:
+            report = run_reminders()
+            print("Sent {sent} reminders ({failed} failed) in {elapsed_seconds}s, {emails_per_second}/s over {n} chunks.".format(
+                n=len(report['chunks']), **report))
+        elif '--import' in sys.argv:
+            # python app.py --import providers|pricing|bookings path/to/file.ndjson|.csv
+            kind, path = sys.argv[sys.argv.index('--import') + 1:][:2]
+            with open(path, encoding='utf-8', newline='') as f:
+                report = import_rows(kind, f, 'csv' if path.lower().endswith('.csv') else 'ndjson')
+            print("Imported {written} {kind} ({skipped} skipped, {error_count} errors) from {received} rows.".format(**report))
+            for error in report['errors']:
+                print("  row {row}: {error}".format(**error))
+        elif '--reconcile-counters' in sys.argv:
+            corrected = reconcile_counters()
+            print("Corrected counters on {service_provider} providers and {customer} customers.".format(**corrected))
+        elif '--geocode' in sys.argv:
+            # Reload the gazetteer CSV and locate every provider and service request again
+            seed_gazetteer()
+            located = backfill_coordinates(relocate=True)
+            print("Located {service_provider} providers and {service_request} service requests.".format(**located))
+        elif '--purge-idempotency-keys' in sys.argv:
+            print("Purged {} expired idempotency keys.".format(purge_idempotency_keys()))
+        elif '--drain-outbox' in sys.argv:
+            # Deliver everything currently due in the email outbox, then exit
+            totals = {'sent': 0, 'retrying': 0, 'failed': 0}
+            while True:
+                summary = process_outbox()
+                if not summary['claimed']:
+                    break
+                for key in totals:
+                    totals[key] += summary[key]
+            print("Outbox drained: {sent} sent, {retrying} retrying, {failed} failed.".format(**totals))
         else:
             # Get port from environment variable (for Render) or use 5001 for local
             port = int(os.environ.get('PORT', 5001))
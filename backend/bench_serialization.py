@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compare list-response serialization: hand-written to_dict() + Flask's default
+JSON provider against the compiled per-model serializers + FastJSONProvider.
+
+Usage: python bench_serialization.py [rows] [repeats]
+"""
+import os
+import sys
+import tempfile
+import time as clock
+from datetime import date, datetime, time, timedelta
+
+# Throwaway database, set before app.py reads DATABASE_URL
+_db_dir = tempfile.mkdtemp(prefix='homeswift-bench-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'bench.sqlite')
+
+from flask.json.provider import DefaultJSONProvider
+from app import app, db, orjson, serialize_row, ServiceRequest
+
+ITEMS = ('[{"category": "Electrical", "type": "Plug", "is_white": false, "quantity": 2, '
+         '"customer_price": 1000.0, "provider_price": 900.0, "commission": 100.0}]')
+
+
+def seed(count):
+    db.create_all()
+    start = datetime(2025, 1, 1)
+    db.session.bulk_insert_mappings(ServiceRequest, [{
+        'customer_name': f'Customer {i}', 'customer_email': f'c{i}@example.com',
+        'customer_phone': '0820000000', 'customer_address': f'{i} Main Road, Sea Point',
+        'preferred_date': date(2025, 6, 1) + timedelta(days=i % 30), 'preferred_time': time(9, 30),
+        'selected_items': ITEMS, 'total_customer_paid_cents': 210000,
+        'total_provider_payout_cents': 180000, 'total_commission_earned_cents': 30000,
+        'status': 'pending', 'priority': 'medium', 'created_at': start + timedelta(minutes=i),
+        'updated_at': start + timedelta(minutes=i)
+    } for i in range(count)])
+    db.session.commit()
+
+
+def best_of(repeats, fn):
+    times = []
+    for _ in range(repeats):
+        began = clock.perf_counter()
+        result = fn()
+        times.append(clock.perf_counter() - began)
+    return min(times), result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with app.app_context():
+        seed(count)
+        rows = ServiceRequest.query.all()
+        default_json = DefaultJSONProvider(app)
+
+        dicts_old, old = best_of(repeats, lambda: [r.to_dict() for r in rows])
+        dicts_new, new = best_of(repeats, lambda: [serialize_row(r) for r in rows])
+        encode_old, body_old = best_of(repeats, lambda: default_json.response(old).get_data())
+        encode_new, body_new = best_of(repeats, lambda: app.json.response(new).get_data())
+
+    assert body_old == body_new, 'serialized output differs'
+    print(f'{count} service requests, best of {repeats}, orjson {"on" if orjson else "off"}')
+    print(f'{"":12}{"to_dict":>12}{"compiled":>12}{"speedup":>10}')
+    for label, before, after in (
+        ('dicts', dicts_old, dicts_new),
+        ('encode', encode_old, encode_new),
+        ('total', dicts_old + encode_old, dicts_new + encode_new),
+    ):
+        print(f'{label:12}{before * 1000:10.1f}ms{after * 1000:10.1f}ms{before / after:9.1f}x')
+    print(f'{len(body_new)} bytes, identical')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,9 @@ pip install -r requirements.txt
 
 # Initialize database if it doesn't exist
 python -c "
-from app import db, app
+from app import app, upgrade_schema
 with app.app_context():
-    db.create_all()
+    upgrade_schema()
     print('Database initialized successfully')
 "
 
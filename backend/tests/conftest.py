@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+# app.py reads DATABASE_URL at import time, so point it at a throwaway SQLite
+# file before any test module imports the app.
+_db_dir = tempfile.mkdtemp(prefix='homeswift-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test_db.sqlite')
+os.environ.pop('EMAIL_HOST', None)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, db, gazetteer, pricing_catalog, provider_matcher
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    # Process-wide caches must not carry rows over from a previous test's database
+    pricing_catalog.invalidate()
+    provider_matcher.invalidate()
+    gazetteer.invalidate()
+    with app.app_context():
+        db.create_all()
+
+    with app.test_client() as client:
+        yield client
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def tomorrow():
+    return date.today() + timedelta(days=1)
+
+
+@pytest.fixture
+def make_provider(client):
+    """Create a provider through the API and return its JSON; extra keywords become fields"""
+    def make(name, service_type='Carpet Cleaning', rating=4.0, **fields):
+        return client.post('/api/providers', json={
+            'name': name, 'service_type': service_type, 'phone': '0820000000',
+            'email': f'{name.lower()}@example.com', 'rating': rating, **fields
+        }).get_json()['provider']
+    return make
+
+
+@pytest.fixture
+def make_service_request(client, tomorrow):
+    """Create a one-item service request for tomorrow through the API and return its id"""
+    def make(name='Amy', at='08:00', address='9 Elm St, Rosebank',
+             category='Carpet Deep Cleaning', service_type='Small', priority=None):
+        request_id = client.post('/api/service-requests', json={
+            'customer_name': name, 'customer_email': f'{name.lower()}@example.com', 'customer_phone': '0823334444',
+            'customer_address': address, 'preferred_date': tomorrow.isoformat(), 'preferred_time': at,
+            'items': [{'category': category, 'type': service_type, 'quantity': 1}]
+        }).get_json()['request_id']
+        if priority:
+            client.patch(f'/api/service-requests/{request_id}', json={'priority': priority})
+        return request_id
+    return make
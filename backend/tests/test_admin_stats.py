@@ -0,0 +1,55 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import event
+
+from app import app, db, ServiceRequest, rebuild_daily_rollups, to_cents
+
+
+def _add(status, paid, commission, created_at):
+    db.session.add(ServiceRequest(
+        customer_name='C', customer_email='c@example.com', customer_phone='0820000000',
+        customer_address='1 Main Rd', preferred_date=created_at.date(), preferred_time=time(9, 0),
+        selected_items='[]', status=status, created_at=created_at,
+        total_customer_paid_cents=to_cents(paid), total_provider_payout_cents=to_cents(paid) - to_cents(commission),
+        total_commission_earned_cents=to_cents(commission)
+    ))
+
+
+def test_stats_computed_in_a_single_query(client):
+    now = datetime.utcnow()
+    last_year = now - timedelta(days=400)
+    with app.app_context():
+        _add('completed', '600.00', '160.00', now)
+        _add('completed', '300.00', '80.00', now)
+        _add('completed', '1000.00', '200.00', last_year)
+        _add('pending', '500.00', '100.00', now)
+        _add('confirmed', '500.00', '100.00', now)
+        db.session.commit()
+        # Rows inserted directly bypass update_service_request, so rebuild the rollup
+        rebuild_daily_rollups()
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            stats = client.get('/api/admin/stats').get_json()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert len(statements) == 1
+    assert stats == {
+        'total_bookings': 5,
+        'pending': 1,
+        'completed': 3,
+        'this_month_revenue': 900.0,
+        'this_month_commission': 240.0,
+        'total_commission': 440.0,
+        'avg_commission': 120.0
+    }
+
+
+def test_stats_on_empty_database(client):
+    assert client.get('/api/admin/stats').get_json() == {
+        'total_bookings': 0, 'pending': 0, 'completed': 0, 'this_month_revenue': 0,
+        'this_month_commission': 0, 'total_commission': 0, 'avg_commission': 0
+    }
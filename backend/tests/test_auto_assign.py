@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from app import app, db, claim_service_request, EmailOutbox, ServiceRequest
+
+
+def test_ranks_by_rating_and_skips_other_trades(client, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    best = make_provider('Ayo', 'Carpet Cleaning', 4.8)['id']
+    good = make_provider('Bea', 'Cleaning', 4.1)['id']
+    make_provider('Cas', 'Plumbing', 5.0)
+    make_provider('Dan', 'Carpet Cleaning', 5.0, status='inactive')
+    request_id = make_service_request('Amy')
+
+    rv = client.get(f'/api/service-requests/{request_id}/candidates')
+    assert [c['provider_id'] for c in rv.get_json()['candidates']] == [best, good]
+
+    rv = client.post(f'/api/service-requests/{request_id}/auto-assign')
+    assert rv.status_code == 200
+    assigned = rv.get_json()['request']
+    assert assigned['assigned_provider_id'] == best
+    assert (assigned['provider_name'], assigned['provider_email']) == ('Ayo', 'ayo@example.com')
+    assert assigned['status'] == 'pending'
+
+    # Already assigned: the conditional update refuses to overwrite it
+    assert client.post(f'/api/service-requests/{request_id}/auto-assign').status_code == 409
+
+
+def test_workload_spreads_batch_assignments(client, monkeypatch, tomorrow, make_provider, make_service_request):
+    monkeypatch.setitem(app.config, 'MATCH_WORKLOAD_PENALTY', 1.0)
+    client.post('/api/admin/seed-pricing')
+    top = make_provider('Ayo', 'Carpet Cleaning', 4.8)['id']
+    second = make_provider('Bea', 'Carpet Cleaning', 4.5)['id']
+    # Slots far enough apart that no provider has a schedule conflict: only the
+    # workload penalty can move the second job away from the top-rated provider
+    later = make_service_request('Amy', at='13:00')
+    urgent = make_service_request('Ben', at='08:00', priority='urgent')
+    sofa = make_service_request('Cal', at='16:00', category='Couch Deep Cleaning', service_type='1 Seater Couch')
+
+    rv = client.post('/api/service-requests/auto-assign', json={'date': tomorrow.isoformat(), 'confirm': True})
+    body = rv.get_json()
+    assert body['assigned'] == 2
+    by_id = {result['request_id']: result for result in body['results']}
+    assert [result['request_id'] for result in body['results']] == [urgent, later, sofa]
+    # The urgent request gets the best provider; the next one goes to the idle provider
+    assert by_id[urgent]['assigned_provider_id'] == top
+    assert by_id[later]['assigned_provider_id'] == second
+    assert by_id[sofa]['error'] == 'No available provider matches this request'
+
+    with app.app_context():
+        assert ServiceRequest.query.get(urgent).status == 'confirmed'
+        assert EmailOutbox.query.filter_by(to_email='ayo@example.com').count() == 1
+
+
+def test_claim_loses_to_a_concurrent_assignment(client, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    ayo = make_provider('Ayo', 'Carpet Cleaning', 4.8)['id']
+    bea = make_provider('Bea', 'Carpet Cleaning', 4.0)['id']
+    retired = make_provider('Cas', 'Carpet Cleaning', 4.0, status='inactive')['id']
+    request_id = make_service_request('Amy')
+
+    with app.app_context():
+        now = datetime.utcnow()
+        assert not claim_service_request(request_id, retired, now)
+        assert claim_service_request(request_id, bea, now)
+        # A second worker that ranked the request before the first claim landed
+        assert not claim_service_request(request_id, ayo, now)
+        db.session.commit()
+        assert ServiceRequest.query.get(request_id).provider_email == 'bea@example.com'
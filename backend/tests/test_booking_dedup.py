@@ -0,0 +1,58 @@
+import app as app_module
+from app import app, db, Booking
+
+
+def _booking(**overrides):
+    data = {
+        'name': 'Alice Smith',
+        'address': '1 Main Rd',
+        'service': 'Mattress Cleaning',
+        'date': '2026-11-01',
+        'time': '10:00',
+    }
+    data.update(overrides)
+    return data
+
+
+def test_case_and_whitespace_variants_are_rejected(client):
+    assert client.post('/api/bookings', json=_booking()).status_code == 201
+
+    rv = client.post('/api/bookings', json=_booking(name='  alice SMITH ', service='mattress cleaning '))
+    assert rv.status_code == 409
+    assert rv.get_json() == {'error': 'Duplicate booking detected'}
+
+    assert client.post('/api/bookings', json=_booking(time='11:00')).status_code == 201
+    with app.app_context():
+        assert Booking.query.count() == 2
+
+
+def test_backfill_leaves_legacy_duplicates_without_a_key(client):
+    with app.app_context():
+        for name in ['Alice Smith', ' alice smith', 'Bob']:
+            db.session.add(Booking(name=name, address='a',
+                                   service='Mattress Cleaning', date='2026-11-01', time='10:00'))
+        db.session.commit()
+
+        assert app_module.backfill_booking_dedup_keys(batch_size=2) == (2, 1)
+        kept = Booking.query.filter(Booking.dedup_key.isnot(None)).order_by(Booking.id).all()
+        assert [b.name for b in kept] == ['Alice Smith', 'Bob']
+        assert kept[0].dedup_key == 'alice smith|2026-11-01|10:00|mattress cleaning'
+
+
+def test_padding_legacy_times_rebuilds_their_keys(client):
+    with app.app_context():
+        for name, time in (('Alice Smith', '9:00'), ('Bob Jones', '9:30'), ('Bob Jones', '09:30')):
+            data = _booking(name=name, time=time)
+            db.session.add(Booking(dedup_key=Booking.make_dedup_key(data['name'], data['date'], time, data['service']),
+                                   **data))
+        db.session.commit()
+
+        assert app_module.normalize_booking_times() == 2
+        alice, bob, bob_padded = Booking.query.order_by(Booking.id).all()
+        assert (alice.time, alice.dedup_key) == ('09:00', 'alice smith|2026-11-01|09:00|mattress cleaning')
+        # Padded, Bob's legacy row duplicates the booking that already holds the key
+        assert (bob.time, bob.dedup_key) == ('09:30', None)
+        assert bob_padded.dedup_key == 'bob jones|2026-11-01|09:30|mattress cleaning'
+
+    assert client.post('/api/bookings', json=_booking(time='09:00')).status_code == 409
+    assert client.post('/api/bookings', json=_booking(time='9:00')).status_code == 409
@@ -0,0 +1,69 @@
+import json
+
+import app as app_module
+from app import app, Booking, ServicePricing, ServiceProvider, pricing_catalog
+
+
+def _ndjson(rows):
+    return '\n'.join(json.dumps(row) for row in rows) + '\n'
+
+
+def test_provider_import_reports_row_errors(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'IMPORT_CHUNK_SIZE', 2)
+    client.post('/api/providers', json={'name': 'Old', 'service_type': 'Cleaning',
+                                        'phone': '0820000000', 'email': 'old@example.com'})
+    body = _ndjson([
+        {'name': 'A', 'service_type': 'Cleaning', 'phone': '0821', 'email': 'a@example.com', 'rating': 4.5},
+        {'name': 'B', 'service_type': 'Cleaning', 'phone': '0822', 'email': 'old@example.com'},
+        {'name': 'C', 'service_type': 'Cleaning', 'phone': '0823'},
+        {'name': 'D', 'service_type': 'Cleaning', 'phone': '0824', 'email': 'a@example.com'},
+        {'name': 'E', 'service_type': 'Cleaning', 'phone': '0825', 'email': 'e@example.com', 'rating': 'high'},
+    ]) + 'not json\n'
+    rv = client.post('/api/admin/import/providers', data=body, content_type='application/x-ndjson')
+    report = rv.get_json()
+    assert report['received'] == 6
+    assert report['written'] == 1
+    assert {e['row']: e['error'] for e in report['errors']} == {
+        2: 'Email already registered',
+        3: 'Missing required field: email',
+        4: 'Email already registered',
+        5: "Invalid value for rating: 'high'",
+        6: 'Invalid JSON',
+    }
+    with app.app_context():
+        assert ServiceProvider.query.filter_by(email='a@example.com').one().rating == 4.5
+
+
+def test_pricing_csv_import_upserts_and_refreshes_catalog(client):
+    client.post('/api/admin/seed-pricing')
+    csv_body = (
+        'service_category,service_type,customer_display_price,provider_base_price,is_white_applicable\n'
+        'Mattress Deep Cleaning,King,650,585,false\n'
+        'Window Cleaning,Small House,300,,true\n'
+    )
+    report = client.post('/api/admin/import/pricing', data=csv_body, content_type='text/csv').get_json()
+    assert (report['written'], report['error_count']) == (2, 0)
+
+    with app.app_context():
+        assert ServicePricing.query.filter_by(service_category='Mattress Deep Cleaning', service_type='King').count() == 1
+        king = pricing_catalog.lookup('Mattress Deep Cleaning', 'King')
+        assert king.customer_display_price_cents == 65000
+        assert pricing_catalog.lookup('Window Cleaning', 'Small House').provider_base_price_cents == 27000
+
+    # Re-seeding upserts onto the same rows instead of duplicating them
+    client.post('/api/admin/seed-pricing')
+    with app.app_context():
+        assert ServicePricing.query.count() == len(app_module.PRICING_SEED_DATA) + 1
+
+
+def test_booking_import_skips_duplicates(client):
+    client.post('/api/bookings', json={'name': 'Ann', 'address': '1 Rd', 'service': 'Couch',
+                                       'date': '2026-11-01', 'time': '10:00'})
+    rows = [{'name': f'Customer {i}', 'address': '2 Rd', 'service': 'Couch',
+             'date': '2026-11-02', 'time': '09:00'} for i in range(50)]
+    rows += [{'name': ' ann ', 'address': '1 Rd', 'service': 'COUCH', 'date': '2026-11-01', 'time': '10:00'},
+             {'name': 'Customer 0', 'address': '2 Rd', 'service': 'Couch', 'date': '2026-11-02', 'time': '09:00'}]
+    with app.app_context():
+        report = app_module.import_rows('bookings', _ndjson(rows).splitlines(keepends=True), chunk_size=20)
+        assert (report['received'], report['written'], report['skipped']) == (52, 50, 2)
+        assert Booking.query.count() == 51
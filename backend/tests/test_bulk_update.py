@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from app import app, DailyRevenueRollup, EmailOutbox, ServiceRequest
+
+
+def _create_request(client, name):
+    return client.post('/api/service-requests', json={
+        'customer_name': name, 'customer_email': f'{name.lower()}@example.com', 'customer_phone': '0823334444',
+        'customer_address': '9 Elm St, Rosebank',
+        'preferred_date': (date.today() + timedelta(days=1)).isoformat(), 'preferred_time': '08:00',
+        'items': [{'category': 'Carpet Deep Cleaning', 'type': 'Small', 'quantity': 1}]
+    }).get_json()['request_id']
+
+
+def test_bulk_completion_in_one_call(client):
+    client.post('/api/admin/seed-pricing')
+    first, second, third = (_create_request(client, name) for name in ('Amy', 'Ben', 'Cal'))
+    with app.app_context():
+        queued_before = EmailOutbox.query.count()
+
+    rv = client.post('/api/service-requests/bulk-update', json={
+        'ids': [first, second, 999999],
+        'changes': {'status': 'completed', 'customer_payment_received': True}
+    })
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert body['updated'] == 2
+    assert body['results'] == [
+        {'request_id': first, 'updated': True, 'status': 'completed'},
+        {'request_id': second, 'updated': True, 'status': 'completed'},
+        {'request_id': 999999, 'error': 'Service request not found'},
+    ]
+
+    with app.app_context():
+        done = ServiceRequest.query.filter(ServiceRequest.request_id.in_([first, second])).all()
+        assert all(r.completed_at and r.customer_payment_received for r in done)
+        assert ServiceRequest.query.get(third).status == 'pending'
+        assert DailyRevenueRollup.query.get((date.today(), '')).job_count == 2
+        # Customer and admin completion emails for each request, queued rather than sent
+        assert EmailOutbox.query.count() - queued_before == 4
+
+
+def test_per_request_updates_and_field_whitelist(client):
+    client.post('/api/admin/seed-pricing')
+    first, second = _create_request(client, 'Dee'), _create_request(client, 'Eve')
+    rv = client.post('/api/service-requests/bulk-update', json={'updates': [
+        {'request_id': first, 'status': 'in_progress'},
+        {'request_id': second, 'admin_notes': 'nope'},
+    ]})
+    results = rv.get_json()['results']
+    assert results[0] == {'request_id': first, 'updated': True, 'status': 'in_progress'}
+    assert results[1] == {'request_id': second, 'error': 'Fields cannot be bulk updated: admin_notes'}
+
+    assert client.post('/api/service-requests/bulk-update', json={}).status_code == 400
+
+
+def test_malformed_bodies_are_rejected(client):
+    bulk_update = lambda body: client.post('/api/service-requests/bulk-update', json=body)
+    assert bulk_update({'ids': 5, 'changes': {'status': 'completed'}}).status_code == 400
+    assert bulk_update({'ids': ['1'], 'changes': {'status': 'completed'}}).status_code == 400
+    assert bulk_update({'ids': [1], 'changes': ['status']}).status_code == 400
+    assert bulk_update({'updates': 5}).status_code == 400
+    assert bulk_update({'updates': [{'request_id': 1, 'status': 'completed'}, 7]}).status_code == 400
+    assert bulk_update([1]).status_code == 400
@@ -0,0 +1,33 @@
+def test_pricing_revalidation_returns_304_until_reseeded(client):
+    client.post('/api/admin/seed-pricing')
+
+    rv = client.get('/api/pricing/all')
+    etag = rv.headers['ETag']
+    assert rv.status_code == 200
+    assert rv.headers['Cache-Control'].startswith('public, max-age=')
+
+    rv = client.get('/api/pricing/all', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert rv.get_data() == b''
+    assert client.get('/api/pricing/categories', headers={'If-None-Match': etag}).status_code == 304
+
+    client.post('/api/admin/seed-pricing')
+    rv = client.get('/api/pricing/all', headers={'If-None-Match': etag})
+    assert rv.status_code == 200
+    assert rv.headers['ETag'] != etag
+
+
+def test_provider_etag_tracks_changes(client):
+    rv = client.post('/api/providers', json={
+        'name': 'P', 'service_type': 'Cleaning', 'phone': '0820000000', 'email': 'p@example.com'})
+    provider_id = rv.get_json()['provider']['id']
+
+    rv = client.get('/api/providers')
+    etag = rv.headers['ETag']
+    assert rv.headers['Cache-Control'] == 'private, no-cache'
+    assert client.get('/api/providers', headers={'If-None-Match': etag}).status_code == 304
+
+    client.patch(f'/api/providers/{provider_id}', json={'status': 'inactive'})
+    rv = client.get('/api/providers', headers={'If-None-Match': etag})
+    assert rv.status_code == 200
+    assert rv.get_json()[0]['status'] == 'inactive'
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+import app as app_module
+from app import app, db, EmailOutbox
+
+
+def _service_request_payload():
+    return {
+        'customer_name': 'Bob',
+        'customer_email': 'bob@example.com',
+        'customer_phone': '0821234567',
+        'customer_address': '1 Main Rd, Sandton',
+        'preferred_date': (date.today() + timedelta(days=3)).isoformat(),
+        'preferred_time': '09:30',
+        'items': [{'category': 'Mattress Deep Cleaning', 'type': 'Queen', 'quantity': 1}]
+    }
+
+
+def test_service_request_queues_emails_without_sending(client, monkeypatch):
+    sent = []
+    monkeypatch.setattr(app_module, 'send_email', lambda *args, **kwargs: sent.append(args) or True)
+    client.post('/api/admin/seed-pricing')
+
+    rv = client.post('/api/service-requests', json=_service_request_payload())
+    assert rv.status_code == 201
+    assert sent == []
+
+    with app.app_context():
+        queued = EmailOutbox.query.order_by(EmailOutbox.id).all()
+        assert [m.to_email for m in queued] == ['bob@example.com', app.config['ADMIN_EMAIL']]
+        assert all(m.status == 'pending' for m in queued)
+
+        summary = app_module.process_outbox()
+        assert summary == {'claimed': 2, 'sent': 2, 'retrying': 0, 'failed': 0}
+        assert {m.status for m in EmailOutbox.query.all()} == {'sent'}
+    assert sorted(args[0] for args in sent) == sorted(['bob@example.com', app.config['ADMIN_EMAIL']])
+
+
+def test_failed_delivery_backs_off_then_gives_up(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'send_email', lambda *args, **kwargs: False)
+    monkeypatch.setitem(app.config, 'OUTBOX_MAX_ATTEMPTS', 2)
+
+    with app.app_context():
+        app_module.queue_email('carol@example.com', 'Hello', 'Body')
+        db.session.commit()
+
+        assert app_module.process_outbox()['retrying'] == 1
+        message = EmailOutbox.query.one()
+        assert message.status == 'pending'
+        assert message.attempts == 1
+        assert message.next_attempt_at > message.created_at
+
+        # Not due yet, so nothing is claimed
+        assert app_module.process_outbox()['claimed'] == 0
+
+        message.next_attempt_at = message.created_at
+        db.session.commit()
+        assert app_module.process_outbox()['failed'] == 1
+        assert EmailOutbox.query.one().status == 'failed'
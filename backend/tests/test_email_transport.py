@@ -0,0 +1,136 @@
+import smtplib
+from contextlib import contextmanager
+
+import pytest
+
+import app as app_module
+from app import app
+
+
+@pytest.fixture
+def transports(monkeypatch):
+    calls = []
+    outcomes = {'flask_mail': 'raise', 'smtp': True}
+
+    def make(name):
+        def transport(emails):
+            calls.append(name)
+            if outcomes[name] == 'raise':
+                raise OSError('timed out')
+            return [outcomes[name]] * len(emails)
+        return transport
+
+    for name in outcomes:
+        monkeypatch.setitem(app_module.EMAIL_TRANSPORTS, name, make(name))
+    monkeypatch.setitem(app.config, 'EMAIL_BREAKER_THRESHOLD', 2)
+    app_module.reset_email_transports()
+    yield calls, outcomes
+    app_module.reset_email_transports()
+
+
+def test_working_transport_is_remembered(transports):
+    calls, outcomes = transports
+    assert app_module.send_email('a@example.com', 'Hi', 'Body') is True
+    assert calls == ['flask_mail', 'smtp']
+
+    calls.clear()
+    assert app_module.send_email('b@example.com', 'Hi', 'Body') is True
+    assert calls == ['smtp']
+    assert app_module.email_transport_status()['preferred'] == 'smtp'
+
+
+def test_open_breaker_fails_fast(transports, monkeypatch):
+    calls, outcomes = transports
+    outcomes['smtp'] = 'raise'
+
+    for _ in range(2):
+        assert app_module.send_email('a@example.com', 'Hi', 'Body') is False
+    assert app_module.email_transport_status()['breakers']['smtp']['state'] == 'open'
+
+    calls.clear()
+    assert app_module.send_email('a@example.com', 'Hi', 'Body') is False
+    assert calls == []
+
+    # After the reset timeout one trial call is let through and closes the breaker
+    for breaker in app_module.email_breakers.values():
+        breaker.opened_at -= breaker.reset_timeout
+    outcomes['smtp'] = True
+    assert app_module.send_email('a@example.com', 'Hi', 'Body') is True
+    assert app_module.email_breakers['smtp'].state == 'closed'
+
+
+def test_rejected_messages_do_not_trip_breakers(transports):
+    calls, outcomes = transports
+    outcomes['flask_mail'] = False
+
+    for _ in range(3):
+        assert app_module.send_email('bad@example.com', 'Hi', 'Body') is False
+    assert calls == ['flask_mail'] * 3
+    assert app_module.email_breakers['flask_mail'].state == 'closed'
+
+    outcomes['flask_mail'] = True
+    assert app_module.send_email('good@example.com', 'Hi', 'Body') is True
+
+
+def test_refused_sender_falls_back_and_trips_the_breaker(transports, monkeypatch):
+    calls, outcomes = transports
+    sent = []
+
+    class RefusingConnection:
+        def send(self, msg):
+            raise smtplib.SMTPSenderRefused(530, b'Authentication required', 'noreply@example.com')
+
+    @contextmanager
+    def connect():
+        yield RefusingConnection()
+
+    monkeypatch.setattr(app_module.mail, 'connect', connect)
+    monkeypatch.setitem(app_module.EMAIL_TRANSPORTS, 'flask_mail', app_module.send_emails_flask_mail)
+    monkeypatch.setitem(app_module.EMAIL_TRANSPORTS, 'smtp', lambda emails: sent.extend(emails) or [True] * len(emails))
+
+    with app.app_context():
+        for i in range(3):
+            assert app_module.send_email(f'user{i}@example.com', 'Hi', 'Body') is True
+    assert [email[0] for email in sent] == ['user0@example.com', 'user1@example.com', 'user2@example.com']
+    # The refusal counts against flask_mail, and smtp is remembered for the next sends
+    assert app_module.email_breakers['flask_mail'].failures == 1
+    assert app_module.email_transport_status()['preferred'] == 'smtp'
+
+
+def test_unsent_part_of_a_batch_goes_to_the_next_transport(transports, monkeypatch):
+    calls, outcomes = transports
+    handed_over = []
+    monkeypatch.setitem(app_module.EMAIL_TRANSPORTS, 'flask_mail', lambda emails: [True, False, None, None])
+    monkeypatch.setitem(app_module.EMAIL_TRANSPORTS, 'smtp',
+                        lambda emails: handed_over.extend(emails) or [True] * len(emails))
+    emails = [(f'user{i}@example.com', 'Hi', 'Body', None) for i in range(4)]
+
+    assert app_module.send_email_batch(emails) == [True, False, True, True]
+    # The rejected message is not retried elsewhere
+    assert handed_over == emails[2:]
+    assert app_module.email_breakers['flask_mail'].failures == 1
+
+
+def test_smtp_sessions_use_configured_timeout(monkeypatch):
+    seen = {}
+
+    class RecordingSMTP:
+        def __init__(self, host, port, timeout=None):
+            seen['timeout'] = timeout
+
+        def starttls(self):
+            pass
+
+        def send_message(self, msg):
+            pass
+
+        def quit(self):
+            pass
+
+    monkeypatch.setattr(smtplib, 'SMTP', RecordingSMTP)
+    monkeypatch.setenv('EMAIL_HOST', 'smtp.test')
+    monkeypatch.setenv('EMAIL_TIMEOUT', '2.5')
+    app_module.close_smtp_pools()
+    assert app_module.send_email_smtp('a@example.com', 'Hi', 'Body') is True
+    assert seen['timeout'] == 2.5
+    app_module.close_smtp_pools()
@@ -0,0 +1,72 @@
+import pytest
+
+from app import (app, gazetteer, geohash_encode, haversine_km, seed_gazetteer,
+                 backfill_coordinates, ServiceProvider)
+
+
+def _seed(client):
+    client.post('/api/admin/seed-pricing')
+    with app.app_context():
+        seed_gazetteer()
+
+
+def test_geohash_and_distance():
+    assert geohash_encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geohash_encode(-33.9249, 18.4241, 5) == 'k3vp5'
+    # Cape Town to Johannesburg is roughly 1,260 km
+    assert 1250 < haversine_km(-33.9249, 18.4241, -26.2041, 28.0473) < 1275
+
+
+def test_addresses_are_located_through_the_gazetteer(client, make_provider):
+    _seed(client)
+    with app.app_context():
+        # Suburb names that repeat are told apart by the city or postcode
+        assert gazetteer.locate('12 Main Rd, Brooklyn, Pretoria') == (-25.77, 28.237)
+        assert gazetteer.locate('12 Main Rd, Brooklyn 7405') == (-33.907, 18.487)
+        assert gazetteer.locate('3 Kloof St, Gardens, Cape Town') == (-33.9353, 18.4118)
+        assert gazetteer.locate('PO Box 12, 2196') == (-26.145, 28.043)
+        assert gazetteer.locate('Somewhere else') is None
+
+    provider = make_provider('Ayo', address='5 Jan Smuts Ave, Rosebank, Johannesburg')
+    assert (provider['latitude'], provider['longitude']) == (-26.145, 28.043)
+    rv = client.patch(f"/api/providers/{provider['id']}", json={'address': '1 Beach Rd, Sea Point'})
+    assert rv.get_json()['provider']['latitude'] == -33.916
+    with app.app_context():
+        assert ServiceProvider.query.get(provider['id']).geohash == geohash_encode(-33.916, 18.389)
+
+
+def test_nearest_providers_orders_by_distance(client, make_provider, make_service_request):
+    _seed(client)
+    sandton = make_provider('Ayo', address='1 Rivonia Rd, Sandton')['id']
+    fourways = make_provider('Bea', address='2 Witkoppen Rd, Fourways', rating=5.0)['id']
+    rosebank = make_provider('Cas', address='3 Oxford Rd, Rosebank')['id']
+    make_provider('Dan', address='4 Main Rd, Rosebank', service_type='Plumbing')
+    cape_town = make_provider('Eve', address='5 Long St, Cape Town')['id']
+    make_provider('Fay', address='Unknown address')
+    request_id = make_service_request(address='9 Elm St, Parkhurst, Johannesburg')
+
+    rv = client.get(f'/api/service-requests/{request_id}/nearest-providers?k=3')
+    assert rv.status_code == 200
+    providers = rv.get_json()['providers']
+    assert [p['provider_id'] for p in providers] == [rosebank, sandton, fourways]
+    assert providers[0]['distance_km'] == pytest.approx(3.0, abs=0.5)
+
+    # Asking for more than the region holds widens the search to the whole country
+    rv = client.get(f'/api/service-requests/{request_id}/nearest-providers?k=10')
+    assert [p['provider_id'] for p in rv.get_json()['providers']] == [rosebank, sandton, fourways, cape_town]
+
+    unlocated = make_service_request(address='Nowhere Lane')
+    assert client.get(f'/api/service-requests/{unlocated}/nearest-providers').status_code == 422
+    assert client.get('/api/service-requests/999/nearest-providers').status_code == 404
+
+
+def test_backfill_locates_existing_rows(client, make_provider):
+    client.post('/api/admin/seed-pricing')
+    provider_id = make_provider('Ayo', address='1 Rivonia Rd, Sandton')['id']
+    with app.app_context():
+        assert ServiceProvider.query.get(provider_id).latitude is None
+        seed_gazetteer()
+        assert backfill_coordinates(batch_size=1) == {'service_provider': 1, 'service_request': 0}
+        assert ServiceProvider.query.get(provider_id).latitude == -26.107
+        # Already located rows are left alone
+        assert backfill_coordinates() == {'service_provider': 0, 'service_request': 0}
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import app as app_module
+from app import app, db, Booking, EmailOutbox, IdempotencyKey, ServiceRequest
+
+BOOKING = {'name': 'Alice', 'email': 'alice@example.com', 'address': '1 Main Rd',
+           'service': 'Mattress Cleaning', 'date': '2026-11-01', 'time': '10:00'}
+
+
+def test_retry_replays_stored_response_without_side_effects(client):
+    headers = {'Idempotency-Key': 'retry-1'}
+    first = client.post('/api/bookings', json=BOOKING, headers=headers)
+    assert first.status_code == 201
+
+    with app.app_context():
+        queued = EmailOutbox.query.count()
+
+    again = client.post('/api/bookings', json=BOOKING, headers=headers)
+    assert again.status_code == 201
+    assert again.headers['Idempotent-Replayed'] == 'true'
+    assert again.get_data() == first.get_data()
+    with app.app_context():
+        assert Booking.query.count() == 1
+        assert EmailOutbox.query.count() == queued
+
+
+def test_service_request_retry_creates_one_request(client):
+    client.post('/api/admin/seed-pricing')
+    payload = {
+        'customer_name': 'Bob', 'customer_email': 'bob@example.com', 'customer_phone': '0821234567',
+        'customer_address': '1 Main Rd', 'preferred_date': '2026-11-02', 'preferred_time': '09:00',
+        'items': [{'category': 'Mattress Deep Cleaning', 'type': 'Queen', 'quantity': 1}]
+    }
+    headers = {'Idempotency-Key': 'sr-1'}
+    first = client.post('/api/service-requests', json=payload, headers=headers)
+    again = client.post('/api/service-requests', json=payload, headers=headers)
+    assert first.status_code == again.status_code == 201
+    assert again.get_json() == first.get_json()
+    with app.app_context():
+        assert ServiceRequest.query.count() == 1
+
+
+def test_key_reused_for_different_body_is_rejected(client):
+    headers = {'Idempotency-Key': 'retry-2'}
+    assert client.post('/api/bookings', json=BOOKING, headers=headers).status_code == 201
+    rv = client.post('/api/bookings', json=dict(BOOKING, time='12:00'), headers=headers)
+    assert rv.status_code == 422
+
+
+def test_failed_request_releases_key(client):
+    headers = {'Idempotency-Key': 'retry-3'}
+    assert client.post('/api/bookings', json=BOOKING).status_code == 201
+    assert client.post('/api/bookings', json=BOOKING, headers=headers).status_code == 409
+    with app.app_context():
+        assert db.session.get(IdempotencyKey, 'retry-3') is None
+
+
+def test_expired_keys_are_purged(client):
+    client.post('/api/bookings', json=BOOKING, headers={'Idempotency-Key': 'old'})
+    with app.app_context():
+        db.session.get(IdempotencyKey, 'old').expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert app_module.purge_idempotency_keys() == 1
+        assert IdempotencyKey.query.count() == 0
+
+
+def test_claim_never_proceeds_without_a_reservation(client, monkeypatch):
+    with app.app_context():
+        db.session.add(IdempotencyKey(key='gone-1', endpoint='create_booking', request_hash='x',
+                                      created_at=datetime.utcnow(),
+                                      expires_at=datetime.utcnow() + timedelta(minutes=5)))
+        db.session.commit()
+    real_get = db.session.get
+    reads = []
+
+    def get_after_release(model, key):
+        # The holder releases its key between our failed insert and the read
+        reads.append(key)
+        if len(reads) == 1:
+            IdempotencyKey.query.filter_by(key=key).delete()
+            db.session.commit()
+            return None
+        return real_get(model, key)
+
+    monkeypatch.setattr(db.session, 'get', get_after_release)
+    rv = client.post('/api/bookings', json=BOOKING, headers={'Idempotency-Key': 'gone-1'})
+    assert rv.status_code == 201
+    with app.app_context():
+        assert IdempotencyKey.query.get('gone-1').status_code == 201
+
+    # A row that keeps vanishing is reported as busy instead of running the view unreserved
+    monkeypatch.setattr(db.session, 'get', lambda model, key: None)
+    with app.app_context():
+        claimed, existing = app_module._claim_idempotency_key('gone-1', 'create_booking', 'y')
+        assert (claimed, existing) == (False, None)
+    rv = client.post('/api/bookings', json=dict(BOOKING, name='Bea'), headers={'Idempotency-Key': 'gone-1'})
+    assert rv.status_code == 409
+    with app.app_context():
+        assert Booking.query.count() == 1
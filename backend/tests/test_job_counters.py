@@ -0,0 +1,78 @@
+from app import app, db, reconcile_counters, Booking, Customer, ServiceProvider
+
+
+def _counters(provider_id):
+    with app.app_context():
+        provider = ServiceProvider.query.get(provider_id)
+        return provider.total_bookings, provider.active_jobs, provider.completed_jobs
+
+
+def test_counters_follow_assignment_and_completion(client, monkeypatch, make_provider, make_service_request):
+    # Re-read the providers (and their active_jobs) on every ranking
+    monkeypatch.setitem(app.config, 'MATCH_INDEX_TTL', 0)
+    client.post('/api/admin/seed-pricing')
+    ayo, bea = make_provider('Ayo')['id'], make_provider('Bea')['id']
+    first, second = make_service_request(at='08:00'), make_service_request(at='11:00')
+    with app.app_context():
+        assert Customer.query.filter_by(customer_email='amy@example.com').one().total_bookings == 2
+
+    client.patch(f'/api/service-requests/{first}', json={'assigned_provider_id': ayo})
+    assert client.post(f'/api/service-requests/{second}/auto-assign').get_json()['request']['assigned_provider_id'] == bea
+    assert _counters(ayo) == (1, 1, 0)
+
+    client.patch(f'/api/service-requests/{first}', json={'status': 'completed'})
+    assert _counters(ayo) == (1, 0, 1)
+    # Reassigning moves the job, and its open/completed state, to the new provider
+    client.patch(f'/api/service-requests/{second}', json={'assigned_provider_id': ayo})
+    assert _counters(ayo) == (2, 1, 1)
+    assert _counters(bea) == (0, 0, 0)
+    # The same provider sent as a string is a no-op, not another reassignment
+    assert client.patch(f'/api/service-requests/{second}', json={'assigned_provider_id': str(ayo)}).status_code == 200
+    assert _counters(ayo) == (2, 1, 1)
+    assert client.patch(f'/api/service-requests/{second}', json={'assigned_provider_id': 'x'}).status_code == 400
+    assert client.patch(f'/api/service-requests/{second}', json={'assigned_provider_id': 999}).status_code == 400
+
+    rv = client.get(f'/api/service-requests/{make_service_request(at="14:00")}/candidates')
+    assert {c['provider_id']: c['open_jobs'] for c in rv.get_json()['candidates']} == {ayo: 1, bea: 0}
+
+
+def test_booking_counters(client, tomorrow, make_provider):
+    ayo = make_provider('Ayo')['id']
+    with app.app_context():
+        booking = Booking(name='Dee', address='1 Main Rd', date=tomorrow.isoformat(), time='09:00', service='Cleaning')
+        db.session.add(booking)
+        db.session.commit()
+        booking_id = booking.id
+
+    client.post(f'/api/bookings/{booking_id}/assign', json={'provider_id': ayo})
+    assert _counters(ayo) == (1, 1, 0)
+    client.patch(f'/api/bookings/{booking_id}', json={'status': 'completed'})
+    assert _counters(ayo) == (1, 0, 1)
+    client.delete(f'/api/bookings/{booking_id}')
+    assert _counters(ayo) == (0, 0, 0)
+
+
+def test_reconcile_rebuilds_counters_from_history(client, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    ayo = make_provider('Ayo')['id']
+    request_id = make_service_request()
+    client.patch(f'/api/service-requests/{request_id}', json={'assigned_provider_id': ayo, 'status': 'confirmed'})
+
+    with app.app_context():
+        db.session.execute(ServiceProvider.__table__.update().values(total_bookings=7, active_jobs=None))
+        db.session.execute(Customer.__table__.update().values(total_bookings=0))
+        db.session.commit()
+        assert reconcile_counters() == {'service_provider': 1, 'customer': 1}
+        assert reconcile_counters() == {'service_provider': 0, 'customer': 0}
+        assert Customer.query.one().total_bookings == 1
+    assert _counters(ayo) == (1, 1, 0)
+
+    # Admin edits cannot overwrite a counter; the reconcile endpoint rebuilds them
+    client.patch(f'/api/providers/{ayo}', json={'total_bookings': 40, 'rating': 4.5})
+    assert _counters(ayo) == (1, 1, 0)
+    with app.app_context():
+        db.session.execute(ServiceProvider.__table__.update().values(total_bookings=3))
+        db.session.commit()
+    rv = client.post('/api/admin/reconcile-counters')
+    assert rv.get_json() == {'corrected': {'service_provider': 1, 'customer': 0}}
+    assert _counters(ayo) == (1, 1, 0)
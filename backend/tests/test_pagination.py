@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from app import app, db, encode_cursor, Complaint, upgrade_schema
+
+
+def _add_complaints(count):
+    base = datetime(2025, 1, 1)
+    with app.app_context():
+        for i in range(count):
+            db.session.add(Complaint(
+                name=f'C{i}', type='service', title=f'Title {i}', description='...',
+                date='2025-01-01',
+                # Pairs share a timestamp so the id tie-breaker is exercised
+                created_at=base + timedelta(minutes=i // 2)
+            ))
+        db.session.commit()
+
+
+def test_pages_walk_the_whole_table_newest_first(client):
+    _add_complaints(7)
+
+    seen = []
+    rv = client.get('/api/complaints?limit=3')
+    while True:
+        assert rv.status_code == 200
+        page = rv.get_json()
+        assert len(page) <= 3
+        seen.extend(c['id'] for c in page)
+        cursor = rv.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        assert 'rel="next"' in rv.headers['Link']
+        rv = client.get(f'/api/complaints?limit=3&cursor={cursor}')
+
+    assert seen == list(range(7, 0, -1))
+
+
+def test_unpaginated_request_returns_everything(client):
+    _add_complaints(3)
+    rv = client.get('/api/complaints')
+    assert [c['id'] for c in rv.get_json()] == [1, 2, 3]
+    assert 'X-Next-Cursor' not in rv.headers
+
+
+def test_invalid_cursor_is_rejected(client):
+    rv = client.get('/api/bookings?limit=2&cursor=not-a-cursor')
+    assert rv.status_code == 400
+    assert rv.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_cursor_values_must_match_column_types(client):
+    _add_complaints(3)
+    for values in (['2025-01-01T00:00:00', 'abc'], ['2025-01-01T00:00:00', True], [5, 1],
+                   ['2025-01-01T00:00:00', None], ['2025-01-01T00:00:00', [1]]):
+        rv = client.get(f'/api/complaints?limit=2&cursor={encode_cursor(values)}')
+        assert rv.status_code == 400, values
+    rv = client.get(f"/api/complaints?limit=2&cursor={encode_cursor(['2025-01-01T00:00:00', 3])}")
+    assert [c['id'] for c in rv.get_json()] == [2, 1]
+
+
+def test_user_pages_use_id_cursor(client):
+    for i in range(3):
+        client.post('/api/signup', json={'name': f'U{i}', 'email': f'u{i}@example.com', 'password': 'pw'})
+    first = client.get('/api/users?limit=2')
+    second = client.get(f"/api/users?limit=2&cursor={first.headers['X-Next-Cursor']}")
+    assert [u['id'] for u in first.get_json()] == [3, 2]
+    assert [u['id'] for u in second.get_json()] == [1]
+
+
+def test_legacy_rows_without_created_at_are_backfilled(client):
+    _add_complaints(4)
+    with app.app_context():
+        db.session.execute(Complaint.__table__.update().values(created_at=None))
+        db.session.commit()
+        upgrade_schema()
+
+    seen = []
+    rv = client.get('/api/complaints?limit=2')
+    while True:
+        assert rv.status_code == 200
+        seen.extend(c['id'] for c in rv.get_json())
+        cursor = rv.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        rv = client.get(f'/api/complaints?limit=2&cursor={cursor}')
+    assert sorted(seen) == [1, 2, 3, 4]
@@ -0,0 +1,38 @@
+from app import app, db, pricing_catalog, bump_data_version, ServicePricing
+
+
+def test_pricing_endpoints_served_from_catalog(client):
+    client.post('/api/admin/seed-pricing')
+
+    categories = client.get('/api/pricing/categories').get_json()
+    assert categories[0] == 'Couch Deep Cleaning'
+    assert len(categories) == len(set(categories))
+
+    mattresses = client.get('/api/pricing?category=Mattress Deep Cleaning').get_json()
+    assert [m['service_type'] for m in mattresses] == ['Single', 'Double', 'Queen', 'King']
+    assert len(client.get('/api/pricing/all').get_json()) == sum(
+        len(client.get(f'/api/pricing?category={c}').get_json()) for c in categories)
+
+    with app.app_context():
+        entry = pricing_catalog.lookup('Mattress Deep Cleaning', 'Queen')
+        assert entry.customer_display_price_cents == 55000
+
+
+def test_other_workers_reload_after_version_bump(client, monkeypatch):
+    client.post('/api/admin/seed-pricing')
+    with app.app_context():
+        pricing_catalog.refresh()
+        seen_version = pricing_catalog.version
+
+        # Simulate a price change made by another process
+        row = ServicePricing.query.filter_by(service_category='Mattress Deep Cleaning', service_type='King').one()
+        row.customer_display_price_cents = 70000
+        bump_data_version('pricing')
+        db.session.commit()
+
+        # Within the TTL the cached price is still served
+        assert pricing_catalog.lookup('Mattress Deep Cleaning', 'King').customer_display_price_cents == 60500
+
+        monkeypatch.setitem(app.config, 'PRICING_CACHE_TTL', 0)
+        assert pricing_catalog.lookup('Mattress Deep Cleaning', 'King').customer_display_price_cents == 70000
+        assert pricing_catalog.version == seen_version + 1
@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+from app import app, db, normalize_booking_times, Booking, ServiceRequest
+
+
+def test_assignment_rejects_overlapping_jobs(client, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    provider_id = make_provider('Ayo')['id']
+    first, overlapping, later = (make_service_request(name, at) for name, at in
+                                 (('Amy', '08:00'), ('Ben', '09:30'), ('Cal', '10:00')))
+
+    assert client.patch(f'/api/service-requests/{first}', json={'assigned_provider_id': provider_id}).status_code == 200
+    rv = client.patch(f'/api/service-requests/{overlapping}', json={'assigned_provider_id': provider_id})
+    assert rv.status_code == 409
+    assert rv.get_json()['conflicts'] == [
+        {'kind': 'service_request', 'id': first, 'status': 'pending', 'start': '08:00', 'end': '10:00'}
+    ]
+    # Back-to-back slots do not overlap
+    assert client.patch(f'/api/service-requests/{later}', json={'assigned_provider_id': provider_id}).status_code == 200
+
+    # The admin can still double-book on purpose; the overlap is reported
+    rv = client.patch(f'/api/service-requests/{overlapping}',
+                      json={'assigned_provider_id': provider_id, 'allow_conflict': True})
+    assert rv.status_code == 200
+    assert [job['id'] for job in rv.get_json()['conflicts']] == [first, later]
+
+
+def test_booking_assignment_sees_service_requests(client, tomorrow, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    provider_id = make_provider('Ayo')['id']
+    request_id = make_service_request('Amy', '08:00')
+    client.patch(f'/api/service-requests/{request_id}', json={'assigned_provider_id': provider_id})
+    with app.app_context():
+        booking = Booking(name='Dee', address='1 Main Rd', date=tomorrow.isoformat(), time='09:00', service='Cleaning')
+        db.session.add(booking)
+        db.session.commit()
+        booking_id = booking.id
+
+    rv = client.post(f'/api/bookings/{booking_id}/assign', json={'provider_id': provider_id})
+    assert rv.status_code == 409
+    with app.app_context():
+        assert Booking.query.get(booking_id).assigned_provider_id is None
+
+
+def test_schedule_endpoint_lists_jobs_and_free_time(client, tomorrow, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    provider_id = make_provider('Ayo')['id']
+    request_id = make_service_request('Amy', '09:00')
+    client.patch(f'/api/service-requests/{request_id}', json={'assigned_provider_id': provider_id})
+
+    rv = client.get(f'/api/providers/{provider_id}/schedule?from={tomorrow}&to={tomorrow + timedelta(days=1)}&time=10:30')
+    body = rv.get_json()
+    assert body['slot_minutes'] == 120
+    busy, free = body['days']
+    assert busy['date'] == tomorrow.isoformat()
+    assert [job['id'] for job in busy['jobs']] == [request_id]
+    assert busy['free'] == [{'start': '07:00', 'end': '09:00'}, {'start': '11:00', 'end': '18:00'}]
+    assert busy['available'] is False
+    assert free == {'date': (tomorrow + timedelta(days=1)).isoformat(), 'jobs': [],
+                    'free': [{'start': '07:00', 'end': '18:00'}], 'available': True}
+
+    assert client.get(f'/api/providers/{provider_id}/schedule?from=nope').status_code == 400
+    assert client.get(f'/api/providers/{provider_id}/schedule?from={tomorrow}&to={date.today()}').status_code == 400
+    assert client.get('/api/providers/999/schedule').status_code == 404
+
+
+def test_auto_assign_skips_busy_providers(client, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    busy = make_provider('Ayo', rating=4.9)['id']
+    free = make_provider('Bea', rating=4.0)['id']
+    booked = make_service_request('Amy', '08:00')
+    client.patch(f'/api/service-requests/{booked}', json={'assigned_provider_id': busy})
+
+    request_id = make_service_request('Ben', '09:00')
+    rv = client.post(f'/api/service-requests/{request_id}/auto-assign')
+    assert rv.status_code == 200
+    assert rv.get_json()['request']['assigned_provider_id'] == free
+    with app.app_context():
+        assert ServiceRequest.query.get(request_id).provider_name == 'Bea'
+
+
+def test_booking_times_are_zero_padded_for_sql_clash_checks(client, tomorrow, make_provider, make_service_request):
+    client.post('/api/admin/seed-pricing')
+    busy = make_provider('Ayo', rating=4.9)['id']
+    free = make_provider('Bea', rating=4.0)['id']
+    booking_id = client.post('/api/bookings', json={
+        'name': 'Dee', 'address': '1 Main Rd', 'date': tomorrow.isoformat(), 'time': '9:00', 'service': 'Cleaning'
+    }).get_json()['booking']['id']
+    assert client.post(f'/api/bookings/{booking_id}/assign', json={'provider_id': busy}).status_code == 200
+    with app.app_context():
+        assert Booking.query.get(booking_id).time == '09:00'
+        # A legacy row written before times were normalized
+        legacy = Booking(name='Eve', address='2 Main Rd', date=tomorrow.isoformat(), time='7:30', service='Cleaning')
+        db.session.add(legacy)
+        db.session.commit()
+        assert normalize_booking_times() == 1
+        assert db.session.get(Booking, legacy.id).time == '07:30'
+
+    request_id = make_service_request('Ben', '10:00')
+    rv = client.post(f'/api/service-requests/{request_id}/auto-assign')
+    assert rv.get_json()['request']['assigned_provider_id'] == free
@@ -0,0 +1,104 @@
+"""The ServiceRequest hot queries must be answered from indexes, not table scans."""
+import os
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+import app as app_module
+from app import app, db, Customer, ServiceProvider, ServiceRequest
+
+
+def _capture_service_request_selects(action):
+    captured = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM service_request' in statement:
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        action()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return captured
+
+
+def _sqlite_plan(statement, parameters):
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.fixture
+def populated(client):
+    with app.app_context():
+        for i in range(20):
+            db.session.add(ServiceRequest(
+                customer_name=f'C{i}', customer_email='c@example.com', customer_phone='0820000000',
+                customer_address='1 Main Rd', preferred_date=date.today() + timedelta(days=i % 3),
+                preferred_time=time(9, 0), selected_items='[]',
+                status=['pending', 'confirmed', 'completed'][i % 3]
+            ))
+        db.session.commit()
+    return client
+
+
+def test_status_filtered_list_uses_status_index(populated):
+    with app.app_context():
+        captured = _capture_service_request_selects(
+            lambda: populated.get('/api/service-requests?status=pending&limit=5'))
+        plans = [_sqlite_plan(*q) for q in captured]
+    assert plans
+    assert all('ix_service_request_status_created_at_id' in plan for plan in plans), plans
+    assert not any('USE TEMP B-TREE FOR ORDER BY' in plan for plan in plans), plans
+
+
+def test_reminder_candidates_use_partial_index(populated, monkeypatch):
+    monkeypatch.setattr(app_module, 'send_email_batch', lambda emails: [True] * len(emails))
+    with app.app_context():
+        captured = _capture_service_request_selects(lambda: app_module.run_reminders(chunk_size=2))
+        plans = [_sqlite_plan(*q) for q in captured]
+    assert plans
+    assert all('ix_service_request_reminder_due' in plan for plan in plans), plans
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_POSTGRES_URL'), reason='TEST_POSTGRES_URL not set')
+def test_postgres_plans_use_indexes():
+    from sqlalchemy.dialects import postgresql
+
+    engine = create_engine(os.environ['TEST_POSTGRES_URL'])
+    tables = [Customer.__table__, ServiceProvider.__table__, ServiceRequest.__table__]
+    db.metadata.create_all(engine, tables=tables)
+    queries = {
+        'ix_service_request_status_created_at_id': db.select(ServiceRequest.request_id)
+            .where(ServiceRequest.status == 'pending')
+            .order_by(ServiceRequest.created_at.desc(), ServiceRequest.request_id.desc()).limit(50),
+        'ix_service_request_reminder_due': db.select(ServiceRequest.request_id).where(
+            ServiceRequest.preferred_date == date.today() + timedelta(days=1),
+            ServiceRequest.status.in_(['confirmed', 'pending']),
+            ServiceRequest.reminder_sent_at.is_(None),
+            ServiceRequest.request_id > 0
+        ).order_by(ServiceRequest.request_id).limit(200),
+    }
+    try:
+        with engine.connect() as conn:
+            conn.execute(text('SET enable_seqscan = off'))
+            for index_name, query in queries.items():
+                compiled = query.compile(dialect=postgresql.dialect())
+                plan = '\n'.join(row[0] for row in conn.exec_driver_sql('EXPLAIN ' + str(compiled), compiled.params))
+                assert index_name in plan, plan
+    finally:
+        db.metadata.drop_all(engine, tables=tables)
+
+
+def test_provider_schedule_uses_provider_date_index(populated):
+    with app.app_context():
+        provider = ServiceProvider(name='P', service_type='Cleaning', phone='1', email='p@example.com',
+                                   registered='2025-01-01')
+        db.session.add(provider)
+        db.session.commit()
+        captured = _capture_service_request_selects(
+            lambda: populated.get(f'/api/providers/{provider.id}/schedule'))
+        plans = [_sqlite_plan(*q) for q in captured]
+    assert plans
+    assert all('ix_service_request_provider_date' in plan for plan in plans), plans
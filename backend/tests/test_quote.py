@@ -0,0 +1,68 @@
+import json
+from datetime import date, timedelta
+
+from app import app, db, ServiceRequest
+
+CARTS = [
+    [{'category': 'Couch Deep Cleaning', 'type': '3 Seater Couch', 'quantity': 1, 'is_white': True},
+     {'category': 'Mattress Deep Cleaning', 'type': 'King', 'quantity': 2}],
+    [{'category': 'Carpet Deep Cleaning', 'type': 'Small', 'quantity': 3, 'is_white': True}],
+]
+
+
+def _payload(items):
+    return {
+        'customer_name': 'Dee', 'customer_email': 'dee@example.com', 'customer_phone': '0821112222',
+        'customer_address': '5 Oak Ave, Randburg',
+        'preferred_date': (date.today() + timedelta(days=2)).isoformat(), 'preferred_time': '11:00',
+        'items': items
+    }
+
+
+def test_quotes_match_what_create_service_request_stores(client):
+    client.post('/api/admin/seed-pricing')
+    rv = client.post('/api/service-requests/quote', json={'carts': [{'items': items} for items in CARTS]})
+    assert rv.status_code == 200
+    quotes = rv.get_json()['quotes']
+
+    for items, quote in zip(CARTS, quotes):
+        request_id = client.post('/api/service-requests', json=_payload(items)).get_json()['request_id']
+        with app.app_context():
+            stored = db.session.get(ServiceRequest, request_id)
+            assert quote['items'] == json.loads(stored.selected_items)
+            assert quote['total_customer_paid'] == stored.total_customer_paid_cents / 100
+            assert quote['total_provider_payout'] == stored.total_provider_payout_cents / 100
+            assert quote['total_commission_earned'] == stored.total_commission_earned_cents / 100
+    # White surcharge applied to the couch only
+    assert quotes[0]['items'][0]['customer_price'] == 770.0
+    assert quotes[0]['total_customer_paid'] == 770.0 + 2 * 605.0 + 100.0
+
+
+def test_bad_carts_are_reported_individually_and_nothing_is_written(client):
+    client.post('/api/admin/seed-pricing')
+    rv = client.post('/api/service-requests/quote', json={'carts': [
+        {'items': [{'category': 'Mattress Deep Cleaning', 'type': 'Queen', 'quantity': 11}]},
+        {'items': [{'category': 'Nope', 'type': 'Queen'}]},
+        {'items': [{'category': 'Mattress Deep Cleaning', 'type': 'Queen'}]},
+    ]})
+    quotes = rv.get_json()['quotes']
+    assert quotes[0] == {'error': 'Quantity must be between 1 and 10', 'status': 400}
+    assert quotes[1]['status'] == 404
+    assert quotes[2]['total_customer_paid'] > 100
+    with app.app_context():
+        assert ServiceRequest.query.count() == 0
+
+    single = client.post('/api/service-requests/quote', json={'items': CARTS[1]}).get_json()['quotes']
+    assert len(single) == 1 and 'error' not in single[0]
+
+
+def test_malformed_carts_are_rejected_not_crashed_on(client):
+    client.post('/api/admin/seed-pricing')
+    quote = lambda body: client.post('/api/service-requests/quote', json=body)
+
+    assert quote({'items': [1]}).get_json()['quotes'] == [{'error': 'Each item must be an object', 'status': 400}]
+    assert quote({'items': {'a': 1}}).get_json()['quotes'] == [{'error': 'items must be a list', 'status': 400}]
+    assert quote({'carts': [{'items': 'abc'}]}).get_json()['quotes'] == [{'error': 'items must be a list', 'status': 400}]
+    bad_quantity = [{'category': 'Mattress Deep Cleaning', 'type': 'Queen', 'quantity': 1.5}]
+    assert quote({'items': bad_quantity}).get_json()['quotes'] == [{'error': 'Quantity must be an integer', 'status': 400}]
+    assert quote([1, 2]).status_code == 400
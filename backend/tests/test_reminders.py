@@ -0,0 +1,53 @@
+from datetime import date, datetime, time, timedelta
+
+import app as app_module
+from app import app, db, ServiceRequest
+
+
+def _add_request(day, status='confirmed', email='cust@example.com'):
+    req = ServiceRequest(
+        customer_name='Cust', customer_email=email, customer_phone='0820000000',
+        customer_address='1 Main Rd', preferred_date=day, preferred_time=time(9, 0),
+        selected_items='[{"category": "Carpet Deep Cleaning", "type": "Small", "quantity": 1}]',
+        status=status
+    )
+    db.session.add(req)
+    return req
+
+
+def test_reminders_run_in_chunks_and_mark_each_chunk(client, monkeypatch):
+    batches = []
+
+    def fake_batch(emails):
+        batches.append([e[0] for e in emails])
+        # The customer with a bad address is rejected, everyone else gets through
+        return [e[0] != 'bad@example.com' for e in emails]
+
+    monkeypatch.setattr(app_module, 'send_email_batch', fake_batch)
+    tomorrow = date.today() + timedelta(days=1)
+    with app.app_context():
+        for i in range(5):
+            _add_request(tomorrow, email=f'c{i}@example.com')
+        _add_request(tomorrow, email='bad@example.com')
+        _add_request(tomorrow, status='completed')
+        _add_request(tomorrow + timedelta(days=1))
+        already = _add_request(tomorrow)
+        already.reminder_sent_at = datetime.utcnow()
+        db.session.commit()
+
+    rv = client.post('/api/admin/send-reminders?chunk_size=4')
+    assert rv.status_code == 200
+    report = rv.get_json()
+    assert report['message'] == 'Sent 5 reminder emails'
+    assert (report['sent'], report['failed']) == (5, 1)
+    assert [chunk['size'] for chunk in report['chunks']] == [4, 2]
+    assert sum(len(b) for b in batches) == 6
+    assert 'emails_per_second' in report
+
+    with app.app_context():
+        pending = ServiceRequest.query.filter(
+            ServiceRequest.preferred_date == tomorrow,
+            ServiceRequest.status == 'confirmed',
+            ServiceRequest.reminder_sent_at.is_(None)
+        ).all()
+        assert [r.customer_email for r in pending] == ['bad@example.com']
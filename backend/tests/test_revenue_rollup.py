@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+
+from app import app, DailyRevenueRollup, rebuild_daily_rollups
+
+
+def _create_request(client, items):
+    return client.post('/api/service-requests', json={
+        'customer_name': 'Eve', 'customer_email': 'eve@example.com', 'customer_phone': '0823334444',
+        'customer_address': '9 Elm St, Rosebank',
+        'preferred_date': (date.today() + timedelta(days=1)).isoformat(), 'preferred_time': '08:00',
+        'items': items
+    }).get_json()['request_id']
+
+
+def _snapshot():
+    return sorted(
+        (r.day, r.category, r.job_count, r.customer_paid_cents, r.provider_payout_cents, r.commission_cents)
+        for r in DailyRevenueRollup.query.all() if r.job_count
+    )
+
+
+def test_rollup_follows_completion_and_matches_rebuild(client):
+    client.post('/api/admin/seed-pricing')
+    first = _create_request(client, [{'category': 'Carpet Deep Cleaning', 'type': 'Small', 'quantity': 1}])
+    second = _create_request(client, [
+        {'category': 'Carpet Deep Cleaning', 'type': 'Large', 'quantity': 1},
+        {'category': 'Mattress Deep Cleaning', 'type': 'Single', 'quantity': 1},
+    ])
+
+    for request_id in (first, second):
+        client.patch(f'/api/service-requests/{request_id}', json={'status': 'completed'})
+    # Re-opening a job takes it back out of the totals
+    client.patch(f'/api/service-requests/{first}', json={'status': 'in_progress'})
+
+    with app.app_context():
+        today = date.today()
+        totals = DailyRevenueRollup.query.get((today, ''))
+        assert totals.job_count == 1
+        assert totals.customer_paid_cents == (440 + 385 + 100) * 100
+        assert DailyRevenueRollup.query.get((today, 'Carpet Deep Cleaning')).job_count == 1
+
+        incremental = _snapshot()
+        rebuild_daily_rollups()
+        assert _snapshot() == incremental
+
+    stats = client.get('/api/admin/stats').get_json()
+    assert stats['completed'] == 1
+    assert stats['this_month_revenue'] == 925.0
+    report = client.get('/api/admin/financial-report').get_json()
+    assert report['number_of_jobs'] == 1
+    assert set(report['category_breakdown']) == {'Carpet Deep Cleaning', 'Mattress Deep Cleaning'}
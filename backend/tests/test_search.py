@@ -0,0 +1,98 @@
+import os
+from datetime import date, time
+
+import pytest
+from sqlalchemy import create_engine, func, literal_column, text
+
+import app as app_module
+from app import app, db, Complaint, Customer, ServiceRequest
+
+
+def _service_request(name, **fields):
+    values = dict(customer_name=name, customer_email=f'{name.split()[0].lower()}@example.com',
+                  customer_phone='0821234567', customer_address='1 Main Rd, Sandton',
+                  preferred_date=date(2026, 11, 1), preferred_time=time(9, 0), selected_items='[]')
+    values.update(fields)
+    return ServiceRequest(**values)
+
+
+def _complaint(title, description):
+    return Complaint(name='Dana', type='service', title=title, description=description, date='2026-10-01')
+
+
+def test_service_request_search_is_ranked_and_tracks_updates(client):
+    with app.app_context():
+        db.session.add_all([
+            _service_request('Thandi Nkosi', additional_notes='gate code 1234'),
+            _service_request('Peter Smith', customer_address='Nkosi Street, Soweto'),
+            _service_request('Mary Jones'),
+        ])
+        db.session.commit()
+
+    rv = client.get('/api/service-requests?search=nkos')
+    names = [r['customer_name'] for r in rv.get_json()]
+    assert sorted(names) == ['Peter Smith', 'Thandi Nkosi']
+
+    assert [r['customer_name'] for r in client.get('/api/service-requests?search=gate 1234').get_json()] == \
+        ['Thandi Nkosi']
+
+    with app.app_context():
+        mary = ServiceRequest.query.filter_by(customer_name='Mary Jones').one()
+        mary.admin_notes = 'prefers morning slots'
+        db.session.delete(ServiceRequest.query.filter_by(customer_name='Peter Smith').one())
+        db.session.commit()
+        mary_id = mary.request_id
+
+    assert [r['customer_name'] for r in client.get('/api/service-requests?search=MORNING').get_json()] == \
+        ['Mary Jones']
+    assert [r['customer_name'] for r in client.get('/api/service-requests?search=nkosi').get_json()] == \
+        ['Thandi Nkosi']
+    # A numeric search still finds the request by id
+    assert client.get(f'/api/service-requests?search={mary_id}').get_json()[0]['request_id'] == mary_id
+
+
+def test_search_results_are_paginated(client):
+    with app.app_context():
+        db.session.add_all([_complaint(f'Late arrival {i}', 'The cleaner arrived late') for i in range(5)])
+        db.session.add(_complaint('Damaged couch', 'Stain on the couch'))
+        db.session.commit()
+
+    seen = []
+    url = '/api/complaints?search=late&limit=2'
+    while url:
+        rv = client.get(url)
+        seen.extend(c['title'] for c in rv.get_json())
+        cursor = rv.headers.get('X-Next-Cursor')
+        url = f'/api/complaints?search=late&limit=2&cursor={cursor}' if cursor else None
+    assert sorted(seen) == [f'Late arrival {i}' for i in range(5)]
+
+
+def test_customer_search(client):
+    with app.app_context():
+        db.session.add_all([
+            Customer(customer_name='Sipho Dlamini', customer_email='sipho@example.com', customer_phone='0831112222'),
+            Customer(customer_name='Anna Botha', customer_email='anna@example.com', customer_phone='0724445555'),
+        ])
+        db.session.commit()
+
+    assert [c['customer_name'] for c in client.get('/api/customers?search=072444').get_json()] == ['Anna Botha']
+    assert len(client.get('/api/customers').get_json()) == 2
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_POSTGRES_URL'), reason='TEST_POSTGRES_URL not set')
+def test_postgres_search_uses_gin_index():
+    from sqlalchemy.dialects import postgresql
+
+    engine = create_engine(os.environ['TEST_POSTGRES_URL'])
+    tables = [Complaint.__table__]
+    db.metadata.create_all(engine, tables=tables)
+    try:
+        with engine.connect() as conn:
+            document = app_module._search_document([getattr(Complaint, c) for c in Complaint.__search_columns__])
+            query = db.select(Complaint.id).where(document.op('@@')(func.to_tsquery(literal_column("'simple'"), 'late:*')))
+            compiled = query.compile(dialect=postgresql.dialect())
+            conn.execute(text('SET enable_seqscan = off'))
+            plan = '\n'.join(row[0] for row in conn.exec_driver_sql('EXPLAIN ' + str(compiled), compiled.params))
+            assert 'ix_complaint_search' in plan, plan
+    finally:
+        db.metadata.drop_all(engine, tables=tables)
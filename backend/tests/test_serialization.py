@@ -0,0 +1,96 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from app import (
+    app, db, serialize_row, User, Booking, Complaint, ServiceProvider,
+    ServicePricing, Customer, ServiceRequest, EmailOutbox
+)
+
+
+def _stdlib_bytes(obj):
+    """What Flask's default provider would have sent"""
+    with app.app_context():
+        return DefaultJSONProvider(app).response(obj).get_data()
+
+
+def _fast_bytes(obj):
+    with app.app_context():
+        return app.json.response(obj).get_data()
+
+
+def _rows():
+    created = datetime(2025, 3, 4, 5, 6, 7, 890123)
+    return [
+        User(name='Zoë', email='z@example.com', password_hash='x', phone=None, registered='2025-01-01'),
+        Booking(name='Ann', address='1 Main Rd', date='2025-06-01', time='09:00', service='Cleaning',
+                amount=1234.5, estimated_price=None, final_price=0.1 + 0.2, created_at=created),
+        Complaint(name='Bo', type='service', title='Late', description='"quoted" \\ text', date='2025-06-01',
+                  is_anonymous=False, follow_up_enabled=True, created_at=created, updated_at=created),
+        ServiceProvider(name='Sipho', service_type='Plumbing', phone='082', email='s@example.com',
+                        experience_years=3, hourly_rate=250.0, rating=4.75, total_bookings=0,
+                        registered='2025-01-01', created_at=created),
+        ServicePricing(service_category='Electrical', service_type='Plug', item_description=None,
+                       provider_base_price_cents=90000, customer_display_price_cents=100050,
+                       color_surcharge_provider_cents=None, color_surcharge_customer_cents=2500,
+                       is_white_applicable=True, commission_percentage=Decimal('10.00')),
+        Customer(customer_name='Cara', customer_email='c@example.com', customer_phone='083',
+                 saved_addresses='["1 Main Rd", "Flat 2 – Sea Point"]', total_bookings=2),
+        ServiceRequest(customer_name='Dee', customer_email='d@example.com', customer_phone='084',
+                       customer_address='2 High St', preferred_date=date(2025, 6, 1), preferred_time=time(9, 30),
+                       selected_items='[{"category": "Electrical", "customer_price": 1000.5}]',
+                       total_customer_paid_cents=110050, total_provider_payout_cents=0,
+                       total_commission_earned_cents=None, customer_payment_received=True,
+                       created_at=created, reminder_sent_at=created),
+        EmailOutbox(to_email='e@example.com', subject='Hi', body='secret', reply_to='r@example.com',
+                    status='pending', attempts=1, next_attempt_at=created, locked_at=created),
+    ]
+
+
+@pytest.mark.parametrize('row', _rows(), ids=lambda row: type(row).__name__)
+def test_compiled_serializer_matches_to_dict(row):
+    assert serialize_row(row) == row.to_dict()
+    assert _fast_bytes(serialize_row(row)) == _stdlib_bytes(row.to_dict())
+
+
+def test_expired_rows_are_loaded_before_serializing(client):
+    with app.app_context():
+        customer = Customer(customer_name='Eve', customer_email='e@example.com', customer_phone='085',
+                            saved_addresses=None, total_bookings=0)
+        db.session.add(customer)
+        db.session.commit()  # expires every attribute
+        assert 'customer_name' not in customer.__dict__
+        assert serialize_row(customer) == customer.to_dict()
+        assert serialize_row(customer)['saved_addresses'] == []
+
+
+@pytest.mark.parametrize('payload', [
+    {'b': 1, 'a': [1.5, None, True], 'nested': {'z': 'x', 'y': ''}},
+    {'name': 'Thabo Ñandú – “quoted”', 'emoji': '🏠'},
+    {'tiny': 1e-05, 'huge': 1e16, 'normal': 0.30000000000000004, 'neg': -0.0},
+    {'when': datetime(2025, 6, 1, 9, 30), 'day': date(2025, 6, 1), 'price': Decimal('10.50')},
+    {'big': 2 ** 70, 'keys': {1: 'int key'}},
+    {'rating': float('nan'), 'rates': [float('inf'), -float('inf')], 'none': None},
+    {'text': 'del \x7f and controls \x01\x1f\n\t'},
+    [],
+    None,
+])
+def test_provider_output_is_byte_identical(payload):
+    assert _fast_bytes(payload) == _stdlib_bytes(payload)
+    with app.app_context():
+        compact = app.json.dumps(payload, separators=(',', ':'))
+        assert compact == DefaultJSONProvider(app).dumps(payload, separators=(',', ':'))
+        assert app.json.dumps(payload) == DefaultJSONProvider(app).dumps(payload)
+
+
+def test_list_endpoint_bytes_unchanged(client):
+    with app.app_context():
+        for row in _rows():
+            db.session.add(row)
+        db.session.commit()
+        expected = _stdlib_bytes([r.to_dict() for r in ServiceRequest.query.order_by(
+            ServiceRequest.created_at.desc(), ServiceRequest.request_id.desc())])
+
+    assert client.get('/api/service-requests').get_data() == expected
@@ -0,0 +1,78 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+import app as app_module
+from app import app, db, ServiceRequest, ServiceRequestItem
+
+
+def _payload(items):
+    return {
+        'customer_name': 'Dee', 'customer_email': 'dee@example.com', 'customer_phone': '0821112222',
+        'customer_address': '5 Oak Ave, Randburg',
+        'preferred_date': (date.today() + timedelta(days=2)).isoformat(), 'preferred_time': '11:00',
+        'items': items
+    }
+
+
+def test_items_written_and_used_for_filter_and_report(client):
+    client.post('/api/admin/seed-pricing')
+    couch = client.post('/api/service-requests', json=_payload([
+        {'category': 'Couch Deep Cleaning', 'type': '3 Seater Couch', 'quantity': 1, 'is_white': True},
+        {'category': 'Mattress Deep Cleaning', 'type': 'King', 'quantity': 2},
+    ])).get_json()['request_id']
+    carpet = client.post('/api/service-requests', json=_payload([
+        {'category': 'Carpet Deep Cleaning', 'type': 'Small', 'quantity': 1},
+    ])).get_json()['request_id']
+
+    with app.app_context():
+        items = ServiceRequestItem.query.filter_by(request_id=couch).order_by(ServiceRequestItem.position).all()
+        assert [(i.category, i.quantity, i.is_white) for i in items] == [
+            ('Couch Deep Cleaning', 1, True), ('Mattress Deep Cleaning', 2, False)]
+
+    filtered = client.get('/api/service-requests?category=Mattress Deep Cleaning').get_json()
+    assert [r['request_id'] for r in filtered] == [couch]
+    assert filtered[0]['selected_items'][1]['type'] == 'King'
+
+    for request_id in (couch, carpet):
+        client.patch(f'/api/service-requests/{request_id}', json={'status': 'completed'})
+    report = client.get('/api/admin/financial-report').get_json()
+    assert report['number_of_jobs'] == 2
+    assert report['category_breakdown'] == {
+        'Couch Deep Cleaning': {'count': 1, 'commission': 77.0},
+        'Mattress Deep Cleaning': {'count': 1, 'commission': 122.0},
+        'Carpet Deep Cleaning': {'count': 1, 'commission': 33.0},
+    }
+
+
+def test_backfill_populates_legacy_requests(client):
+    legacy_items = [
+        {'category': 'Carpet Deep Cleaning', 'type': 'Large', 'is_white': False, 'quantity': 1,
+         'customer_price': 440.0, 'provider_price': 396.0, 'commission': 44.0},
+    ]
+    with app.app_context():
+        for _ in range(3):
+            db.session.add(ServiceRequest(
+                customer_name='Old', customer_email='old@example.com', customer_phone='0820000000',
+                customer_address='1 Main Rd', preferred_date=date(2024, 1, 5), preferred_time=time(9, 0),
+                selected_items=json.dumps(legacy_items)))
+        db.session.commit()
+
+        assert app_module.backfill_service_request_items(batch_size=2) == 3
+        assert app_module.backfill_service_request_items() == 0
+        assert ServiceRequestItem.query.filter_by(category='Carpet Deep Cleaning').count() == 3
+
+
+def test_backfill_tolerates_malformed_legacy_items(client):
+    with app.app_context():
+        db.session.add(ServiceRequest(
+            customer_name='Old', customer_email='old@example.com', customer_phone='0820000000',
+            customer_address='1 Main Rd', preferred_date=date(2024, 1, 5), preferred_time=time(9, 0),
+            selected_items=json.dumps([
+                {'category': 'Carpet Deep Cleaning', 'type': 'Large', 'quantity': '2x', 'customer_price': 'R440'},
+                {'category': 'Carpet Deep Cleaning', 'type': 'Small', 'quantity': ''},
+            ])))
+        db.session.commit()
+
+        assert app_module.backfill_service_request_items() == 1
+        items = ServiceRequestItem.query.order_by(ServiceRequestItem.position).all()
+        assert [(i.quantity, i.customer_price_cents) for i in items] == [(1, None), (1, None)]
@@ -0,0 +1,116 @@
+import smtplib
+
+import pytest
+
+import app as app_module
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, *args, **kwargs):
+        self.host = host
+        self.port = port
+        self.calls = []
+        self.alive = True
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        self.calls.append('starttls')
+
+    def login(self, user, password):
+        self.calls.append('login')
+
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected('gone')
+        return (250, b'OK')
+
+    def send_message(self, msg):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected('gone')
+        self.calls.append(('send', msg['To']))
+
+    def quit(self):
+        self.calls.append('quit')
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    monkeypatch.setenv('EMAIL_HOST', 'smtp.test')
+    monkeypatch.setenv('EMAIL_USER', 'user')
+    monkeypatch.setenv('EMAIL_PASS', 'secret')
+    app_module.close_smtp_pools()
+    yield FakeSMTP
+    app_module.close_smtp_pools()
+
+
+def test_many_messages_share_one_session(fake_smtp):
+    emails = [(f'user{i}@example.com', 'Hi', 'Body', None) for i in range(5)]
+    assert app_module.send_emails_smtp(emails) == [True] * 5
+    assert app_module.send_email_smtp('late@example.com', 'Hi', 'Body') is True
+
+    assert len(fake_smtp.instances) == 1
+    calls = fake_smtp.instances[0].calls
+    assert calls.count('starttls') == 1
+    assert calls.count('login') == 1
+    assert [c for c in calls if isinstance(c, tuple)][-1] == ('send', 'late@example.com')
+
+
+def test_stale_session_is_replaced(fake_smtp, monkeypatch):
+    monkeypatch.setenv('EMAIL_POOL_CHECK_AFTER', '0')
+    assert app_module.send_email_smtp('a@example.com', 'Hi', 'Body') is True
+    fake_smtp.instances[0].alive = False
+
+    assert app_module.send_email_smtp('b@example.com', 'Hi', 'Body') is True
+    assert len(fake_smtp.instances) == 2
+    assert ('send', 'b@example.com') in fake_smtp.instances[1].calls
+
+
+def test_session_dropped_mid_batch_is_reconnected(fake_smtp):
+    pool = app_module.get_smtp_pool()
+    first = app_module.build_email_message('a@example.com', 'Hi', 'Body')
+    second = app_module.build_email_message('b@example.com', 'Hi', 'Body')
+    assert pool.send_messages([first]) == [(True, None)]
+    fake_smtp.instances[0].alive = False
+
+    assert pool.send_messages([second]) == [(True, None)]
+    assert len(fake_smtp.instances) == 2
+
+
+def test_login_failure_is_a_transport_error(fake_smtp, monkeypatch):
+    def refuse(self, user, password):
+        raise smtplib.SMTPAuthenticationError(535, b'bad credentials')
+
+    monkeypatch.setattr(fake_smtp, 'login', refuse)
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        app_module.send_emails_smtp([('a@example.com', 'Hi', 'Body', None)])
+    assert app_module.send_email_smtp('a@example.com', 'Hi', 'Body') is False
+
+
+def test_refused_sender_mid_batch_leaves_the_rest_unsent(fake_smtp, monkeypatch):
+    sent = []
+
+    def send_message(self, msg):
+        if sent:
+            raise smtplib.SMTPSenderRefused(530, b'Authentication required', 'noreply@example.com')
+        sent.append(msg['To'])
+
+    monkeypatch.setattr(fake_smtp, 'send_message', send_message)
+    emails = [(f'user{i}@example.com', 'Hi', 'Body', None) for i in range(3)]
+    assert app_module.send_emails_smtp(emails) == [True, None, None]
+    with pytest.raises(smtplib.SMTPSenderRefused):
+        app_module.send_emails_smtp(emails[1:])
+
+
+def test_refused_recipient_is_a_message_error(fake_smtp, monkeypatch):
+    def send_message(self, msg):
+        raise smtplib.SMTPRecipientsRefused({msg['To']: (550, b'No such user')})
+
+    monkeypatch.setattr(fake_smtp, 'send_message', send_message)
+    assert app_module.send_emails_smtp([('bad@example.com', 'Hi', 'Body', None)]) == [False]
@@ -0,0 +1,96 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import event
+
+from app import app, db, ServiceRequest, ServiceProvider
+
+
+def _add_requests(count):
+    with app.app_context():
+        for i in range(count):
+            db.session.add(ServiceRequest(
+                customer_name=f'Cust {i}', customer_email=f'c{i}@example.com',
+                customer_phone='0820000000', customer_address='1 Main Rd',
+                preferred_date=datetime(2025, 6, 1).date(), preferred_time=time(9, 0),
+                selected_items='[{"category": "Plumbing"}]', admin_notes='long notes',
+                total_customer_paid_cents=12345, created_at=datetime(2025, 1, 1) + timedelta(minutes=i)
+            ))
+        db.session.commit()
+
+
+class _Statements(list):
+    def __enter__(self):
+        with app.app_context():
+            self.engine = db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, *args):
+        self.append(statement)
+
+
+def test_list_returns_only_requested_fields(client):
+    _add_requests(3)
+    full = client.get('/api/service-requests').get_json()
+
+    with _Statements() as statements:
+        rv = client.get('/api/service-requests?fields=request_id,status,total_customer_paid')
+    assert rv.status_code == 200
+    assert rv.get_json() == [
+        {'request_id': r['request_id'], 'status': r['status'], 'total_customer_paid': r['total_customer_paid']}
+        for r in full
+    ]
+    select = next(s for s in statements if s.lstrip().upper().startswith('SELECT'))
+    assert 'total_customer_paid_cents' in select
+    assert 'selected_items' not in select and 'admin_notes' not in select
+
+
+def test_fields_with_keyset_pages_and_streams(client):
+    _add_requests(5)
+    first = client.get('/api/service-requests?fields=customer_name&limit=2')
+    assert first.get_json() == [{'customer_name': 'Cust 4'}, {'customer_name': 'Cust 3'}]
+    cursor = first.headers['X-Next-Cursor']
+    second = client.get(f'/api/service-requests?fields=customer_name&limit=2&cursor={cursor}')
+    assert second.get_json() == [{'customer_name': 'Cust 2'}, {'customer_name': 'Cust 1'}]
+
+    lines = client.get('/api/service-requests?fields=customer_name&stream=ndjson').get_data(as_text=True)
+    assert lines.splitlines()[0] == '{"customer_name":"Cust 4"}'
+
+
+def test_unknown_field_is_rejected(client):
+    rv = client.get('/api/service-requests?fields=status,password_hash')
+    assert rv.status_code == 400
+    assert 'password_hash' in rv.get_json()['error']
+    assert client.get('/api/users?fields=password_hash').status_code == 400
+    assert client.get('/api/bookings?fields=,').status_code == 400
+
+
+def test_detail_and_search_endpoints_accept_fields(client):
+    _add_requests(2)
+    with app.app_context():
+        request_id = ServiceRequest.query.filter_by(customer_name='Cust 1').one().request_id
+
+    rv = client.get(f'/api/service-requests/{request_id}?fields=customer_name,selected_items')
+    assert rv.get_json() == {'customer_name': 'Cust 1', 'selected_items': [{'category': 'Plumbing'}]}
+    assert client.get('/api/service-requests/999?fields=status').status_code == 404
+
+    rv = client.get('/api/service-requests?search=Cust&fields=request_id')
+    assert sorted(r['request_id'] for r in rv.get_json()) == sorted([request_id, request_id - 1])
+
+
+def test_cached_lists_get_a_distinct_etag_per_field_set(client):
+    with app.app_context():
+        db.session.add(ServiceProvider(name='Sipho', service_type='Plumbing', phone='082',
+                                       email='s@example.com', registered='2025-01-01'))
+        db.session.commit()
+
+    full = client.get('/api/providers')
+    sparse = client.get('/api/providers?fields=name')
+    assert sparse.get_json() == [{'name': 'Sipho'}]
+    assert full.headers['ETag'] != sparse.headers['ETag']
+    assert client.get('/api/providers?fields=name',
+                      headers={'If-None-Match': sparse.headers['ETag']}).status_code == 304
+    assert client.get('/api/providers', headers={'If-None-Match': sparse.headers['ETag']}).status_code == 200
@@ -0,0 +1,43 @@
+import json
+from datetime import datetime, time, timedelta
+
+from app import app, db, ServiceRequest
+
+
+def _add_requests(count):
+    with app.app_context():
+        for i in range(count):
+            db.session.add(ServiceRequest(
+                customer_name=f'Cust {i}', customer_email=f'c{i}@example.com',
+                customer_phone='0820000000', customer_address='1 Main Rd',
+                preferred_date=datetime(2025, 6, 1).date(), preferred_time=time(9, 0),
+                selected_items='[]', created_at=datetime(2025, 1, 1) + timedelta(minutes=i)
+            ))
+        db.session.commit()
+
+
+def test_streamed_json_matches_list_response(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'STREAM_BATCH_SIZE', 2)
+    _add_requests(5)
+
+    plain = client.get('/api/service-requests').get_json()
+    rv = client.get('/api/service-requests?stream=json')
+    assert rv.status_code == 200
+    assert rv.is_streamed
+    assert rv.mimetype == 'application/json'
+    assert json.loads(rv.get_data(as_text=True)) == plain
+
+
+def test_ndjson_stream_one_object_per_line(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'STREAM_BATCH_SIZE', 2)
+    _add_requests(3)
+
+    rv = client.get('/api/service-requests', headers={'Accept': 'application/x-ndjson'})
+    assert rv.mimetype == 'application/x-ndjson'
+    lines = rv.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['customer_name'] for line in lines] == ['Cust 2', 'Cust 1', 'Cust 0']
+
+
+def test_empty_stream_is_valid_json(client):
+    assert client.get('/api/bookings?stream=json').get_json() == []
+    assert client.get('/api/bookings?stream=ndjson').get_data() == b''